@@ -1,4 +1,5 @@
 from app.core.cache import cache_service
+from app.services.suggest import suggest_index
 from app.services.trends_service import trends_service
 
 #dependency injection for services
@@ -7,4 +8,8 @@ def get_cache_service():
 
 
 def get_trends_service():
-    return trends_service
\ No newline at end of file
+    return trends_service
+
+
+def get_suggest_index():
+    return suggest_index
\ No newline at end of file
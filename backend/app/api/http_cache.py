@@ -0,0 +1,42 @@
+"""
+Conditional GET support for cached JSON bodies.
+
+The ETag is a hash of the body, so every worker (and every replica)
+gives the same data the same tag. max-age is the time until the data
+behind the body goes stale, which keeps browser, nginx and CDN copies no
+fresher than the Redis entries they came from.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+def etag(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def matches(if_none_match: Optional[str], tag: str) -> bool:
+    """Whether an If-None-Match header covers tag (weak comparison, as RFC 9110 asks for)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return tag in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+
+
+def cache_control(fresh_for: float) -> str:
+    max_age = int(max(0.0, min(fresh_for, settings.HTTP_MAX_AGE)))
+    return f"public, max-age={max_age}, stale-while-revalidate={settings.HTTP_STALE_WHILE_REVALIDATE}"
+
+
+def conditional_json(request: Request, body: bytes, fresh_for: float) -> Response:
+    """The body with ETag and Cache-Control, or a bodiless 304 if the client already has it"""
+    tag = etag(body)
+    headers = {"ETag": tag, "Cache-Control": cache_control(fresh_for)}
+    if matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
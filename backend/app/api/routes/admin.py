@@ -0,0 +1,55 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from app.core.config import settings
+from app.core.cache import cache_service
+from app.models.ingest import IngestRequest, IngestJobStatus
+from app.services.ingest import ingest_queue
+
+
+def require_admin(x_admin_token: str = Header(default="")):
+    """Admin routes need ADMIN_TOKEN set and sent as X-Admin-Token"""
+    if not settings.ADMIN_TOKEN or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def require_redis():
+    if not cache_service.redis:
+        raise HTTPException(status_code=503, detail="Bulk ingestion needs Redis")
+
+
+router = APIRouter(dependencies=[Depends(require_admin), Depends(require_redis)])
+
+
+@router.post("/admin/ingest", response_model=IngestJobStatus, status_code=202)
+async def submit_ingest(request: IngestRequest):
+    """
+    Queues a keyword list for background warming.
+    Keywords are processed in batches of 5 by the ingest workers.
+    """
+    try:
+        job_id = await ingest_queue.submit(request.keywords, request.timeframe, request.geo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await ingest_queue.status(job_id)
+
+
+@router.get("/admin/ingest/{job_id}", response_model=IngestJobStatus)
+async def ingest_status(job_id: str):
+    """
+    Progress of an ingest job, including keywords that failed.
+    """
+    status = await ingest_queue.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job: {job_id}")
+    return status
+
+
+@router.post("/admin/ingest/{job_id}/resume", response_model=IngestJobStatus)
+async def resume_ingest(job_id: str):
+    """
+    Re-queues a job's unfinished batches and retries its failed keywords.
+    """
+    if await ingest_queue.status(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job: {job_id}")
+    await ingest_queue.resume(job_id)
+    return await ingest_queue.status(job_id)
@@ -2,6 +2,9 @@ from fastapi import APIRouter
 from app.models.trends import HealthResponse
 from app.core.config import settings
 from app.core.cache import cache_service
+from app.core.keys import key_stats
+from app.services.trends_service import trends_service
+from app.services.worker_stats import worker_stats
 
 router = APIRouter()
 
@@ -12,12 +15,39 @@ async def health_check():
     Health check endpoint.
     Returns server status, version, environment and cache status.
     """
-    # Check if Redis is connected
-    cache_status = "connected" if cache_service.redis else "disconnected"
+    # connected, degraded (Redis bypassed while it is slow or failing) or disconnected
+    cache_status = cache_service.status
 
     return HealthResponse(
         status="healthy",
         version=settings.APP_VERSION,
         environment=settings.ENVIRONMENT,
         cache_status=cache_status
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/health/cache")
+async def cache_stats():
+    """
+    Cache hit/miss counters per tier.
+    l1 is this worker's in-process cache, l2 is Redis; keys shows how many
+    hits came from canonicalizing equivalent requests onto one key.
+    """
+    return {**cache_service.cache_stats(), "keys": key_stats.as_dict()}
+
+
+@router.get("/health/upstream")
+async def upstream_stats():
+    """
+    Google Trends client pool and circuit breaker state for this worker.
+    """
+    return trends_service.upstream_stats()
+
+
+@router.get("/health/workers")
+async def workers_stats():
+    """
+    Cache, key and upstream stats of every worker process, with totals.
+    Each worker reports to Redis every WORKER_STATS_INTERVAL seconds.
+    """
+    return await worker_stats.collect(trends_service)
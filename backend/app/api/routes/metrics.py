@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import render
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics: route, Redis, upstream and conversion latency
+    histograms, plus cache hit/miss/error and upstream 429 counters.
+    """
+    body, content_type = render()
+    return Response(content=body, media_type=content_type)
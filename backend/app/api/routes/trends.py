@@ -1,11 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.models.trends import TrendRequest, TrendResponse
-from app.api.dependencies import get_trends_service
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from app.models.trends import TrendRequest, TrendResponse, CompareResponse, BatchTrendRequest, TrendAnalytics, SuggestResponse
+from app.api.dependencies import get_suggest_index, get_trends_service
+from app.api.http_cache import conditional_json
+from app.services.suggest import SuggestIndex
 from app.services.trends_service import TrendsService
+from app.core import codec
+from app.core.config import settings
+from app.core.exceptions import InvalidRequestError, UpstreamError
 
 router = APIRouter()
 
 
+def upstream_unavailable(e: UpstreamError) -> HTTPException:
+    """503 telling the client when Google Trends is worth retrying"""
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def raw_json(body: bytes) -> Response:
+    """Send a pre-serialized JSON body straight from the cache"""
+    return Response(content=body, media_type="application/json")
+
+
 @router.post("/trends", response_model=TrendResponse)
 async def get_trends(
     request: TrendRequest,
@@ -20,15 +36,128 @@ async def get_trends(
         result = await service.get_trends(
             keyword=request.keyword,
             timeframe=request.timeframe,
-            geo=request.geo
+            geo=request.geo,
+            raw=True
         )
+        if isinstance(result, bytes):
+            return raw_json(result)
         return result
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamError as e:
+        raise upstream_unavailable(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch trends data: {str(e)}"
         )
 
+
+async def cached_get(request: Request, service: TrendsService, kind: str, keyword: str, timeframe: str, geo: str, what: str) -> Response:
+    """Serve a GET trend route: the cached body, conditional on If-None-Match"""
+    try:
+        result = await service.get_body(kind, keyword, timeframe, geo)
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamError as e:
+        raise upstream_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch {what}: {str(e)}")
+    return conditional_json(request, result.body, result.fresh_for)
+
+
+@router.get("/trends", response_model=TrendResponse)
+async def get_trends_cacheable(
+    request: Request,
+    keyword: str,
+    timeframe: str = "today 12-m",
+    geo: str = "US",
+    service: TrendsService = Depends(get_trends_service)
+):
+    """
+    GET form of POST /api/trends, keyed on its query parameters so that
+    browsers, nginx and CDNs can cache it. Sends an ETag and a max-age
+    matching the cached data's freshness, and 304 Not Modified when the
+    client's If-None-Match still matches.
+    """
+    return await cached_get(request, service, "trends", keyword, timeframe, geo, "trends data")
+
+
+@router.get("/trends/region")
+async def get_region_cacheable(
+    request: Request,
+    keyword: str,
+    timeframe: str = "today 12-m",
+    geo: str = "US",
+    service: TrendsService = Depends(get_trends_service)
+):
+    """Cacheable GET form of POST /api/trends/region"""
+    return await cached_get(request, service, "region", keyword, timeframe, geo, "region data")
+
+
+@router.get("/trends/overtime")
+async def get_overtime_cacheable(
+    request: Request,
+    keyword: str,
+    timeframe: str = "today 12-m",
+    geo: str = "US",
+    service: TrendsService = Depends(get_trends_service)
+):
+    """Cacheable GET form of POST /api/trends/overtime"""
+    return await cached_get(request, service, "iot", keyword, timeframe, geo, "overtime data")
+
+
+@router.get("/trends/analytics", response_model=TrendAnalytics)
+async def get_analytics_cacheable(
+    request: Request,
+    keyword: str,
+    timeframe: str = "today 12-m",
+    geo: str = "US",
+    service: TrendsService = Depends(get_trends_service)
+):
+    """Cacheable GET form of POST /api/trends/analytics"""
+    return await cached_get(request, service, "analytics", keyword, timeframe, geo, "analytics")
+
+
+def batch_line(index: int, request: TrendRequest, body: bytes | None, error: Exception | None) -> bytes:
+    """One NDJSON line of a batch response; data is the cached body, embedded as-is"""
+    head = {"index": index, "keyword": request.keyword, "timeframe": request.timeframe, "geo": request.geo}
+    if error is None:
+        return codec.dumps({**head, "status": 200})[:-1] + b',"data":' + body + b"}\n"
+    if isinstance(error, InvalidRequestError):
+        status = 400
+    else:
+        status = 503 if isinstance(error, UpstreamError) else 500
+    return codec.dumps({**head, "status": status, "error": str(error)}) + b"\n"
+
+
+@router.post("/trends/batch")
+async def get_trends_batch(
+    request: BatchTrendRequest,
+    service: TrendsService = Depends(get_trends_service)
+):
+    """
+    Fetches trends for many (keyword, timeframe, geo) combinations at once.
+    Streams one NDJSON line per item as soon as it is ready — cache hits
+    first, then fetched items in completion order. `index` points back
+    into the request's items; `data` has the same shape as /api/trends.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.BATCH_MAX_ITEMS} items allowed per batch"
+        )
+
+    async def lines():
+        async for index, body, error in service.stream_trends(request.items):
+            yield batch_line(index, request.items[index], body, error)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/trends/region")
 async def get_region(
     request: TrendRequest,
@@ -41,9 +170,16 @@ async def get_region(
         result = await service.get_region(
             keyword=request.keyword,
             timeframe=request.timeframe,
-            geo=request.geo
+            geo=request.geo,
+            raw=True
         )
+        if isinstance(result, bytes):
+            return raw_json(result)
         return {"interest_by_region": result}
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamError as e:
+        raise upstream_unavailable(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -59,20 +195,70 @@ async def get_overtime(
         result = await service.get_interest_over_time(
             keyword=request.keyword,
             timeframe=request.timeframe,
-            geo=request.geo
+            geo=request.geo,
+            raw=True
         )
+        if isinstance(result, bytes):
+            return raw_json(result)
         return {"interest_over_time": result}
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamError as e:
+        raise upstream_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch overtime data: {str(e)}")
 
-@router.get("/trends/compare")
+
+@router.post("/trends/analytics", response_model=TrendAnalytics)
+async def get_analytics(
+    request: TrendRequest,
+    service: TrendsService = Depends(get_trends_service)
+):
+    """
+    Rolling means, period-over-period and year-over-year changes and
+    z-score anomaly flags for a keyword's interest over time.
+    Computed when the series is fetched, not per request.
+    """
+    try:
+        result = await service.get_analytics(
+            keyword=request.keyword,
+            timeframe=request.timeframe,
+            geo=request.geo,
+            raw=True
+        )
+        if isinstance(result, bytes):
+            return raw_json(result)
+        return result
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamError as e:
+        raise upstream_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch analytics: {str(e)}")
+
+
+@router.get("/trends/compare", response_model=CompareResponse)
 async def compare_trends(
+    request: Request,
     keywords: str,
     timeframe: str = "today 12-m",
     geo: str = "US",
     service: TrendsService = Depends(get_trends_service)
 ):
-    keyword_list = [k.strip() for k in keywords.split(",")]
+    """
+    Compares up to 5 keywords side by side.
+    All keywords are fetched in one batched payload, so their
+    interest over time shares a single 0–100 scale. Carries an ETag
+    (max-age=0: caches revalidate, and get a 304 while it is unchanged).
+    """
+    # Drop blanks and duplicates but keep the caller's order
+    keyword_list = list(dict.fromkeys(k.strip() for k in keywords.split(",") if k.strip()))
+
+    if not keyword_list:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one keyword is required for comparison"
+        )
 
     if len(keyword_list) > 5:
         raise HTTPException(
@@ -80,19 +266,41 @@ async def compare_trends(
             detail="Maximum 5 keywords allowed for comparison"
         )
 
-    results = []
-    for keyword in keyword_list:
-        try:
-            result = await service.get_trends(
-                keyword=keyword,
-                timeframe=timeframe,
-                geo=geo
-            )
-            results.append(result)
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to fetch trends for {keyword}: {str(e)}"
-            )
-
-    return {"comparisons": results}
\ No newline at end of file
+    try:
+        result = await service.compare_trends(
+            keywords=keyword_list,
+            timeframe=timeframe,
+            geo=geo
+        )
+        return conditional_json(request, codec.dumps(result.model_dump()), fresh_for=0)
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamError as e:
+        raise upstream_unavailable(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to compare trends for {', '.join(keyword_list)}: {str(e)}"
+        )
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    request: Request,
+    q: str,
+    limit: int = 10,
+    index: SuggestIndex = Depends(get_suggest_index)
+):
+    """
+    Autocomplete: keywords and related queries already seen in fetches
+    (any keyword, any geo) with a word starting with q, most popular
+    first. Served from Redis alone, never from Google.
+    """
+    if not 1 <= limit <= settings.SUGGEST_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {settings.SUGGEST_LIMIT}")
+    try:
+        suggestions = await index.suggest(q, limit)
+    except InvalidRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    body = codec.dumps(SuggestResponse(query=q, suggestions=suggestions))
+    return conditional_json(request, body, fresh_for=settings.SUGGEST_MAX_AGE)
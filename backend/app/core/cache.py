@@ -1,74 +1,583 @@
 import redis.asyncio as aioredis
-import json
+import asyncio
 import logging
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from app.core import codec, columnar
 from app.core.config import settings
-from typing import Optional
+from app.core.exceptions import UpstreamUnavailableError
+from app.core.metrics import (
+    CACHE_ERRORS,
+    CACHE_LOOKUPS,
+    REDIS_LATENCY,
+    SERIALIZE_LATENCY,
+    add_timing,
+    namespace,
+    timed
+)
+from app.core.resilience import CircuitBreaker, backoff_delay
+from typing import Any, Callable, Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
+# Delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Token bucket shared by every worker. Reserves one token unless the wait
+# for it would exceed max_wait; returns the wait in seconds either way.
+RESERVE_TOKEN_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local t = redis.call("time")
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call("hmget", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+end
+if wait <= max_wait then
+    redis.call("hset", KEYS[1], "tokens", tostring(tokens - 1), "ts", tostring(now))
+    redis.call("expire", KEYS[1], math.ceil((burst + max_wait * rate) / rate) + 1)
+end
+return tostring(wait)
+"""
+
+# Channel used to tell other workers to drop L1 entries
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+_MISSING = object()
+
+
+class CacheEntry:
+    """
+    A cached value plus the moment it stops being fresh.
+
+    The value travels as compact JSON bytes (`body`), which is what Redis
+    stores and what the API sends to clients; it is only parsed when
+    `value` is read. `model` holds the loaded Pydantic object once a caller
+    has needed one, so L1 hits don't rebuild it.
+
+    Widget values are stored in the columnar format instead (`stored`),
+    in Redis and in L1 alike; `body` expands them to JSON on each read,
+    so only the response being sent holds the JSON.
+    """
+
+    __slots__ = ("fresh_until", "expires_at", "size", "model", "_value", "_body")
+
+    def __init__(
+        self,
+        value: Any = _MISSING,
+        fresh_until: float = float("inf"),
+        expires_at: float = float("inf"),
+        size: int = 0,
+        body: Optional[bytes] = None
+    ):
+        self._value = value
+        self._body = body
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+        self.size = size
+        self.model = None
+
+    @property
+    def value(self) -> Any:
+        if self._value is _MISSING:
+            self._value = columnar.decode(self._body) if columnar.is_columnar(self._body) else codec.loads(self._body)
+        return self._value
+
+    @property
+    def stored(self) -> bytes:
+        """The body as it is stored: JSON or columnar"""
+        if self._body is None:
+            self._body = codec.dumps(self._value)
+        return self._body
+
+    @property
+    def body(self) -> bytes:
+        stored = self.stored
+        return columnar.to_json(stored) if columnar.is_columnar(stored) else stored
+
+    @property
+    def stale(self) -> bool:
+        return time.time() >= self.fresh_until
+
+    @property
+    def fresh_for(self) -> float:
+        """Seconds until the entry goes stale (negative once it has)"""
+        return self.fresh_until - time.time()
+
+    def __repr__(self) -> str:
+        return f"CacheEntry(fresh_until={self.fresh_until}, expires_at={self.expires_at}, size={self.size})"
+
+
+def _decode(payload: bytes) -> Optional[CacheEntry]:
+    """Unpack a stored value; anything in an older format counts as a miss"""
+    unpacked = codec.unpack(payload)
+    if unpacked is None:
+        return None
+    body, fresh_until, expires_at = unpacked
+    return CacheEntry(fresh_until=fresh_until, expires_at=expires_at, size=len(payload), body=body)
+
+
+@dataclass
+class TierStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class LocalCache:
+    """
+    In-process L1 cache of already-loaded (validated) objects.
+
+    LRU eviction is bounded by entry count and by approximate memory, using
+    the entry's encoded size as its weight. An entry never outlives its
+    Redis expiry, and never lives longer than `ttl` seconds in L1, so
+    writes from other workers become visible within that window even if
+    an invalidation message is missed.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.stats = TierStats()
+        self._entries: OrderedDict[str, tuple[CacheEntry, float]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        item = self._entries.get(key)
+        if item is None:
+            self.stats.misses += 1
+            CACHE_LOOKUPS.labels(namespace(key), "l1", "miss").inc()
+            return None
+        entry, expires_at = item
+        if time.time() >= expires_at:
+            self.pop(key)
+            self.stats.misses += 1
+            CACHE_LOOKUPS.labels(namespace(key), "l1", "miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        if entry.stale:
+            self.stats.stale += 1
+        CACHE_LOOKUPS.labels(namespace(key), "l1", "stale" if entry.stale else "hit").inc()
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        if self.max_entries <= 0 or entry.size > self.max_bytes:
+            return
+        self.pop(key)
+        self._entries[key] = (entry, min(entry.expires_at, time.time() + self.ttl))
+        self.bytes += entry.size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.stats.evictions += 1
+
+    def pop(self, key: str):
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self.bytes -= item[0].size
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class CacheService:
+    """
+    Two-tier cache: in-process L1 in front of Redis (L2).
+
+    Redis is reached through a bounded connection pool with short socket
+    timeouts. If it is down at startup, connect() keeps retrying in the
+    background with backoff. Once connected, failed commands and commands
+    slower than REDIS_SLOW_COMMAND trip a circuit breaker: for
+    REDIS_BREAKER_RESET seconds every call skips Redis (misses, unlocked
+    fetches, local rate limiting) instead of waiting on timeouts.
+    """
+
     def __init__(self):
         self.redis = None
+        # L1: validated objects, kept in front of Redis (L2)
+        self.local = LocalCache(
+            max_entries=settings.LOCAL_CACHE_MAX_ENTRIES,
+            max_bytes=settings.LOCAL_CACHE_MAX_BYTES,
+            ttl=settings.LOCAL_CACHE_TTL
+        )
+        self.stats = TierStats()
+        self.breaker = CircuitBreaker(
+            "Redis",
+            failure_threshold=settings.REDIS_BREAKER_THRESHOLD,
+            reset_timeout=settings.REDIS_BREAKER_RESET
+        )
+        # Lets a worker ignore its own invalidation messages
+        self.instance_id = uuid.uuid4().hex
+        self._pool: Optional[aioredis.ConnectionPool] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._reconnector: Optional[asyncio.Task] = None
 
     async def connect(self):
-        """Connect to Redis"""
+        """Connect to Redis, retrying in the background if it is unavailable"""
+        # Per process: gunicorn forks every worker from one preloaded instance
+        self.instance_id = uuid.uuid4().hex
+        self._pool = aioredis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            decode_responses=False,  # values are packed binary
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL
+        )
+        if not await self._try_connect():
+            logger.warning("Caching disabled until Redis is reachable")
+            self._reconnector = asyncio.create_task(self._reconnect())
+
+    async def _try_connect(self) -> bool:
+        client = aioredis.Redis(connection_pool=self._pool)
         try:
-            self.redis = await aioredis.from_url(
-                settings.REDIS_URL,
-                encoding="utf-8",
-                decode_responses=True
-            )
-            logger.info("Redis connection established")
+            await client.ping()
         except Exception as e:
-            logger.warning(f"Redis connection failed: {e}. Caching disabled.")
-            self.redis = None
+            logger.warning(f"Redis connection failed: {e}")
+            return False
+        self.redis = client
+        self.breaker.record_success()
+        logger.info("Redis connection established")
+        self._listener = asyncio.create_task(self._listen_for_invalidations())
+        return True
+
+    async def _reconnect(self):
+        attempt = 0
+        while True:
+            await asyncio.sleep(backoff_delay(attempt, 1.0, settings.REDIS_RECONNECT_MAX_DELAY, floor=0.5))
+            if await self._try_connect():
+                return
+            attempt += 1
 
     async def disconnect(self):
         """Disconnect from Redis"""
+        for task in (self._reconnector, self._listener):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._reconnector = self._listener = None
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose()
+            self.redis = None
             logger.info("Redis connection closed")
+        if self._pool:
+            await self._pool.disconnect()
+            self._pool = None
+
+    @property
+    def status(self) -> str:
+        """connected, degraded (bypassed by the breaker) or disconnected"""
+        if not self.redis:
+            return "disconnected"
+        return "connected" if self.breaker.state == "closed" else "degraded"
+
+    @property
+    def available(self) -> bool:
+        """Whether Redis calls are currently attempted"""
+        return self.redis is not None and self.breaker.available
+
+    def _usable(self) -> bool:
+        """Like available, but takes the half-open trial slot when there is one"""
+        if not self.redis:
+            return False
+        try:
+            self.breaker.check()
+        except UpstreamUnavailableError:
+            return False
+        return True
+
+    @contextmanager
+    def _command(self, name: str) -> Iterator[None]:
+        """Time a Redis call and report errors and slow replies to the breaker"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled: no verdict, but free a half-open trial slot
+            self.breaker.release()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            REDIS_LATENCY.labels(name).observe(elapsed)
+            add_timing("redis", elapsed)
+        if elapsed > settings.REDIS_SLOW_COMMAND:
+            logger.warning(f"Slow Redis {name}: {elapsed * 1000:.0f}ms")
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    async def _listen_for_invalidations(self):
+        """Drop L1 entries that another worker has changed or deleted"""
+        while self.redis:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                try:
+                    while True:
+                        # Poll with a timeout: a blocking read would hit the socket timeout
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=30.0)
+                        if message is not None and message["type"] == "message":
+                            self._invalidated(message["data"])
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Messages may have been missed — don't trust L1 until resubscribed
+                logger.error(f"Cache invalidation listener error: {e}")
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    def _invalidated(self, data: bytes):
+        """Drop the L1 entry named in an invalidation message, unless this instance sent it"""
+        origin, _, key = data.decode().partition(":")
+        if origin != self.instance_id:
+            self.local.pop(key)
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters per tier"""
+        return {
+            "l1": {**self.local.stats.as_dict(), "entries": len(self.local), "bytes": self.local.bytes},
+            "l2": {
+                **self.stats.as_dict(),
+                "connected": self.redis is not None,
+                "status": self.status,
+                "breaker": self.breaker.state
+            }
+        }
 
     async def get(self, key: str):
         """Get value from cache"""
-        if not self.redis:
+        entry = await self.get_entry(key)
+        return entry.value if entry else None
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Get value from cache along with its freshness"""
+        if not self._usable():
             return None
         try:
-            value = await self.redis.get(key)
-            if value:
-                logger.info(f"Cache HIT: {key}")
-                return json.loads(value)
+            with self._command("get"):
+                value = await self.redis.get(key)
+            entry = _decode(value) if value else None
+            if entry:
+                self.stats.hits += 1
+                self.stats.stale += entry.stale
+                CACHE_LOOKUPS.labels(namespace(key), "l2", "stale" if entry.stale else "hit").inc()
+                logger.info(f"Cache {'STALE' if entry.stale else 'HIT'}: {key}")
+                return entry
+            self.stats.misses += 1
+            CACHE_LOOKUPS.labels(namespace(key), "l2", "miss").inc()
             logger.info(f"Cache MISS: {key}")
             return None
         except Exception as e:
+            CACHE_ERRORS.labels(namespace(key), "get").inc()
             logger.error(f"Cache get error: {e}")
             return None
 
-    async def set(self, key: str, value: dict | list, ttl: Optional[int] = None):
-        """Set value in cache with TTL"""
-        if not self.redis:
-            return
+    async def mget(self, keys: list[str]) -> list:
+        """Get several values in one round trip (None for each miss)"""
+        return [entry.value if entry else None for entry in await self.mget_entries(keys)]
+
+    async def mget_entries(self, keys: list[str]) -> list[Optional[CacheEntry]]:
+        """Get several entries in one round trip (None for each miss)"""
+        if not keys or not self._usable():
+            return [None] * len(keys)
         try:
-            ttl = ttl or settings.CACHE_TTL
-            await self.redis.setex(
-                key,
-                ttl,
-                json.dumps(value)
-            )
-            logger.info(f"Cache SET: {key} (TTL: {ttl}s)")
+            with self._command("mget"):
+                values = await self.redis.mget(keys)
+            entries = [_decode(v) if v else None for v in values]
+            hits = sum(1 for e in entries if e)
+            self.stats.hits += hits
+            self.stats.misses += len(keys) - hits
+            for key, entry in zip(keys, entries):
+                result = "miss" if entry is None else "stale" if entry.stale else "hit"
+                CACHE_LOOKUPS.labels(namespace(key), "l2", result).inc()
+            logger.info(f"Cache MGET: {hits}/{len(keys)} hits")
+            return entries
         except Exception as e:
+            CACHE_ERRORS.labels(namespace(keys[0]), "mget").inc()
+            logger.error(f"Cache mget error: {e}")
+            return [None] * len(keys)
+
+    async def set(self, key: str, value: dict | list, ttl: Optional[int] = None, soft_ttl: Optional[int] = None) -> CacheEntry:
+        """
+        Set value in cache with TTL.
+        ttl is the hard expiry in Redis; after soft_ttl (defaults to ttl)
+        the entry is still served but reported as stale.
+        Returns the written entry, including its serialized body.
+        """
+        entries = await self.mset_with_ttl({key: value}, ttl=ttl, soft_ttl=soft_ttl)
+        return entries[key]
+
+    async def mset_with_ttl(self, values: dict[str, dict | list], ttl: Optional[int] = None, soft_ttl: Optional[int] = None) -> dict[str, CacheEntry]:
+        """
+        Set several values with the same TTLs in one round trip (SETEX per
+        key plus the invalidation messages, pipelined).
+        Returns the written entries by key.
+        """
+        ttl = ttl or settings.CACHE_TTL
+        soft_ttl = min(soft_ttl or ttl, ttl)
+        now = time.time()
+        entries, payloads = {}, {}
+        for key, value in values.items():
+            with timed(SERIALIZE_LATENCY, namespace(key), stage="serialize"):
+                compact = columnar.encode(value) if settings.CACHE_COLUMNAR else None
+                if compact is None:
+                    entry = CacheEntry(value, now + soft_ttl, expires_at=now + ttl)
+                else:
+                    # Only the compact form is kept, in L1 too
+                    entry = CacheEntry(fresh_until=now + soft_ttl, expires_at=now + ttl, body=compact)
+                payloads[key] = codec.pack(entry.stored, entry.fresh_until, entry.expires_at)
+            entry.size = len(payloads[key])
+            entries[key] = entry
+        if not payloads or not self._usable():
+            return entries
+        try:
+            with self._command("set"):
+                pipe = self.redis.pipeline(transaction=False)
+                for key, payload in payloads.items():
+                    pipe.setex(key, ttl, payload)
+                    pipe.publish(INVALIDATION_CHANNEL, f"{self.instance_id}:{key}")
+                await pipe.execute()
+            logger.info(f"Cache SET: {', '.join(payloads)} (TTL: {soft_ttl}s fresh, {ttl}s hard)")
+        except Exception as e:
+            CACHE_ERRORS.labels(namespace(next(iter(payloads))), "set").inc()
             logger.error(f"Cache set error: {e}")
+        return entries
+
+    async def pipeline(self, queue: Callable[[Any], None], name: str = "pipeline") -> Optional[list]:
+        """
+        Send several commands in one round trip: queue(pipe) adds them to a
+        non-transactional pipeline. Returns the replies, or None when Redis
+        is unavailable or the pipeline failed.
+        """
+        if not self._usable():
+            return None
+        try:
+            with self._command(name):
+                pipe = self.redis.pipeline(transaction=False)
+                queue(pipe)
+                return await pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache {name} error: {e}")
+            return None
 
     async def delete(self, key: str):
-        """Delete value from cache"""
-        if not self.redis:
+        """Delete value from cache (both tiers, on every worker)"""
+        self.local.pop(key)
+
+        def queue(pipe):
+            pipe.delete(key)
+            pipe.publish(INVALIDATION_CHANNEL, f"{self.instance_id}:{key}")
+
+        if await self.pipeline(queue, name="delete") is not None:
+            logger.info(f"Cache DELETE: {key}")
+
+    async def acquire_lock(self, key: str, ttl: Optional[int] = None) -> Optional[str]:
+        """
+        Try to take a short-lived lock for key.
+        Returns an ownership token, or None if another worker holds it.
+        Without Redis there is nobody to coordinate with, so the lock is always granted.
+        """
+        token = uuid.uuid4().hex
+        if not self._usable():
+            return token
+        try:
+            ttl = ttl or settings.FETCH_LOCK_TTL
+            with self._command("lock"):
+                acquired = await self.redis.set(f"lock:{key}", token, nx=True, ex=ttl)
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Cache lock error: {e}")
+            return token
+
+    async def release_lock(self, key: str, token: str):
+        """Release a lock taken with acquire_lock"""
+        if not self._usable():
             return
         try:
-            await self.redis.delete(key)
-            logger.info(f"Cache DELETE: {key}")
+            with self._command("unlock"):
+                await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+        except Exception as e:
+            logger.error(f"Cache unlock error: {e}")
+
+    async def reserve_token(self, key: str, rate: float, burst: int, max_wait: float) -> Optional[float]:
+        """
+        Reserve one token from a bucket shared by every worker.
+        Returns the seconds until the reserved token is usable; a result above
+        max_wait means nothing was reserved. None when Redis is unavailable.
+        """
+        if not self._usable():
+            return None
+        try:
+            with self._command("reserve_token"):
+                wait = await self.redis.eval(RESERVE_TOKEN_SCRIPT, 1, key, rate, burst, max_wait)
+            return float(wait)
         except Exception as e:
-            logger.error(f"Cache delete error: {e}")
+            logger.error(f"Cache rate limit error: {e}")
+            return None
+
+    async def wait_for(self, key: str, timeout: Optional[float] = None) -> Optional[CacheEntry]:
+        """Poll the cache until key appears or timeout expires"""
+        timeout = settings.FETCH_LOCK_WAIT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.FETCH_LOCK_POLL)
+            # After the sleep: a half-open trial slot is only taken right
+            # before the command that releases it
+            if not self._usable():
+                return None
+            try:
+                with self._command("get"):
+                    value = await self.redis.get(key)
+            except Exception as e:
+                logger.error(f"Cache get error: {e}")
+                return None
+            if value:
+                entry = _decode(value)
+                if entry:
+                    logger.info(f"Cache FILLED by another worker: {key}")
+                    return entry
+        logger.warning(f"Timed out waiting for another worker to fill: {key}")
+        return None
 
 
 # Single instance used across the entire app
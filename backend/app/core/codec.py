@@ -0,0 +1,67 @@
+import json
+import struct
+import zlib
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Stored value layout: header + body.
+# Header: magic, flags, fresh_until, expires_at (unix seconds).
+# Body: compact JSON of the value, or its columnar encoding
+# (app.core.columnar), zlib-compressed when FLAG_ZLIB is set.
+MAGIC = 0xCE
+FLAG_ZLIB = 0x01
+HEADER = struct.Struct(">BBdd")
+# Part of the cache key version: bump it when workers running the previous
+# release could not read what this one writes (2 = columnar bodies)
+STORAGE_FORMAT = 2
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a value (Pydantic models included) to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+def loads(body: bytes) -> Any:
+    """Parse JSON bytes produced by dumps"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def pack(body: bytes, fresh_until: float, expires_at: float) -> bytes:
+    """Wrap a body for storage, compressing it when it is large enough"""
+    flags = 0
+    if settings.CACHE_COMPRESS_MIN_BYTES and len(body) >= settings.CACHE_COMPRESS_MIN_BYTES:
+        body = zlib.compress(body, settings.CACHE_COMPRESS_LEVEL)
+        flags |= FLAG_ZLIB
+    return HEADER.pack(MAGIC, flags, fresh_until, expires_at) + body
+
+
+def unpack(payload: bytes) -> Optional[tuple[bytes, float, float]]:
+    """
+    Split a stored value into (body, fresh_until, expires_at).
+    Returns None for anything not written by pack (e.g. the old JSON format).
+    """
+    if len(payload) < HEADER.size or payload[0] != MAGIC:
+        return None
+    _, flags, fresh_until, expires_at = HEADER.unpack_from(payload)
+    body = payload[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+    return body, fresh_until, expires_at
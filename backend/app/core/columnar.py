@@ -0,0 +1,222 @@
+"""
+Compact columnar encoding of the cached widget values.
+
+A JSON interest-over-time series repeats its keyword and a 10-character
+date on every point. Here a series is stored once as columns instead:
+
+    COLUMNAR, SERIES
+    keyword (>H length + UTF-8)
+    first date (>i days since 1970-01-01), point count (>I)
+    step (B days; STEP_DELTAS = one B delta per point follows)
+    values (one B per point)
+
+Regions and word clouds are stored as a count, the UTF-8 lengths (>H
+each) and text, then the values (B for regions, >I for word clouds, whose
+rising percentages go past 255).
+
+encode returns None for anything that doesn't fit these layouts exactly
+(another shape, dates that aren't YYYY-MM-DD, out-of-range values), and
+that value is stored as JSON as before. Encoded values always start with
+COLUMNAR, a control byte no JSON body starts with, so both can be told
+apart in the same cache. decode gives back the exact dict encode was
+given, and to_json the exact JSON bytes codec.dumps would have made of it.
+"""
+import struct
+from datetime import date
+from functools import lru_cache
+from typing import Any, Optional
+
+from app.core import codec
+
+COLUMNAR = 0x01
+SERIES, REGIONS, QUERIES = 1, 2, 3
+STEP_DELTAS = 0xFF
+
+EPOCH = date(1970, 1, 1).toordinal()
+HEAD = struct.Struct(">BB")
+SERIES_HEAD = struct.Struct(">iIB")
+LENGTH = struct.Struct(">H")
+
+
+def is_columnar(body: bytes) -> bool:
+    return body[:1] == b"\x01"
+
+
+def _field(item: Any, name: str) -> Any:
+    """A field of a model or of its dict form"""
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def _int(value: Any, limit: int) -> int:
+    if type(value) is not int or not 0 <= value <= limit:
+        raise ValueError(value)
+    return value
+
+
+def _day(text: str) -> int:
+    if len(text) != 10:
+        raise ValueError(text)
+    day = date.fromisoformat(text)
+    if day.isoformat() != text:
+        raise ValueError(text)
+    return day.toordinal() - EPOCH
+
+
+def _pack_texts(texts: list[str]) -> bytes:
+    encoded = [text.encode() for text in texts]
+    return struct.pack(f">H{len(encoded)}H", len(encoded), *map(len, encoded)) + b"".join(encoded)
+
+
+def _unpack_texts(data: bytes, offset: int) -> tuple[list[str], int]:
+    (count,) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    lengths = struct.unpack_from(f">{count}H", data, offset)
+    offset += 2 * count
+    texts = []
+    for length in lengths:
+        texts.append(data[offset:offset + length].decode())
+        offset += length
+    return texts, offset
+
+
+def _encode_series(points: list) -> bytes:
+    keyword = _field(points[0], "keyword") if points else ""
+    days, values = [], bytearray()
+    for point in points:
+        if _field(point, "keyword") != keyword:
+            raise ValueError(keyword)
+        days.append(_day(_field(point, "date")))
+        values.append(_int(_field(point, "value"), 0xFF))
+    deltas = [b - a for a, b in zip(days, days[1:])]
+    steps = set(deltas)
+    if len(steps) <= 1 and not steps & {STEP_DELTAS}:
+        step, tail = steps.pop() if steps else 0, b""
+    else:
+        step, tail = STEP_DELTAS, bytes(deltas)  # ValueError for gaps over 255 days
+    name = keyword.encode()
+    return (
+        HEAD.pack(COLUMNAR, SERIES) + LENGTH.pack(len(name)) + name
+        + SERIES_HEAD.pack(days[0] if days else 0, len(days), step) + tail + bytes(values)
+    )
+
+
+def _series_columns(data: bytes, offset: int) -> tuple[str, Any, bytes]:
+    """keyword, date ordinals and values of an encoded series"""
+    (length,) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    keyword = data[offset:offset + length].decode()
+    offset += length
+    first, count, step = SERIES_HEAD.unpack_from(data, offset)
+    offset += SERIES_HEAD.size
+    ordinal = first + EPOCH
+    if step == STEP_DELTAS:
+        ordinals = [ordinal]
+        for delta in data[offset:offset + count - 1]:
+            ordinal += delta
+            ordinals.append(ordinal)
+        offset += max(count - 1, 0)
+    else:
+        ordinals = range(ordinal, ordinal + step * count, step) if step else [ordinal] * count
+    return keyword, ordinals, data[offset:offset + count]
+
+
+# Dates repeat across every cached series, so each is only formatted once
+@lru_cache(maxsize=16384)
+def _date_text(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+@lru_cache(maxsize=16384)
+def _point_prefix(ordinal: int) -> bytes:
+    """JSON of a point up to its value"""
+    return b'{"date":"' + _date_text(ordinal).encode() + b'","value":'
+
+
+def _decode_series(data: bytes, offset: int) -> dict:
+    keyword, ordinals, values = _series_columns(data, offset)
+    return {"interest_over_time": [
+        {"date": _date_text(o), "value": v, "keyword": keyword}
+        for o, v in zip(ordinals, values)
+    ]}
+
+
+# JSON of each uint8 value
+DIGITS = [b"%d" % value for value in range(256)]
+
+
+def _series_json(data: bytes, offset: int) -> bytes:
+    """The JSON body of an encoded series, built straight from its columns"""
+    keyword, ordinals, values = _series_columns(data, offset)
+    if not values:
+        return b'{"interest_over_time":[]}'
+    suffix = b',"keyword":' + codec.dumps(keyword) + b"}"
+    body = b",".join([_point_prefix(o) + DIGITS[v] + suffix for o, v in zip(ordinals, values)])
+    return b'{"interest_over_time":[' + body + b"]}"
+
+
+def _encode_regions(regions: list) -> bytes:
+    values = bytes(_int(_field(r, "value"), 0xFF) for r in regions)
+    return HEAD.pack(COLUMNAR, REGIONS) + _pack_texts([_field(r, "region") for r in regions]) + values
+
+
+def _decode_regions(data: bytes, offset: int) -> dict:
+    names, offset = _unpack_texts(data, offset)
+    values = data[offset:offset + len(names)]
+    return {"interest_by_region": [{"region": n, "value": v} for n, v in zip(names, values)]}
+
+
+def _pack_cloud(items: list) -> bytes:
+    values = [_int(_field(q, "value"), 0xFFFFFFFF) for q in items]
+    return _pack_texts([_field(q, "text") for q in items]) + struct.pack(f">{len(values)}I", *values)
+
+
+def _unpack_cloud(data: bytes, offset: int) -> tuple[list[dict], int]:
+    texts, offset = _unpack_texts(data, offset)
+    values = struct.unpack_from(f">{len(texts)}I", data, offset)
+    return [{"text": t, "value": v} for t, v in zip(texts, values)], offset + 4 * len(texts)
+
+
+def _encode_queries(top: list, rising: list) -> bytes:
+    return HEAD.pack(COLUMNAR, QUERIES) + _pack_cloud(top) + _pack_cloud(rising)
+
+
+def _decode_queries(data: bytes, offset: int) -> dict:
+    top, offset = _unpack_cloud(data, offset)
+    rising, _ = _unpack_cloud(data, offset)
+    return {"related_queries": top, "rising_queries": rising}
+
+
+# Cached value shapes (their keys, in order) and how to encode each
+ENCODERS = {
+    ("interest_over_time",): lambda v: _encode_series(v["interest_over_time"]),
+    ("interest_by_region",): lambda v: _encode_regions(v["interest_by_region"]),
+    ("related_queries", "rising_queries"): lambda v: _encode_queries(v["related_queries"], v["rising_queries"]),
+}
+DECODERS = {SERIES: _decode_series, REGIONS: _decode_regions, QUERIES: _decode_queries}
+
+
+def encode(value: Any) -> Optional[bytes]:
+    """The columnar form of a widget value, or None to keep it as JSON"""
+    if not isinstance(value, dict):
+        return None
+    encoder = ENCODERS.get(tuple(value))
+    if encoder is None:
+        return None
+    try:
+        return encoder(value)
+    except (ValueError, TypeError, KeyError, AttributeError, UnicodeError, struct.error):
+        return None
+
+
+def decode(data: bytes) -> dict:
+    """The widget value an encoded body holds, as plain dicts"""
+    _, kind = HEAD.unpack_from(data)
+    return DECODERS[kind](data, HEAD.size)
+
+
+def to_json(data: bytes) -> bytes:
+    """The JSON response body of an encoded value"""
+    _, kind = HEAD.unpack_from(data)
+    if kind == SERIES:
+        return _series_json(data, HEAD.size)
+    return codec.dumps(DECODERS[kind](data, HEAD.size))
@@ -9,9 +9,98 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = True
 
+    # Serving (gunicorn.conf.py)
+    WEB_CONCURRENCY: int = 0  # worker processes; 0 = one per CPU
+    WORKER_STATS_INTERVAL: int = 15  # seconds between each worker's stats reports to Redis
+
+    # POST /api/trends/batch
+    BATCH_MAX_ITEMS: int = 50  # (keyword, timeframe, geo) requests per call
+
+    # HTTP caching of the GET trend routes (browsers, nginx, CDNs)
+    HTTP_MAX_AGE: int = 3600  # longest max-age sent; otherwise the data's remaining freshness
+    HTTP_STALE_WHILE_REVALIDATE: int = 60  # seconds shared caches may serve stale while revalidating
+
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     CACHE_TTL: int = 3600  # 1 hour in seconds
+    CACHE_SOFT_TTL: int = 3600  # trend data is fresh for 1 hour...
+    CACHE_HARD_TTL: int = 86400  # ...and served stale (while refreshing) for up to a day
+    CACHE_COMPRESS_MIN_BYTES: int = 2048  # zlib-compress bodies at least this big (0 = never)
+    CACHE_COMPRESS_LEVEL: int = 1  # favour speed — bodies are small JSON
+    CACHE_COLUMNAR: bool = True  # store series, regions and word clouds in the compact columnar format
+    CACHE_KEY_VERSION: str = ""  # key prefix version; empty = derived from the response models' schemas
+    REDIS_MAX_CONNECTIONS: int = 50  # connection pool size per worker
+    REDIS_SOCKET_TIMEOUT: float = 2.0  # seconds a command may take before it fails (above ingest's 1s BLMOVE)
+    REDIS_CONNECT_TIMEOUT: float = 1.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # seconds idle before a pooled connection is pinged
+    REDIS_RECONNECT_MAX_DELAY: float = 30.0  # longest backoff between reconnect attempts
+    REDIS_SLOW_COMMAND: float = 0.1  # slower commands count as failures for the breaker
+    REDIS_BREAKER_THRESHOLD: int = 5  # consecutive failed or slow commands before Redis is bypassed
+    REDIS_BREAKER_RESET: float = 5.0  # seconds Redis is bypassed before a trial command
+
+    # In-process L1 cache in front of Redis
+    LOCAL_CACHE_MAX_ENTRIES: int = 2048
+    LOCAL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # approximate, by encoded size
+    LOCAL_CACHE_TTL: float = 30.0  # max seconds an entry lives in L1
+
+    # Interest-over-time history (incremental refreshes)
+    SERIES_STORE_PATH: str = ""  # SQLite file; empty disables the store
+    SERIES_OVERLAP_STEPS: int = 4  # stored points re-fetched to rescale each new tail
+
+    # Interest-over-time analytics (computed per fetch, cached beside the series)
+    ANALYTICS_WINDOW: int = 4  # points in each rolling mean
+    ANALYTICS_BASELINE: int = 12  # preceding points a z-score is measured against
+    ANALYTICS_Z_THRESHOLD: float = 3.0  # |z| at or above this flags an anomaly
+
+    # Hot keyword warming
+    HOT_KEYWORDS_TOP_N: int = 20  # most requested keys kept warm
+    HOT_REFRESH_INTERVAL: int = 300  # seconds between warming passes
+    HOT_KEYWORDS_DECAY: float = 0.5  # popularity multiplier applied every pass
+    HOT_WARM_ON_START: bool = True  # run a warming pass at startup (one worker wins the lock)
+
+    # Bulk keyword ingestion (python -m app.ingest)
+    INGEST_RATE_SHARE: float = 0.5  # fraction of UPSTREAM_RATE ingestion may use
+    INGEST_FRESH_HORIZON: int = 600  # skip keywords still fresh for this many seconds
+    INGEST_WORKER_TIMEOUT: int = 120  # seconds without a heartbeat before a worker's batch is re-queued
+    INGEST_JOB_TTL: int = 7 * 86400  # job progress is kept for a week
+    ADMIN_TOKEN: str = ""  # X-Admin-Token for /api/admin routes (empty disables them)
+
+    # Keyword suggestions (/api/suggest), indexed from every fetched related query
+    SUGGEST_LIMIT: int = 10  # most suggestions one request can ask for
+    SUGGEST_PREFIX_CHARS: int = 4  # prefixes up to this long keep their own popularity ranking
+    SUGGEST_SCAN: int = 200  # longer prefixes: lex index members read per round trip
+    SUGGEST_MAX_TERMS: int = 50000  # least popular terms are dropped past this
+    SUGGEST_MAX_AGE: int = 60  # Cache-Control max-age of suggestion responses
+
+    # Upstream (Google Trends) worker pool
+    UPSTREAM_MAX_WORKERS: int = 4  # concurrent blocking fetches
+    UPSTREAM_MAX_QUEUE: int = 32  # fetches allowed to wait for a worker
+    UPSTREAM_QUEUE_TIMEOUT: float = 30.0  # seconds a fetch may wait before it is dropped
+    UPSTREAM_PRELOAD: bool = False  # import pytrends/pandas at startup instead of on the first fetch
+
+    # Google Trends client pool
+    TRENDS_POOL_SIZE: int = 4  # clients (sessions) that can fetch in parallel
+    TRENDS_POOL_LEASE_TIMEOUT: float = 30.0  # seconds a fetch may wait for a free client
+    TRENDS_CLIENT_MAX_429: int = 3  # consecutive rate-limited fetches before a client is replaced
+    TRENDS_BASE_URL: str = ""  # stand-in for https://trends.google.com/trends (e.g. the benchmark fake server)
+    TRENDS_BACKEND: str = "pytrends"  # "pytrends" (pooled clients on worker threads) or "httpx" (native async client)
+    TRENDS_HTTP2: bool = True  # httpx backend: multiplex requests over HTTP/2 (needs the h2 package)
+
+    # Upstream protection (rate limit, retries, circuit breaker)
+    UPSTREAM_RATE: float = 0.5  # fetches per second across all workers (0 = unlimited)
+    UPSTREAM_BURST: int = 5  # fetches allowed back to back before the rate applies
+    UPSTREAM_RETRY_ATTEMPTS: int = 3  # tries per fetch, including the first
+    UPSTREAM_RETRY_BASE_DELAY: float = 1.0  # backoff before the first retry (doubles, jittered)
+    UPSTREAM_RETRY_MAX_DELAY: float = 10.0  # longest single backoff
+    UPSTREAM_RETRY_BUDGET: float = 20.0  # seconds a fetch may spend waiting on limits and retries
+    BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failed fetches before failing fast
+    BREAKER_RESET_TIMEOUT: float = 60.0  # seconds before a trial fetch is let through
+    CACHE_FAILURE_TTL: int = 60  # incomplete results are cached this briefly
+
+    # Cross-worker fetch lock (stops replicas refetching the same key)
+    FETCH_LOCK_TTL: int = 30  # seconds before an abandoned lock expires
+    FETCH_LOCK_WAIT: float = 15.0  # seconds to wait for another worker's result
+    FETCH_LOCK_POLL: float = 0.1  # seconds between cache polls while waiting
 
     CORS_ORIGINS: list = [
         "http://localhost:5173",
@@ -0,0 +1,33 @@
+from typing import Any
+
+
+class UpstreamError(Exception):
+    """Base class for failures reaching Google Trends; the API answers these with 503"""
+    retry_after: int = 5
+
+
+class UpstreamBusyError(UpstreamError):
+    """Raised when the upstream worker pool is saturated and the fetch is rejected"""
+
+
+class UpstreamUnavailableError(UpstreamError):
+    """Raised while the circuit breaker is open and upstream calls fail fast"""
+
+    def __init__(self, message: str, retry_after: float = 5):
+        super().__init__(message)
+        self.retry_after = max(int(retry_after + 0.999), 1)
+
+
+class UpstreamFetchError(UpstreamError):
+    """
+    Raised when an upstream fetch still fails after its retries.
+    partial holds whatever was fetched before giving up (None if nothing).
+    """
+
+    def __init__(self, message: str, partial: Any = None):
+        super().__init__(message)
+        self.partial = partial
+
+
+class InvalidRequestError(ValueError):
+    """Raised for a keyword, timeframe or geo that can't be used; the API answers these with 400"""
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from app.core.config import settings
+from app.core.exceptions import UpstreamBusyError
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamExecutor:
+    """
+    Bounded thread pool for blocking upstream work (pytrends, pandas).
+
+    At most `max_workers` fetches run at once. Up to `max_queue` more may
+    wait for a worker; anything beyond that is rejected straight away, and
+    a queued job that waits longer than `queue_timeout` seconds is dropped
+    before it starts. The event loop only awaits the result, so cache hits
+    and /health keep being served while slow fetches are in flight.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, queue_timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.pending = 0
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="upstream"
+            )
+        return self._pool
+
+    def _guarded(self, fn: Callable, submitted_at: float) -> Any:
+        """Run fn in a worker thread unless it sat in the queue too long"""
+        waited = time.monotonic() - submitted_at
+        if waited > self.queue_timeout:
+            raise UpstreamBusyError(f"Upstream fetch waited {waited:.1f}s for a worker")
+        return fn()
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the pool and await its result"""
+        if self.pending >= self.max_workers + self.max_queue:
+            logger.warning(f"Upstream pool saturated ({self.pending} pending), rejecting fetch")
+            raise UpstreamBusyError("Upstream worker pool is saturated")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.pool,
+                self._guarded,
+                partial(fn, *args, **kwargs),
+                time.monotonic()
+            )
+        finally:
+            self.pending -= 1
+
+    async def run_async(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Await a coroutine function under the same limits as run(): it
+        takes one of `max_workers` slots (no thread), waiting in the queue
+        for at most `queue_timeout` seconds.
+        """
+        if self.pending >= self.max_workers + self.max_queue:
+            logger.warning(f"Upstream pool saturated ({self.pending} pending), rejecting fetch")
+            raise UpstreamBusyError("Upstream worker pool is saturated")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        self.pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise UpstreamBusyError(f"Upstream fetch waited {self.queue_timeout:.1f}s for a slot") from None
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self._slots.release()
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        """Stop the worker threads (waits for in-flight fetches)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            logger.info("Upstream executor shut down")
+
+
+# Single instance used across the entire app
+upstream_executor = UpstreamExecutor(
+    max_workers=settings.UPSTREAM_MAX_WORKERS,
+    max_queue=settings.UPSTREAM_MAX_QUEUE,
+    queue_timeout=settings.UPSTREAM_QUEUE_TIMEOUT
+)
@@ -0,0 +1,218 @@
+"""
+Canonical cache keys for (keyword, timeframe, geo) requests.
+
+Requests that mean the same thing share one key:
+- keywords are NFKC-normalized and case-folded, and runs of whitespace,
+  hyphens and underscores collapse to one separator
+  ("SPECTRUM-internet", " spectrum  internet" -> spectrum_internet), except
+  a hyphen starting a word, Google's exclusion operator ("tv -cable")
+- geo codes are upper-cased and validated ("us-ny" -> US-NY)
+- timeframes are resolved to their window: "today 1-y" and an explicit
+  date range covering the last 12 months both become "today 12-m"
+
+Relative timeframes keep their relative spelling rather than being pinned
+to dates, so keys don't all rotate (and go cold) at midnight.
+
+Keys look like `{namespace}:{version}:{keyword}:{timeframe}:{geo}`. The
+version is a digest of the response models' schemas and the storage
+format (or CACHE_KEY_VERSION when set), so a model or format change moves
+to new keys without a manual flush; the old entries simply expire.
+"""
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from app.core import codec
+from app.core.config import settings
+from app.core.exceptions import InvalidRequestError
+from app.models.trends import CompareResponse, TrendAnalytics, TrendResponse
+
+# Earliest date Google Trends has data for ("all")
+TRENDS_EPOCH = date(2004, 1, 1)
+
+# Whitespace, underscores and hyphens inside or after a word. A hyphen that
+# starts a word is Google's exclusion operator ("tv -cable"), so it is kept.
+SEPARATORS = re.compile(r"[\s_]+|(?<=[^\s_\-])-+|-+(?=[\s_]|$)")
+GEO_CODE = re.compile(r"[A-Z]{2}(-[A-Z0-9]{1,3}){0,2}")
+RELATIVE = re.compile(r"today (\d+)-([my])")
+RECENT = re.compile(r"now (\d+)-([hd])")
+DATE_RANGE = re.compile(r"(\d{4}-\d{2}-\d{2}) (\d{4}-\d{2}-\d{2})")
+HOUR_RANGE = re.compile(r"(\d{4}-\d{2}-\d{2}t\d{2}) (\d{4}-\d{2}-\d{2}t\d{2})")
+# Relative windows Google Trends offers itself. The canonical timeframe is
+# also what gets fetched, so an explicit range only becomes one of these;
+# "today 6-m" may not be served, or not as the same window.
+GOOGLE_WINDOWS = {"today 1-m", "today 3-m", "today 12-m", "today 5-y"}
+
+
+def schema_version() -> str:
+    """Short digest of the cached response models' JSON schemas and the storage format"""
+    schemas = [model.model_json_schema() for model in (TrendResponse, CompareResponse, TrendAnalytics)]
+    return hashlib.sha1(json.dumps([schemas, codec.STORAGE_FORMAT], sort_keys=True).encode()).hexdigest()[:8]
+
+
+KEY_VERSION = settings.CACHE_KEY_VERSION or schema_version()
+
+
+@lru_cache(maxsize=4096)
+def canonical_keyword(keyword: str) -> str:
+    """Keyword as it appears in cache keys (spaces become underscores)"""
+    text = unicodedata.normalize("NFKC", keyword).casefold()
+    text = SEPARATORS.sub(" ", text).strip()
+    if not text:
+        raise InvalidRequestError("Keyword must not be empty")
+    return text.replace(" ", "_")
+
+
+@lru_cache(maxsize=512)
+def canonical_geo(geo: str) -> str:
+    """Upper-cased geo code ("" is worldwide); rejects anything that isn't one"""
+    code = geo.strip().upper()
+    if code and not GEO_CODE.fullmatch(code):
+        raise InvalidRequestError(f"Invalid geo code: {geo!r}")
+    return code
+
+
+def _months_before(day: date, months: int) -> date:
+    """day minus a number of months, clamped to the end of shorter months"""
+    total = day.year * 12 + day.month - 1 - months
+    year, month = divmod(total, 12)
+    month += 1
+    for d in (day.day, 30, 29, 28):
+        try:
+            return date(year, month, d)
+        except ValueError:
+            continue
+    raise ValueError(f"No date {months} months before {day}")
+
+
+def _relative(months: int) -> str:
+    """Spelling Google Trends accepts: months up to a year, whole years beyond"""
+    if months > 12 and months % 12 == 0:
+        return f"today {months // 12}-y"
+    return f"today {months}-m"
+
+
+def _parse_date(text: str, timeframe: str) -> date:
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise InvalidRequestError(f"Invalid date in timeframe: {timeframe!r}") from None
+
+
+def _relative_window(start: date, end: date, today: date) -> Optional[str]:
+    """The Google window an explicit range ending today (or yesterday) is equivalent to"""
+    if end not in (today, today - timedelta(days=1)):
+        return None
+    if start <= TRENDS_EPOCH:
+        return "all"
+    months = (end.year - start.year) * 12 + end.month - start.month
+    for n in (months - 1, months, months + 1):
+        if _relative(n) in GOOGLE_WINDOWS and abs((_months_before(end, n) - start).days) <= 1:
+            return _relative(n)
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _canonical_timeframe(timeframe: str, today: date) -> str:
+    text = " ".join(timeframe.split()).lower()
+    if text == "all":
+        return "all"
+    match = RELATIVE.fullmatch(text)
+    if match:
+        n = int(match.group(1)) * (12 if match.group(2) == "y" else 1)
+        if n <= 0:
+            raise InvalidRequestError(f"Invalid timeframe: {timeframe!r}")
+        return _relative(n)
+    match = RECENT.fullmatch(text)
+    if match:
+        return f"now {int(match.group(1))}-{'H' if match.group(2) == 'h' else 'd'}"
+    match = DATE_RANGE.fullmatch(text)
+    if match:
+        start, end = (_parse_date(g, timeframe) for g in match.groups())
+        if start > end:
+            raise InvalidRequestError(f"Timeframe starts after it ends: {timeframe!r}")
+        return _relative_window(start, end, today) or f"{start} {end}"
+    match = HOUR_RANGE.fullmatch(text)
+    if match:
+        return " ".join(g.upper() for g in match.groups())
+    raise InvalidRequestError(f"Unsupported timeframe: {timeframe!r}")
+
+
+def canonical_timeframe(timeframe: str, today: Optional[date] = None) -> str:
+    """Timeframe resolved to its window, so equivalent spellings share a key"""
+    return _canonical_timeframe(timeframe, today or date.today())
+
+
+@dataclass(frozen=True)
+class RequestKey:
+    keyword: str
+    timeframe: str
+    geo: str
+    # Whether the old lowercase/underscore key would have differed
+    changed: bool
+
+    def cache_key(self, namespace: str) -> str:
+        return f"{namespace}:{KEY_VERSION}:{self.keyword}:{self.timeframe}:{self.geo}"
+
+
+def request_key(keyword: str, timeframe: str, geo: str) -> RequestKey:
+    """Canonical form of a request; raises InvalidRequestError for unusable input"""
+    canonical = (canonical_keyword(keyword), canonical_timeframe(timeframe), canonical_geo(geo))
+    legacy = (keyword.lower().replace(" ", "_"), timeframe, geo)
+    return RequestKey(*canonical, changed=canonical != legacy)
+
+
+def cache_key(namespace: str, keyword: str, timeframe: str, geo: str) -> str:
+    """Versioned cache key for one keyword's data"""
+    return request_key(keyword, timeframe, geo).cache_key(namespace)
+
+
+def compare_key(keywords: list[str], timeframe: str, geo: str) -> str:
+    """Versioned cache key for a keyword set (order does not matter)"""
+    clean = ",".join(sorted({canonical_keyword(k) for k in keywords}))
+    return f"compare:{KEY_VERSION}:{clean}:{canonical_timeframe(timeframe)}:{canonical_geo(geo)}"
+
+
+class KeyStats:
+    """
+    How much canonicalization helps the hit ratio.
+    `normalized` counts lookups whose old-style key would have been
+    different; their hits (`recovered`) would likely have been misses.
+    """
+
+    def __init__(self):
+        self.lookups = 0
+        self.hits = 0
+        self.normalized = 0
+        self.recovered = 0
+        self._lock = threading.Lock()
+
+    def record(self, key: RequestKey, hit: bool):
+        with self._lock:
+            self.lookups += 1
+            self.hits += hit
+            self.normalized += key.changed
+            self.recovered += hit and key.changed
+
+    def as_dict(self) -> dict:
+        lookups = self.lookups or 1
+        return {
+            "version": KEY_VERSION,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "normalized": self.normalized,
+            "recovered_hits": self.recovered,
+            "hit_ratio": round(self.hits / lookups, 4),
+            # What the hit ratio would have been with raw keys
+            "hit_ratio_without_normalization": round((self.hits - self.recovered) / lookups, 4)
+        }
+
+
+# Single instance used across the entire app
+key_stats = KeyStats()
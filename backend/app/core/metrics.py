@@ -0,0 +1,129 @@
+"""
+Prometheus metrics and per-request stage timings.
+
+Histograms and counters live in the default prometheus_client registry
+and are exposed on GET /metrics. With several uvicorn workers, set
+PROMETHEUS_MULTIPROC_DIR so every worker's samples are aggregated.
+
+Each HTTP request also collects its own stage durations (redis, upstream,
+convert, serialize, ...) which the middleware in app/main.py reports in a
+Server-Timing header.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+# Cache lookups are sub-millisecond, upstream fetches take seconds
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=SLOW_BUCKETS
+)
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command latency",
+    ["command"],
+    buckets=FAST_BUCKETS
+)
+UPSTREAM_LATENCY = Histogram(
+    "trends_upstream_duration_seconds",
+    "Google Trends call time per widget (build_payload included)",
+    ["widget"],
+    buckets=SLOW_BUCKETS
+)
+CONVERT_LATENCY = Histogram(
+    "trends_convert_duration_seconds",
+    "DataFrame to response model conversion time per fetch",
+    ["namespace"],
+    buckets=FAST_BUCKETS
+)
+SERIALIZE_LATENCY = Histogram(
+    "cache_serialize_duration_seconds",
+    "Time to serialize and pack a value for the cache",
+    ["namespace"],
+    buckets=FAST_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by namespace, tier (l1/l2) and result (hit/stale/miss)",
+    ["namespace", "tier", "result"]
+)
+CACHE_ERRORS = Counter(
+    "cache_errors_total",
+    "Redis errors by namespace and operation",
+    ["namespace", "operation"]
+)
+UPSTREAM_ERRORS = Counter(
+    "trends_upstream_errors_total",
+    "Failed Google Trends attempts by namespace and kind (rate_limited/error)",
+    ["namespace", "kind"]
+)
+
+# Stage durations of the current HTTP request, in seconds (None outside one)
+_request_timings: ContextVar[Optional[dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def namespace(key: str) -> str:
+    """Metric label for a cache key: its prefix (trends, region, iot, ...)"""
+    return key.split(":", 1)[0]
+
+
+def start_request_timings() -> dict[str, float]:
+    """
+    Begin collecting stage timings for the current request.
+    Tasks spawned by the request copy the context, and so share the dict.
+    """
+    timings: dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def add_timing(stage: str, seconds: float):
+    """Add to the current request's time for stage (no-op outside a request)"""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(histogram, *labels: str, stage: Optional[str] = None) -> Iterator[None]:
+    """Observe a block's duration in histogram, and in the request's timings under stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        histogram.labels(*labels).observe(elapsed)
+        if stage:
+            add_timing(stage, elapsed)
+
+
+def server_timing(timings: dict[str, float], total: float) -> str:
+    """Server-Timing header value, durations in milliseconds"""
+    parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def render() -> tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
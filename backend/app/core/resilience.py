@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import random
+import time
+
+from app.core.exceptions import UpstreamBusyError, UpstreamUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, floor: float = 0.0) -> float:
+    """
+    Full-jitter exponential backoff for the given retry attempt (0-based),
+    never shorter than floor (e.g. the server's Retry-After).
+    """
+    return max(random.uniform(0, min(cap, base * 2 ** attempt)), floor)
+
+
+class CircuitBreaker:
+    """
+    Fails fast once the upstream keeps failing.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    check() raises straight away, so callers fall back to stale cache
+    instead of queueing more requests against a service that is rejecting
+    them. After `reset_timeout` seconds one trial call is let through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    @property
+    def available(self) -> bool:
+        """Whether a call would currently be let through"""
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self._trial_running)
+
+    def check(self):
+        """Raise UpstreamUnavailableError unless a call may go ahead"""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half-open" and not self._trial_running:
+            self._trial_running = True
+            logger.info(f"Circuit {self.name} half-open, letting a trial call through")
+            return
+        retry_after = self.reset_timeout - (time.monotonic() - self.opened_at)
+        raise UpstreamUnavailableError(f"{self.name} is unavailable (circuit open)", retry_after=retry_after)
+
+    def release(self):
+        """End a call that never reached the upstream, without a verdict"""
+        self._trial_running = False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"Circuit {self.name} closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial_running:
+                logger.warning(f"Circuit {self.name} open after {self.failures} failures")
+            self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class RateLimiter:
+    """
+    Token bucket for upstream calls: `rate` calls per second with bursts of
+    up to `burst`. The bucket lives in Redis so every worker draws from the
+    same budget; without Redis it is kept in process. A rate of 0 disables
+    limiting. `cache` is the CacheService holding the shared bucket (None
+    for a process-local limiter).
+    """
+
+    def __init__(self, key: str, rate: float, burst: int, cache=None):
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self.cache = cache
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _reserve_local(self, max_wait: float) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        if wait <= max_wait:
+            self._tokens -= 1
+        return wait
+
+    async def acquire(self, max_wait: float):
+        """
+        Wait for a slot. Raises UpstreamBusyError (without using up a
+        token) if the slot is more than max_wait seconds away.
+        """
+        if self.rate <= 0:
+            return
+        max_wait = max(max_wait, 0.0)
+        wait = None
+        if self.cache is not None:
+            wait = await self.cache.reserve_token(self.key, self.rate, self.burst, max_wait)
+        if wait is None:
+            wait = self._reserve_local(max_wait)
+        if wait > max_wait:
+            raise UpstreamBusyError(f"Upstream rate limit reached, next slot in {wait:.1f}s")
+        if wait > 0:
+            await asyncio.sleep(wait)
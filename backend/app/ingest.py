@@ -0,0 +1,94 @@
+"""
+Bulk keyword ingestion from the command line.
+
+Run from backend/:
+    python -m app.ingest submit --file keywords.txt --timeframe "today 12-m" --geo US
+    python -m app.ingest worker            # run one worker process (start several for more)
+    python -m app.ingest status <job_id>
+    python -m app.ingest resume <job_id>
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+
+from app.core.cache import cache_service
+from app.core.executor import upstream_executor
+from app.services.ingest import ingest_queue
+from app.services.trends_service import trends_service
+
+logger = logging.getLogger(__name__)
+
+
+def read_keywords(args) -> list[str]:
+    keywords = list(args.keywords)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            keywords.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return keywords
+
+
+async def run_worker(once: bool):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, ingest_queue.stop)
+    logger.info(f"Ingest worker {ingest_queue.worker_id} started")
+    await ingest_queue.work(trends_service, once=once)
+    logger.info(f"Ingest worker {ingest_queue.worker_id} stopped")
+
+
+async def main(args) -> int:
+    await cache_service.connect()
+    if not cache_service.redis:
+        print("Bulk ingestion needs Redis (check REDIS_URL)", file=sys.stderr)
+        return 1
+    try:
+        if args.command == "worker":
+            await run_worker(args.once)
+            return 0
+        if args.command == "submit":
+            try:
+                job_id = await ingest_queue.submit(read_keywords(args), args.timeframe, args.geo)
+            except ValueError as e:
+                print(e, file=sys.stderr)
+                return 1
+        else:
+            job_id = args.job_id
+            if args.command == "resume":
+                print(f"Re-queued {await ingest_queue.resume(job_id)} batches")
+        status = await ingest_queue.status(job_id)
+        if status is None:
+            print(f"Unknown ingest job: {job_id}", file=sys.stderr)
+            return 1
+        print(status.model_dump_json(indent=2))
+        return 0
+    finally:
+        await cache_service.disconnect()
+        upstream_executor.shutdown()
+        await trends_service.aclose()
+
+
+def cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="queue keywords for warming")
+    submit.add_argument("keywords", nargs="*")
+    submit.add_argument("--file", help="file with one keyword per line")
+    submit.add_argument("--timeframe", default="today 12-m")
+    submit.add_argument("--geo", default="US")
+
+    worker = commands.add_parser("worker", help="process queued batches")
+    worker.add_argument("--once", action="store_true", help="exit when the queue is empty")
+
+    for name, help_text in (("status", "show job progress"), ("resume", "re-queue unfinished and failed batches")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("job_id")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(asyncio.run(main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    cli()
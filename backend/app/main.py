@@ -6,11 +6,18 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 
 from contextlib import asynccontextmanager
+import asyncio
 import logging
+import time
 
 from app.core.config import settings
 from app.core.cache import cache_service
-from app.api.routes import health, trends
+from app.core.executor import upstream_executor
+from app.core.metrics import REQUEST_LATENCY, server_timing, start_request_timings
+from app.services.hot_keywords import hot_keywords
+from app.services.trends_service import trends_service
+from app.services.worker_stats import worker_stats
+from app.api.routes import admin, health, metrics, trends
 
 
 
@@ -26,19 +33,30 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """
     Runs on startup and shutdown.
-    Startup: connect to Redis
-    Shutdown: disconnect from Redis
+    Startup: connect to Redis, start hot keyword warming and stats
+    reporting (and load the upstream stack when UPSTREAM_PRELOAD is set)
+    Shutdown: stop warming and reporting, disconnect from Redis, stop upstream workers,
+    close the upstream client and the series store
     """
     # Startup
     logger.info("Starting Spectrum Insights API...")
     await cache_service.connect()
+    if settings.UPSTREAM_PRELOAD:
+        # Otherwise pytrends/pandas load with the first fetch
+        await asyncio.to_thread(trends_service.load_upstream)
+    hot_keywords.start(trends_service)
+    worker_stats.start(trends_service)
     logger.info("Startup complete")
 
     yield  # app runs here
 
     # Shutdown
     logger.info("Shutting down Spectrum Insights API...")
+    await hot_keywords.stop()
+    await worker_stats.stop()
     await cache_service.disconnect()
+    upstream_executor.shutdown()
+    await trends_service.aclose()
     logger.info("Shutdown complete")
 
 
@@ -59,6 +77,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """
+    Observe route latency and report where the time went in a
+    Server-Timing header (redis, upstream, convert, serialize, total).
+    For streamed responses the header only covers time to first byte.
+    """
+    timings = start_request_timings()
+    start = time.perf_counter()
+    response = await call_next(request)
+    total = time.perf_counter() - start
+    route = request.scope.get("route")
+    REQUEST_LATENCY.labels(
+        request.method,
+        route.path if route else "unmatched",
+        response.status_code
+    ).observe(total)
+    response.headers["Server-Timing"] = server_timing(timings, total)
+    return response
+
 @app.options("/{rest_of_path:path}")
 async def preflight_handler(request: Request, rest_of_path: str):
     return JSONResponse(
@@ -72,7 +111,9 @@ async def preflight_handler(request: Request, rest_of_path: str):
 
 # Include routers
 app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
 app.include_router(trends.router, prefix="/api", tags=["Trends"])
+app.include_router(admin.router, prefix="/api", tags=["Admin"])
 
 
 @app.get("/")
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class IngestRequest(BaseModel):
+    keywords: list[str]
+    timeframe: str = "today 12-m"
+    geo: str = "US"
+
+
+class IngestJobStatus(BaseModel):
+    job_id: str
+    status: str  # queued, running or done
+    timeframe: str
+    geo: str
+    keywords: int
+    batches: int
+    batches_done: int = 0
+    fetched: int = 0  # keywords fetched from Google Trends
+    skipped: int = 0  # keywords that were already fresh in the cache
+    failed: dict[str, str] = {}  # keyword -> last error
+    created_at: float
+    finished_at: Optional[float] = None
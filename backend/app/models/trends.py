@@ -8,6 +8,10 @@ class TrendRequest(BaseModel):
     geo: str = "US"  # United States by default
 
 
+class BatchTrendRequest(BaseModel):
+    items: list[TrendRequest]
+
+
 class InterestOverTimeData(BaseModel):
     date: str
     value: int
@@ -32,6 +36,48 @@ class TrendResponse(BaseModel):
     rising_queries: list[WordCloudItem] = []
 
 
+class CompareResponse(BaseModel):
+    keywords: list[str]
+    # interest_over_time in every comparison shares one 0–100 scale
+    comparisons: list[TrendResponse] = []
+
+
+class AnalyticsPoint(BaseModel):
+    date: str
+    value: int
+    rolling_mean: float
+    change: Optional[int] = None  # vs the previous point
+    yoy_change: Optional[int] = None  # vs the same point a year earlier
+    zscore: Optional[float] = None  # vs the preceding baseline points
+    anomaly: bool = False
+
+
+class AnalyticsSummary(BaseModel):
+    latest: Optional[int] = None
+    mean: Optional[float] = None
+    change: Optional[int] = None
+    yoy_change: Optional[int] = None
+    anomalies: int = 0
+    last_anomaly: Optional[str] = None
+
+
+class TrendAnalytics(BaseModel):
+    keyword: str
+    window: int  # points in each rolling mean
+    series: list[AnalyticsPoint] = []
+    summary: AnalyticsSummary
+
+
+class Suggestion(BaseModel):
+    text: str
+    score: float  # popularity across every fetch the term appeared in
+
+
+class SuggestResponse(BaseModel):
+    query: str
+    suggestions: list[Suggestion] = []
+
+
 class HealthResponse(BaseModel):
     status: str
     version: str
@@ -0,0 +1,84 @@
+"""
+Derived analytics for an interest-over-time series.
+
+Computed with whole-column pandas operations whenever the series is
+fetched, and cached next to it, so page views only read the result:
+- rolling_mean: mean of the last `window` points
+- change: difference from the previous point
+- yoy_change: difference from the same point a year earlier (daily,
+  weekly and monthly series only)
+- zscore / anomaly: distance from the mean of the previous `baseline`
+  points, in standard deviations; |z| >= threshold flags an anomaly
+"""
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.models.trends import InterestOverTimeData
+from app.services.series_store import infer_step
+
+# Points in a year for each series step
+PERIODS_PER_YEAR = {"D": 365, "W": 52, "M": 12}
+
+
+def _nullable(values: pd.Series, decimals: Optional[int] = None) -> list:
+    """Column as a JSON-ready list, NaN as None"""
+    array = values.to_numpy(dtype=float)
+    if decimals is not None:
+        array = np.round(array, decimals)
+    return [None if np.isnan(v) else (float(v) if decimals else int(v)) for v in array]
+
+
+def analyze(points: list[InterestOverTimeData], window: int, baseline: int, threshold: float) -> dict[str, Any]:
+    """The analytics body for a series (see the module docstring)"""
+    if not points:
+        return {"window": window, "series": [], "summary": {"anomalies": 0}}
+
+    dates = [p.date for p in points]
+    values = pd.Series([p.value for p in points], index=pd.to_datetime(dates), dtype=float)
+
+    rolling_mean = values.rolling(window, min_periods=1).mean()
+    change = values.diff()
+    periods = PERIODS_PER_YEAR.get(infer_step(values.index))
+    yoy_change = values - values.shift(periods) if periods else pd.Series(np.nan, index=values.index)
+
+    # Baseline excludes the point itself, so a spike can't hide in its own mean
+    previous = values.shift(1).rolling(baseline, min_periods=baseline)
+    spread = previous.std(ddof=0).replace(0, np.nan)
+    zscore = (values - previous.mean()) / spread
+    anomaly = (zscore.abs() >= threshold).tolist()
+
+    series = [
+        {
+            "date": d,
+            "value": int(v),
+            "rolling_mean": m,
+            "change": c,
+            "yoy_change": y,
+            "zscore": z,
+            "anomaly": a
+        }
+        for d, v, m, c, y, z, a in zip(
+            dates,
+            values.tolist(),
+            _nullable(rolling_mean, 2),
+            _nullable(change),
+            _nullable(yoy_change),
+            _nullable(zscore, 2),
+            anomaly
+        )
+    ]
+    latest = series[-1]
+    return {
+        "window": window,
+        "series": series,
+        "summary": {
+            "latest": latest["value"],
+            "mean": round(float(values.mean()), 2),
+            "change": latest["change"],
+            "yoy_change": latest["yoy_change"],
+            "anomalies": int(sum(anomaly)),
+            "last_anomaly": next((p["date"] for p in reversed(series) if p["anomaly"]), None)
+        }
+    }
@@ -0,0 +1,156 @@
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import requests
+from pytrends.exceptions import ResponseError, TooManyRequestsError
+from pytrends.request import BASE_TRENDS_URL, TrendReq
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+from app.core.exceptions import UpstreamBusyError
+from app.services.fetch_plan import FetchPlan
+
+logger = logging.getLogger(__name__)
+
+# Google sends JSON under any of these
+JSON_CONTENT_TYPES = ("application/json", "application/javascript", "text/javascript")
+
+
+class PooledTrendReq(TrendReq):
+    """
+    TrendReq that keeps one keep-alive HTTP session for its whole life.
+
+    Stock TrendReq opens a new session (new connection, new TLS handshake)
+    for every request and fetches the NID cookie in __init__. Here the
+    cookie is fetched on the first request and reused, along with the
+    connection, until the client is evicted. pytrends' own retries and
+    proxy rotation are not used — retries happen in TrendsService.
+    With TRENDS_BASE_URL set, requests go to that server instead of Google.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def _url(url: str) -> str:
+        """url, pointed at TRENDS_BASE_URL when one is configured"""
+        if settings.TRENDS_BASE_URL and url.startswith(BASE_TRENDS_URL):
+            return settings.TRENDS_BASE_URL.rstrip("/") + url[len(BASE_TRENDS_URL):]
+        return url
+
+    def GetGoogleCookie(self):
+        # Deferred to the first request, so creating a client costs nothing
+        return None
+
+    def _fetch_cookie(self) -> dict:
+        response = self.session.get(
+            self._url(f"{BASE_TRENDS_URL}/explore/?geo={self.hl[-2:]}"),
+            timeout=self.timeout,
+            headers=self.headers,
+            **self.requests_args
+        )
+        return {name: value for name, value in response.cookies.items() if name == "NID"}
+
+    def _get_data(self, url, method=TrendReq.GET_METHOD, trim_chars=0, **kwargs):
+        """Send a request on the pooled session and parse the JSON response"""
+        if self.cookies is None:
+            self.cookies = self._fetch_cookie()
+        send = self.session.post if method == TrendReq.POST_METHOD else self.session.get
+        response = send(
+            self._url(url),
+            timeout=self.timeout,
+            cookies=self.cookies,
+            headers=self.headers,
+            **kwargs,
+            **self.requests_args
+        )
+        content_type = response.headers.get("Content-Type", "")
+        if response.status_code == 200 and any(t in content_type for t in JSON_CONTENT_TYPES):
+            # Responses start with garbage like ")]}'," before the JSON
+            return json.loads(response.text[trim_chars:])
+        if response.status_code == requests.codes.too_many_requests:
+            raise TooManyRequestsError.from_response(response)
+        raise ResponseError.from_response(response)
+
+    def close(self):
+        self.session.close()
+
+
+class TrendReqPool:
+    """
+    Fixed-size pool of pytrends clients, leased to one fetch at a time.
+
+    build_payload stores its tokens on the client, so a client must never
+    serve two fetches at once; a lease gives the fetch exclusive use of one
+    and up to `size` fetches run in parallel. Clients are created lazily
+    and reused most-recently-used first, keeping their warm connection and
+    cookie. A client that gets `max_rate_limits` 429s in a row is evicted,
+    and a fresh one (new session, new cookie) takes its place on demand.
+    """
+
+    def __init__(self, factory: Callable[[], TrendReq], size: int, max_rate_limits: int, lease_timeout: float):
+        self._factory = factory
+        self.size = size
+        self.max_rate_limits = max_rate_limits
+        self.lease_timeout = lease_timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: list[TrendReq] = []
+        # Consecutive 429s, by client id
+        self._rate_limited: dict[int, int] = {}
+        self.created = 0
+        self.evicted = 0
+
+    def _checkout(self) -> TrendReq:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        logger.info("Creating Google Trends client")
+        return self._factory()
+
+    def _checkin(self, client: TrendReq, failures: list[Exception]):
+        key = id(client)
+        with self._lock:
+            if any(isinstance(e, TooManyRequestsError) for e in failures):
+                self._rate_limited[key] = self._rate_limited.get(key, 0) + 1
+            elif not failures:
+                self._rate_limited.pop(key, None)
+
+            if self._rate_limited.get(key, 0) < self.max_rate_limits:
+                self._idle.append(client)
+                return
+            self._rate_limited.pop(key, None)
+            self.evicted += 1
+        logger.warning(f"Evicting Google Trends client after {self.max_rate_limits} rate-limited fetches")
+        if hasattr(client, "close"):
+            client.close()
+
+    @contextmanager
+    def lease(self, plan: FetchPlan) -> Iterator[TrendReq]:
+        """
+        Give plan exclusive use of a client for one attempt.
+        The client's health is updated from the plan's failures on return.
+        """
+        if not self._slots.acquire(timeout=self.lease_timeout):
+            raise UpstreamBusyError(f"No Google Trends client free after {self.lease_timeout:.0f}s")
+        try:
+            client = self._checkout()
+            plan.use(client)
+            try:
+                yield client
+            finally:
+                self._checkin(client, plan.failures)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {"size": self.size, "idle": idle, "created": self.created, "evicted": self.evicted}
@@ -0,0 +1,46 @@
+"""
+Vectorized DataFrame -> model conversion for pytrends results.
+
+Each function works on whole columns (no iterrows), and builds models
+with model_construct: the column dtypes already guarantee the field types,
+so per-row validation would only repeat work.
+"""
+from app.models.trends import InterestOverTimeData, RegionData, WordCloudItem
+
+
+def interest_over_time_records(df, keyword: str) -> list[InterestOverTimeData]:
+    """Convert an interest_over_time() frame into one point per date"""
+    if df is None or df.empty or keyword not in df.columns:
+        return []
+    dates = df.index.strftime("%Y-%m-%d").tolist()
+    values = df[keyword].astype(int).tolist()
+    return [
+        InterestOverTimeData.model_construct(date=d, value=v, keyword=keyword)
+        for d, v in zip(dates, values)
+    ]
+
+
+def region_records(df, keyword: str, limit: int = 20) -> list[RegionData]:
+    """Convert an interest_by_region() frame into the top regions with interest"""
+    if df is None or df.empty or keyword not in df.columns:
+        return []
+    values = df[keyword].astype(int)
+    # nlargest keeps the frame's (alphabetical) order between equal values
+    top = values[values > 0].nlargest(limit, keep="first")
+    return [
+        RegionData.model_construct(region=str(region), value=value)
+        for region, value in zip(top.index.tolist(), top.tolist())
+    ]
+
+
+def query_records(df, limit: int = 20, breakout_value: int = 100) -> list[WordCloudItem]:
+    """Convert a related_queries() top/rising frame into word cloud items"""
+    if df is None or df.empty:
+        return []
+    head = df.head(limit)
+    # Rising queries report "Breakout" instead of a percentage
+    values = head["value"].where(head["value"] != "Breakout", breakout_value).astype(int)
+    return [
+        WordCloudItem.model_construct(text=text, value=value)
+        for text, value in zip(head["query"].astype(str).tolist(), values.tolist())
+    ]
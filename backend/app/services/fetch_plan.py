@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+
+from pytrends.exceptions import ResponseError, TooManyRequestsError
+
+from app.core.metrics import CONVERT_LATENCY, UPSTREAM_LATENCY, add_timing
+
+logger = logging.getLogger(__name__)
+
+
+def network_errors() -> tuple[type[Exception], ...]:
+    """Connection and timeout errors of both HTTP stacks (imported with the first failure)"""
+    import httpx
+    from requests import RequestException
+    return RequestException, httpx.TransportError
+
+
+# Raised parsing a response whose shape Google changed (bad JSON, missing
+# fields, unexpected values). pytrends returns empty frames for no data.
+PARSE_ERRORS = (KeyError, IndexError, TypeError, ValueError)
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """
+    Whether an error means Google Trends could not be reached, refused
+    the request or sent something unparseable, as opposed to a response
+    that simply has no data.
+    """
+    return isinstance(error, (ResponseError, *network_errors(), *PARSE_ERRORS))
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether retrying later may succeed (rate limited, 5xx, network trouble)"""
+    if isinstance(error, (TooManyRequestsError, *network_errors())):
+        return True
+    return isinstance(error, ResponseError) and error.response is not None and error.response.status_code >= 500
+
+
+def retry_after(error: Exception) -> float:
+    """Seconds the upstream asked us to wait (Retry-After), or 0"""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("Retry-After", 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class FetchPlan:
+    """
+    One upstream fetch for a (keywords, timeframe, geo) request.
+
+    The pytrends payload is built lazily on first use and its widget
+    tokens are reused for every widget fetched through the plan, so a
+    full trends fetch costs one token handshake instead of three.
+    Widget results are memoized, so several keywords of a batched payload
+    can read the same DataFrame without another round trip.
+    Wall-clock time for every stage is recorded in `timings` (seconds)
+    and reported to the metrics histograms by observe().
+    Upstream errors are kept in `failures` (with those converting the
+    results, see note_failure); reset_failures() lets a retry refetch only
+    the widgets that failed.
+    """
+
+    def __init__(self, client, keywords: list[str], timeframe: str, geo: str, namespace: str = "trends"):
+        # client may be None until the plan is leased one (see TrendReqPool)
+        self.client = client
+        self.keywords = keywords
+        self.timeframe = timeframe
+        self.geo = geo
+        # Cache namespace the result is stored under (metrics label)
+        self.namespace = namespace
+        self.timings: dict[str, float] = {}
+        self._built = False
+        self._build_error: Exception | None = None
+        self._results: dict = {}
+        self._convert_errors: list[Exception] = []
+
+    def use(self, client):
+        """Make the remaining calls with client (the payload is rebuilt on it)"""
+        if client is not self.client:
+            self.client = client
+            self._built = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block of work under the given stage name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def build(self):
+        """Build the payload once; later calls reuse the tokens (or the failure)"""
+        if self._built:
+            return
+        if self._build_error is not None:
+            # Don't retry the handshake for every widget once it has failed
+            raise self._build_error
+        try:
+            with self.stage("build_payload"):
+                self.client.build_payload(
+                    self.keywords,
+                    timeframe=self.timeframe,
+                    geo=self.geo
+                )
+        except Exception as e:
+            self._build_error = e
+            raise
+        self._built = True
+
+    def _widget(self, name: str, fetch, payload: bool = True):
+        """Fetch a widget once per plan, replaying the result (or error) afterwards"""
+        if name not in self._results:
+            try:
+                if payload:
+                    self.build()
+                with self.stage(name):
+                    self._results[name] = (fetch(), None)
+            except Exception as e:
+                self._results[name] = (None, e)
+        result, error = self._results[name]
+        if error is not None:
+            raise error
+        return result
+
+    def interest_over_time(self):
+        """Fetch the TIMESERIES widget as a DataFrame"""
+        return self._widget("interest_over_time", self.client.interest_over_time)
+
+    def interest_over_time_tail(self, timeframe: str):
+        """
+        Fetch the TIMESERIES widget for a different (shorter) timeframe of
+        the plan's keywords, e.g. only the points newer than stored history.
+        This builds its own payload, so the plan's is rebuilt if needed later.
+        """
+        def fetch():
+            self._built = False
+            self.client.build_payload(self.keywords, timeframe=timeframe, geo=self.geo)
+            return self.client.interest_over_time()
+        return self._widget("interest_over_time_tail", fetch, payload=False)
+
+    def interest_by_region(self, resolution: str = 'REGION'):
+        """Fetch the GEO_MAP widget as a DataFrame"""
+        return self._widget(
+            "interest_by_region",
+            lambda: self.client.interest_by_region(resolution=resolution)
+        )
+
+    def related_queries(self) -> dict:
+        """Fetch the RELATED_QUERIES widgets as {keyword: {'top': df, 'rising': df}}"""
+        return self._widget("related_queries", self.client.related_queries)
+
+    def note_failure(self, error: Exception):
+        """Count an error converting a widget's response (if it is one) among the failures"""
+        self._convert_errors.append(error)
+
+    @property
+    def failures(self) -> list[Exception]:
+        """Upstream errors hit so far (empty when every call got a response)"""
+        errors = [error for _, error in self._results.values() if error is not None]
+        if self._build_error is not None:
+            errors.append(self._build_error)
+        # Widget errors are replayed to each caller, so may be noted again
+        errors += [e for e in self._convert_errors if not any(e is seen for seen in errors)]
+        return [e for e in errors if is_upstream_failure(e)]
+
+    @property
+    def fetched(self) -> bool:
+        """Whether at least one widget came back"""
+        return any(error is None for _, error in self._results.values())
+
+    def reset_failures(self):
+        """
+        Forget failed calls so the next use retries them. The payload is
+        rebuilt too: the client may have served other plans in between.
+        """
+        self._results = {name: r for name, r in self._results.items() if r[1] is None}
+        self._convert_errors = []
+        self._built = False
+        self._build_error = None
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+    def observe(self):
+        """Report stage timings to the metrics histograms and the current request"""
+        for name, seconds in self.timings.items():
+            if name == "convert":
+                CONVERT_LATENCY.labels(self.namespace).observe(seconds)
+            else:
+                UPSTREAM_LATENCY.labels(name).observe(seconds)
+        convert = self.timings.get("convert", 0.0)
+        add_timing("upstream", self.total - convert)
+        if convert:
+            add_timing("convert", convert)
+
+    def log_timings(self):
+        """Log per-stage timings for this plan"""
+        stages = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.timings.items())
+        logger.info(
+            f"Fetch timings for {self.keywords} ({self.timeframe}, {self.geo}): "
+            f"{stages or 'no upstream calls'} (total {self.total * 1000:.0f}ms)"
+        )
+
+
+class AsyncFetchPlan(FetchPlan):
+    """
+    FetchPlan for the async client (TRENDS_BACKEND=httpx).
+
+    The explore tokens are kept on the plan rather than on the client, so
+    one shared client serves every plan, and widgets can be fetched
+    concurrently: callers awaiting the same widget share one request.
+    Widget methods return records keyed by keyword instead of DataFrames.
+    Stage timings of concurrent widgets overlap, so `total` can exceed
+    the wall-clock time of the fetch.
+    """
+
+    def __init__(self, client, keywords: list[str], timeframe: str, geo: str, namespace: str = "trends"):
+        super().__init__(client, keywords, timeframe, geo, namespace=namespace)
+        self.widgets = None
+        self._build_lock = asyncio.Lock()
+        self._pending: dict[str, asyncio.Task] = {}
+
+    def use(self, client):
+        self.client = client
+
+    async def build(self):
+        """Explore once; later calls reuse the tokens (or the failure)"""
+        async with self._build_lock:
+            if self._build_error is not None:
+                raise self._build_error
+            if self.widgets is not None:
+                return
+            try:
+                with self.stage("build_payload"):
+                    self.widgets = await self.client.explore(self.keywords, self.timeframe, self.geo)
+            except Exception as e:
+                self._build_error = e
+                raise
+
+    async def _run(self, name: str, fetch, payload: bool):
+        try:
+            if payload:
+                await self.build()
+            with self.stage(name):
+                self._results[name] = (await fetch(), None)
+        except Exception as e:
+            self._results[name] = (None, e)
+
+    async def _widget(self, name: str, fetch, payload: bool = True):
+        """Fetch a widget once per plan, replaying the result (or error) afterwards"""
+        if name not in self._results:
+            if name not in self._pending:
+                self._pending[name] = asyncio.ensure_future(self._run(name, fetch, payload))
+            await asyncio.shield(self._pending[name])
+        result, error = self._results[name]
+        if error is not None:
+            raise error
+        return result
+
+    async def interest_over_time(self):
+        """Fetch the TIMESERIES widget as {keyword: points}"""
+        return await self._widget("interest_over_time", lambda: self.client.interest_over_time(self.widgets))
+
+    async def interest_over_time_tail(self, timeframe: str):
+        """
+        Fetch the TIMESERIES widget for a different (shorter) timeframe of
+        the plan's keywords. Its tokens are separate, so the plan's are kept.
+        """
+        async def fetch():
+            widgets = await self.client.explore(self.keywords, timeframe, self.geo)
+            return await self.client.interest_over_time(widgets)
+        return await self._widget("interest_over_time_tail", fetch, payload=False)
+
+    async def interest_by_region(self, resolution: str = 'REGION'):
+        """Fetch the GEO_MAP widget as {keyword: regions}"""
+        return await self._widget(
+            "interest_by_region",
+            lambda: self.client.interest_by_region(self.widgets, resolution=resolution)
+        )
+
+    async def related_queries(self) -> dict:
+        """Fetch the RELATED_QUERIES widgets as {keyword: (top, rising)}"""
+        return await self._widget("related_queries", lambda: self.client.related_queries(self.widgets))
+
+    def reset_failures(self):
+        """Forget failed calls (and a failed explore) so the next use retries them"""
+        self._results = {name: r for name, r in self._results.items() if r[1] is None}
+        self._pending = {name: task for name, task in self._pending.items() if name in self._results}
+        self._convert_errors = []
+        self._build_error = None
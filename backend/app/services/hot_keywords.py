@@ -0,0 +1,114 @@
+import asyncio
+import json
+import logging
+from collections import Counter
+
+from app.core.config import settings
+from app.core.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+HOT_KEY = "hot:requests"
+WARM_LOCK = "hot:warm"
+# Entries kept in the popularity set after each pass
+HOT_SET_LIMIT = 1000
+
+
+class HotKeywordTracker:
+    """
+    Tracks request popularity and keeps the top-N cache entries warm.
+
+    Requests are counted in memory (no Redis round trip on the hot path)
+    and flushed into a shared Redis sorted set once per pass, so the
+    ranking covers every worker. Scores decay every pass, so keys that
+    are no longer requested drop out. Each pass re-fetches any top key that
+    is missing or would go stale before the next pass. A Redis lock makes
+    sure only one worker warms per interval.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._task: asyncio.Task | None = None
+
+    def record(self, kind: str, keyword: str, timeframe: str, geo: str):
+        """Count one request for a cache entry"""
+        self._counts[json.dumps([kind, keyword, timeframe, geo])] += 1
+
+    async def flush(self):
+        """Push local counts into the shared popularity set"""
+        counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+
+        def queue(pipe):
+            for member, count in counts.items():
+                pipe.zincrby(HOT_KEY, count, member)
+
+        if await cache_service.pipeline(queue, name="hot_flush") is None:
+            # Keep counting locally until Redis is available, but only the
+            # entries the shared set would keep, so an outage can't grow it
+            counts.update(self._counts)
+            self._counts = Counter(dict(counts.most_common(HOT_SET_LIMIT)))
+
+    async def top(self, n: int) -> list[tuple[str, str, str, str]]:
+        """Most requested (kind, keyword, timeframe, geo) entries"""
+        replies = await cache_service.pipeline(lambda pipe: pipe.zrevrange(HOT_KEY, 0, n - 1), name="hot_top")
+        if replies is not None:
+            return [tuple(json.loads(m)) for m in replies[0]]
+        return [tuple(json.loads(m)) for m, _ in self._counts.most_common(n)]
+
+    async def decay(self):
+        """Age scores so yesterday's spikes stop being warmed"""
+        def queue(pipe):
+            pipe.zunionstore(HOT_KEY, {HOT_KEY: settings.HOT_KEYWORDS_DECAY})
+            pipe.zremrangebyrank(HOT_KEY, 0, -(HOT_SET_LIMIT + 1))
+
+        await cache_service.pipeline(queue, name="hot_decay")
+
+    async def warm_once(self, service) -> int:
+        """Run one warming pass; returns how many refreshes were scheduled"""
+        await self.flush()
+        token = await cache_service.acquire_lock(WARM_LOCK, ttl=max(settings.HOT_REFRESH_INTERVAL - 1, 1))
+        if token is None:
+            return 0  # another worker is warming this interval
+
+        scheduled = 0
+        for kind, keyword, timeframe, geo in await self.top(settings.HOT_KEYWORDS_TOP_N):
+            if await service.refresh_if_needed(kind, keyword, timeframe, geo, horizon=settings.HOT_REFRESH_INTERVAL):
+                scheduled += 1
+        await self.decay()
+        if scheduled:
+            logger.info(f"Warming {scheduled} hot cache entries")
+        return scheduled
+
+    async def _run(self, service):
+        # At startup too, so a fresh deploy starts warm. The lock means
+        # only one of the workers starting together runs the pass
+        warm_now = settings.HOT_WARM_ON_START
+        while True:
+            if not warm_now:
+                await asyncio.sleep(settings.HOT_REFRESH_INTERVAL)
+            warm_now = False
+            try:
+                await self.warm_once(service)
+            except Exception as e:
+                logger.error(f"Hot keyword warming failed: {e}")
+
+    def start(self, service):
+        """Start the background warming loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(service))
+
+    async def stop(self):
+        """Stop the background warming loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Single instance used across the entire app
+hot_keywords = HotKeywordTracker()
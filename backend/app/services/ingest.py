@@ -0,0 +1,235 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Optional
+
+from app.core.cache import cache_service
+from app.core.config import settings
+from app.core.exceptions import UpstreamBusyError, UpstreamUnavailableError
+from app.core.keys import canonical_geo, canonical_timeframe
+from app.models.ingest import IngestJobStatus
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "ingest:queue"
+BATCH_SIZE = 5  # keywords per Google Trends payload
+
+
+def job_key(job_id: str, part: str = "") -> str:
+    return f"ingest:job:{job_id}{':' + part if part else ''}"
+
+
+class IngestQueue:
+    """
+    Bulk keyword warming through a Redis work queue.
+
+    A job's keywords are split into batches of 5 and queued. Workers (see
+    `python -m app.ingest worker`) move a batch onto their own processing
+    list while they work on it, so a crashed worker's batch is put back by
+    the next worker that starts. Finished batches are checkpointed in the
+    job's done set and per-keyword failures in its failed hash, so
+    resume() only re-queues what is left. Fetches go through the normal
+    TrendsService path (shared rate limit, retries, circuit breaker), paced
+    to use at most INGEST_RATE_SHARE of the upstream rate so interactive
+    requests keep their headroom.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex[:12]
+        self._stopping = False
+
+    @property
+    def redis(self):
+        if not cache_service.redis:
+            raise RuntimeError("Bulk ingestion needs Redis")
+        return cache_service.redis
+
+    async def submit(self, keywords: list[str], timeframe: str, geo: str) -> str:
+        """
+        Create a job for keywords and queue its batches; returns the job id.
+        Raises ValueError (InvalidRequestError) for no keywords or an
+        unusable timeframe or geo, before anything is queued.
+        """
+        keywords = list(dict.fromkeys(k.strip() for k in keywords if k.strip()))
+        if not keywords:
+            raise ValueError("At least one keyword is required")
+        timeframe, geo = canonical_timeframe(timeframe), canonical_geo(geo)
+        job_id = uuid.uuid4().hex
+        batches = [keywords[i:i + BATCH_SIZE] for i in range(0, len(keywords), BATCH_SIZE)]
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(job_key(job_id), mapping={
+            "status": "queued",
+            "timeframe": timeframe,
+            "geo": geo,
+            "keywords": len(keywords),
+            "batches": len(batches),
+            "created_at": time.time()
+        })
+        pipe.hset(job_key(job_id, "batches"), mapping={i: json.dumps(b) for i, b in enumerate(batches)})
+        pipe.lpush(QUEUE_KEY, *[json.dumps({"job": job_id, "batch": i}) for i in range(len(batches))])
+        for part in ("", "batches"):
+            pipe.expire(job_key(job_id, part), settings.INGEST_JOB_TTL)
+        await pipe.execute()
+        logger.info(f"Ingest job {job_id}: {len(keywords)} keywords in {len(batches)} batches")
+        return job_id
+
+    async def status(self, job_id: str) -> Optional[IngestJobStatus]:
+        """Progress of a job, or None if it doesn't exist (or has expired)"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(job_key(job_id))
+        pipe.scard(job_key(job_id, "done"))
+        pipe.hgetall(job_key(job_id, "failed"))
+        job, done, failed = await pipe.execute()
+        if not job:
+            return None
+        job = {k.decode(): v.decode() for k, v in job.items()}
+        return IngestJobStatus(
+            job_id=job_id,
+            status=job["status"],
+            timeframe=job["timeframe"],
+            geo=job["geo"],
+            keywords=int(job["keywords"]),
+            batches=int(job["batches"]),
+            batches_done=done,
+            fetched=int(job.get("fetched", 0)),
+            skipped=int(job.get("skipped", 0)),
+            failed={k.decode(): v.decode() for k, v in failed.items()},
+            created_at=float(job["created_at"]),
+            finished_at=float(job["finished_at"]) if "finished_at" in job else None
+        )
+
+    async def resume(self, job_id: str) -> int:
+        """Re-queue unfinished batches and batches with failed keywords; returns how many"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(job_key(job_id, "batches"))
+        pipe.smembers(job_key(job_id, "done"))
+        pipe.hkeys(job_key(job_id, "failed"))
+        batches, done, failed = await pipe.execute()
+        if not batches:
+            return 0
+        done = {int(b) for b in done}
+        failed = {k.decode() for k in failed}
+        todo = sorted(
+            int(i) for i, kws in batches.items()
+            if int(i) not in done or failed.intersection(json.loads(kws))
+        )
+        if not todo:
+            return 0
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.srem(job_key(job_id, "done"), *todo)
+        pipe.hset(job_key(job_id), "status", "queued")
+        pipe.hdel(job_key(job_id), "finished_at")
+        pipe.lpush(QUEUE_KEY, *[json.dumps({"job": job_id, "batch": i}) for i in todo])
+        await pipe.execute()
+        logger.info(f"Ingest job {job_id}: re-queued {len(todo)} batches")
+        return len(todo)
+
+    # --- worker side ---
+
+    @property
+    def _processing_key(self) -> str:
+        return f"ingest:processing:{self.worker_id}"
+
+    async def _heartbeat(self):
+        await self.redis.set(f"ingest:worker:{self.worker_id}", 1, ex=settings.INGEST_WORKER_TIMEOUT)
+
+    async def recover(self) -> int:
+        """Put back batches held by workers that stopped heartbeating"""
+        recovered = 0
+        async for key in self.redis.scan_iter(match="ingest:processing:*"):
+            worker_id = key.decode().rsplit(":", 1)[1]
+            if await self.redis.exists(f"ingest:worker:{worker_id}"):
+                continue
+            while await self.redis.lmove(key, QUEUE_KEY, "RIGHT", "RIGHT"):
+                recovered += 1
+        if recovered:
+            logger.warning(f"Re-queued {recovered} ingest batches from stopped workers")
+        return recovered
+
+    async def _pace(self, started: float):
+        """Keep this worker's share of the upstream rate"""
+        if settings.UPSTREAM_RATE <= 0:
+            return
+        interval = 1 / (settings.UPSTREAM_RATE * settings.INGEST_RATE_SHARE)
+        await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+
+    async def process(self, service, job_id: str, batch: int) -> Optional[float]:
+        """
+        Warm one batch. Returns None when the batch is finished, or the
+        seconds to back off before it is retried (upstream busy or down).
+        """
+        job = await self.redis.hmget(job_key(job_id), "timeframe", "geo")
+        keywords = await self.redis.hget(job_key(job_id, "batches"), batch)
+        if job[0] is None or keywords is None:
+            logger.warning(f"Ingest job {job_id} has expired, dropping batch {batch}")
+            return None
+        if await self.redis.sismember(job_key(job_id, "done"), batch):
+            return None
+        timeframe, geo = job[0].decode(), job[1].decode()
+        await self.redis.hset(job_key(job_id), "status", "running")
+
+        for keyword in json.loads(keywords):
+            await self._heartbeat()
+            started = time.monotonic()
+            try:
+                fetched = await service.warm("trends", keyword, timeframe, geo, horizon=settings.INGEST_FRESH_HORIZON)
+            except (UpstreamBusyError, UpstreamUnavailableError) as e:
+                logger.warning(f"Ingest job {job_id} paused: {e}")
+                return float(e.retry_after)
+            except Exception as e:
+                logger.error(f"Ingest job {job_id}: {keyword} failed: {e}")
+                await self.redis.hset(job_key(job_id, "failed"), keyword, str(e))
+                await self.redis.expire(job_key(job_id, "failed"), settings.INGEST_JOB_TTL)
+                continue
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hincrby(job_key(job_id), "fetched" if fetched else "skipped", 1)
+            pipe.hdel(job_key(job_id, "failed"), keyword)
+            await pipe.execute()
+            if fetched:
+                await self._pace(started)
+        return None
+
+    async def _finish_batch(self, job_id: str, batch: int):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.sadd(job_key(job_id, "done"), batch)
+        pipe.expire(job_key(job_id, "done"), settings.INGEST_JOB_TTL)
+        pipe.scard(job_key(job_id, "done"))
+        pipe.hget(job_key(job_id), "batches")
+        _, _, done, total = await pipe.execute()
+        if total is not None and done >= int(total):
+            await self.redis.hset(job_key(job_id), mapping={"status": "done", "finished_at": time.time()})
+            logger.info(f"Ingest job {job_id} finished")
+
+    async def work(self, service, once: bool = False):
+        """Process queued batches until stop() (or until the queue is empty with once=True)"""
+        await self.recover()
+        while not self._stopping:
+            await self._heartbeat()
+            item = await self.redis.blmove(QUEUE_KEY, self._processing_key, timeout=1, src="RIGHT", dest="LEFT")
+            if item is None:
+                if once:
+                    return
+                continue
+            task = json.loads(item)
+            backoff = await self.process(service, task["job"], task["batch"])
+            pipe = self.redis.pipeline(transaction=True)
+            if backoff is None:
+                pipe.lrem(self._processing_key, 1, item)
+                await pipe.execute()
+                await self._finish_batch(task["job"], task["batch"])
+            else:
+                # Back of the queue; already-warmed keywords are skipped next time
+                pipe.lpush(QUEUE_KEY, item)
+                pipe.lrem(self._processing_key, 1, item)
+                await pipe.execute()
+                await asyncio.sleep(backoff)
+
+    def stop(self):
+        self._stopping = True
+
+
+# Single instance used across the entire app
+ingest_queue = IngestQueue()
@@ -0,0 +1,206 @@
+"""
+Persistent interest-over-time history, so refreshes only fetch new points.
+
+Google rescales every response to 0–100 for the requested window, so a
+short "tail" request is on a different scale from the stored history.
+stitch() resamples the tail onto the stored step (daily/weekly/monthly)
+and rescales it by the ratio of the two series over the buckets they
+share, then the requested window is renormalized to 0–100 on the way out.
+"""
+import logging
+import re
+import sqlite3
+import threading
+from typing import Optional
+
+import pandas as pd
+
+from app.core.config import settings
+from app.models.trends import InterestOverTimeData
+
+logger = logging.getLogger(__name__)
+
+# Earliest date Google Trends has data for ("all")
+TRENDS_EPOCH = pd.Timestamp("2004-01-01")
+
+STEP_OFFSETS = {
+    "D": pd.DateOffset(days=1),
+    "W": pd.DateOffset(weeks=1),
+    "M": pd.DateOffset(months=1),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series_points (
+    keyword TEXT NOT NULL,
+    geo TEXT NOT NULL,
+    step TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (keyword, geo, step, date)
+)
+"""
+
+
+def series_window(timeframe: str, today: Optional[pd.Timestamp] = None) -> Optional[tuple[pd.Timestamp, str]]:
+    """
+    Start date and step Google uses for an open-ended window ("today 12-m",
+    "today 5-y", "all"). None for timeframes the store does not handle.
+    """
+    today = (today or pd.Timestamp.today()).normalize()
+    if timeframe == "all":
+        start = TRENDS_EPOCH
+    else:
+        match = re.fullmatch(r"today (\d+)-([my])", timeframe)
+        if not match:
+            return None
+        n = int(match.group(1))
+        start = today - (pd.DateOffset(months=n) if match.group(2) == "m" else pd.DateOffset(years=n))
+    days = (today - start).days
+    # Google switches to coarser steps as the window grows
+    step = "D" if days < 270 else "W" if days <= 1890 else "M"
+    return start, step
+
+
+def infer_step(index: pd.DatetimeIndex) -> Optional[str]:
+    """Step of a Google timeline from its spacing (None for hourly or too short)"""
+    if len(index) < 2:
+        return None
+    days = pd.Series(index).diff().median().days
+    if days == 1:
+        return "D"
+    if days == 7:
+        return "W"
+    if 28 <= days <= 31:
+        return "M"
+    return None
+
+
+def bucket(index: pd.DatetimeIndex, step: str, anchor: pd.Timestamp) -> pd.DatetimeIndex:
+    """Map dates onto the stored grid (weekly buckets start on anchor's weekday)"""
+    index = index.normalize()
+    if step == "D":
+        return index
+    if step == "W":
+        weeks = (index - anchor).days // 7
+        return anchor + pd.to_timedelta(weeks * 7, unit="D")
+    return index.to_period("M").to_timestamp()
+
+
+def tail_start(history: Optional[pd.Series], start: pd.Timestamp, step: str, today: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """
+    Where an incremental fetch should begin: a few stored buckets before the
+    last one, so the tail overlaps the history. None when a full fetch is
+    needed or cheaper (no history, history too short, or a tail that would
+    cover at least half the window's buckets).
+    """
+    if history is None or history.empty:
+        return None
+    offset = STEP_OFFSETS[step]
+    if history.index[0] > start + offset:
+        return None
+    begin = history.index[-1] - offset * settings.SERIES_OVERLAP_STEPS
+    today = (today or pd.Timestamp.today()).normalize()
+    # Counted in stored buckets: the tail comes back daily, but is folded
+    # into the window's step, and SERIES_OVERLAP_STEPS of them are overlap
+    full_points = len(pd.date_range(start, today, freq=offset))
+    if len(pd.date_range(begin, today, freq=offset)) >= full_points / 2:
+        return None
+    return begin
+
+
+def stitch(history: pd.Series, tail: pd.Series, step: str) -> Optional[pd.Series]:
+    """
+    Append a freshly fetched tail to stored history, on the history's scale.
+    The last stored bucket (usually partial) is replaced by the tail's.
+    Returns None when the two don't overlap enough to be rescaled.
+    """
+    tail = tail.groupby(bucket(tail.index, step, history.index[0])).mean()
+    cut = history.index[-1]
+    common = history.index.intersection(tail.index)
+    overlap = common[common < cut]
+    if overlap.empty:
+        overlap = common
+    if overlap.empty or tail[overlap].sum() == 0:
+        return None
+    scale = history[overlap].sum() / tail[overlap].sum()
+    return pd.concat([history[history.index < cut], tail[tail.index >= cut] * scale])
+
+
+def window_records(series: pd.Series, start: pd.Timestamp, step: str, keyword: str) -> list[InterestOverTimeData]:
+    """Points from start onwards, renormalized to 0–100 like a Google response"""
+    window = series[series.index > start - STEP_OFFSETS[step]]
+    peak = window.max() if not window.empty else 0
+    values = (window / peak * 100).round().astype(int) if peak > 0 else window.astype(int)
+    return [
+        InterestOverTimeData.model_construct(date=d, value=v, keyword=keyword)
+        for d, v in zip(window.index.strftime("%Y-%m-%d").tolist(), values.tolist())
+    ]
+
+
+def records_series(records: list[InterestOverTimeData]) -> pd.Series:
+    """Points as a float series indexed by date, the shape the store keeps"""
+    return pd.Series([r.value for r in records], index=pd.DatetimeIndex([r.date for r in records]), dtype=float)
+
+
+class SeriesStore:
+    """
+    SQLite store of interest-over-time history per (keyword, geo, step).
+
+    Values are kept on the scale of the first full fetch (not clamped to
+    100), with later tails stitched on. Disabled when `path` is empty.
+    The file is opened in WAL mode so several workers can share it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(SCHEMA)
+            logger.info(f"Series store opened: {self.path}")
+        return self._conn
+
+    def load(self, keyword: str, geo: str, step: str) -> Optional[pd.Series]:
+        """Stored history, oldest first, or None"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT date, value FROM series_points WHERE keyword = ? AND geo = ? AND step = ? ORDER BY date",
+                (keyword.lower(), geo, step)
+            ).fetchall()
+        if not rows:
+            return None
+        dates, values = zip(*rows)
+        return pd.Series(values, index=pd.DatetimeIndex(dates), dtype=float)
+
+    def save(self, keyword: str, geo: str, step: str, series: pd.Series):
+        """Replace the stored history with series"""
+        rows = [
+            (keyword.lower(), geo, step, d, float(v))
+            for d, v in zip(series.index.strftime("%Y-%m-%d"), series.tolist())
+        ]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "DELETE FROM series_points WHERE keyword = ? AND geo = ? AND step = ?",
+                    (keyword.lower(), geo, step)
+                )
+                conn.executemany("INSERT INTO series_points VALUES (?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Single instance used across the entire app
+series_store = SeriesStore(settings.SERIES_STORE_PATH)
@@ -0,0 +1,161 @@
+import heapq
+import logging
+
+from app.core.config import settings
+from app.core.cache import cache_service
+from app.core.exceptions import InvalidRequestError
+from app.core.keys import canonical_keyword
+from app.models.trends import Suggestion, WordCloudItem
+
+logger = logging.getLogger(__name__)
+
+# Every word-start suffix of every term, as "{suffix}\0{term}", all scored 0
+# so ZRANGEBYLEX finds them by prefix
+TERMS_KEY = "suggest:terms"
+# Term -> accumulated popularity
+POPULARITY_KEY = "suggest:popularity"
+# Term -> the spelling it was last seen with
+TEXT_KEY = "suggest:text"
+# Short prefix -> its terms by popularity (a copy of POPULARITY_KEY's scores)
+PREFIX_KEY = "suggest:prefix:{}"
+
+# Popularity a keyword gains each time it is fetched; its related queries
+# gain their own 0-100 value (rising ones at most this)
+KEYWORD_WEIGHT = 100
+
+
+def _suffixes(term: str) -> list[str]:
+    """Index members of a canonical term: one per word it can be found by"""
+    words = term.split("_")
+    return [f"{'_'.join(words[i:])}\x00{term}" for i in range(len(words))]
+
+
+def _prefixes(term: str) -> set[str]:
+    """Short prefixes (up to SUGGEST_PREFIX_CHARS) a term is found by, each with its own ranking"""
+    words = term.split("_")
+    return {
+        suffix[:n]
+        for suffix in ("_".join(words[i:]) for i in range(len(words)))
+        for n in range(1, min(len(suffix), settings.SUGGEST_PREFIX_CHARS) + 1)
+    }
+
+
+class SuggestIndex:
+    """
+    Prefix search over every keyword fetched and every related and rising
+    query Google returned for one, across all keywords and geos.
+
+    Terms are matched on their canonical form (see app.core.keys) from the
+    start of any of their words, so "inter" finds "Spectrum Internet".
+    Matches are ranked by popularity: each fetch adds KEYWORD_WEIGHT to the
+    keyword and each related query's value to the query. The index lives
+    in Redis, so every worker adds to and reads the same one, and past
+    SUGGEST_MAX_TERMS the least popular terms are dropped.
+
+    Short prefixes match too many terms to rank on every keystroke, so each
+    one up to SUGGEST_PREFIX_CHARS keeps its own popularity ranking, read
+    with one ZREVRANGE. A longer prefix reads every match from the lex
+    index (SUGGEST_SCAN at a time) and ranks them all.
+    """
+
+    async def add(self, keyword: str, top: list[WordCloudItem], rising: list[WordCloudItem]):
+        """Index a fetched keyword and its related queries"""
+        scores: dict[str, float] = {}
+        texts: dict[str, str] = {}
+        entries = [(keyword, KEYWORD_WEIGHT)]
+        entries += [(q.text, q.value) for q in top]
+        entries += [(q.text, min(q.value, KEYWORD_WEIGHT)) for q in rising]
+        for text, score in entries:
+            try:
+                term = canonical_keyword(text)
+            except InvalidRequestError:
+                continue
+            scores[term] = scores.get(term, 0) + score
+            texts[term] = text.strip()
+
+        def queue(pipe):
+            pipe.zadd(TERMS_KEY, {member: 0 for term in scores for member in _suffixes(term)})
+            for term, score in scores.items():
+                pipe.zincrby(POPULARITY_KEY, score, term)
+                for prefix in _prefixes(term):
+                    pipe.zincrby(PREFIX_KEY.format(prefix), score, term)
+            pipe.hset(TEXT_KEY, mapping=texts)
+            pipe.zcard(POPULARITY_KEY)
+
+        replies = await cache_service.pipeline(queue, name="suggest_add")
+        if replies is not None and replies[-1] > settings.SUGGEST_MAX_TERMS:
+            await self._trim(replies[-1] - settings.SUGGEST_MAX_TERMS)
+
+    async def _trim(self, excess: int):
+        """Drop the least popular terms"""
+        replies = await cache_service.pipeline(lambda pipe: pipe.zrange(POPULARITY_KEY, 0, excess - 1), name="suggest_trim")
+        if not replies or not replies[0]:
+            return
+        terms = [term.decode() for term in replies[0]]
+
+        def queue(pipe):
+            pipe.zrem(POPULARITY_KEY, *terms)
+            pipe.hdel(TEXT_KEY, *terms)
+            pipe.zrem(TERMS_KEY, *[member for term in terms for member in _suffixes(term)])
+            for prefix in {prefix for term in terms for prefix in _prefixes(term)}:
+                pipe.zrem(PREFIX_KEY.format(prefix), *terms)
+
+        await cache_service.pipeline(queue, name="suggest_trim")
+        logger.info(f"Dropped {len(terms)} unpopular terms from the suggestion index")
+
+    async def suggest(self, prefix: str, limit: int) -> list[Suggestion]:
+        """
+        The most popular terms with a word starting with prefix.
+        Empty without Redis. Raises InvalidRequestError for a blank prefix.
+        """
+        start = canonical_keyword(prefix)
+        if len(start) <= settings.SUGGEST_PREFIX_CHARS:
+            ranked = await self._top(PREFIX_KEY.format(start), limit)
+        else:
+            ranked = await self._rank(await self._matches(start.encode()), limit)
+        if not ranked:
+            return []
+        replies = await cache_service.pipeline(lambda pipe: pipe.hmget(TEXT_KEY, [term for term, _ in ranked]), name="suggest")
+        texts = replies[0] if replies is not None else [None] * len(ranked)
+        return [
+            Suggestion(text=text.decode() if text else term.replace("_", " "), score=score)
+            for (term, score), text in zip(ranked, texts)
+        ]
+
+    async def _top(self, key: str, limit: int) -> list[tuple[str, float]]:
+        """The most popular terms of a short prefix's own ranking"""
+        replies = await cache_service.pipeline(lambda pipe: pipe.zrevrange(key, 0, limit - 1, withscores=True), name="suggest")
+        if replies is None:
+            return []
+        # Equal scores are ordered by term
+        return sorted(((term.decode(), score) for term, score in replies[0]), key=lambda r: (-r[1], r[0]))
+
+    async def _matches(self, start: bytes) -> list[str]:
+        """Every term with a word starting with start, from the lex index"""
+        terms: dict[str, None] = {}
+        low, high = b"[" + start, b"[" + start + b"\xff"
+        while True:
+            replies = await cache_service.pipeline(
+                lambda pipe: pipe.zrangebylex(TERMS_KEY, low, high, start=0, num=settings.SUGGEST_SCAN),
+                name="suggest"
+            )
+            members = replies[0] if replies is not None else []
+            terms.update((member.split(b"\x00", 1)[1].decode(), None) for member in members)
+            if len(members) < settings.SUGGEST_SCAN:
+                return list(terms)
+            # Carry on after the last member read
+            low = b"(" + members[-1]
+
+    async def _rank(self, terms: list[str], limit: int) -> list[tuple[str, float]]:
+        """The most popular of some terms"""
+        if not terms:
+            return []
+        replies = await cache_service.pipeline(lambda pipe: pipe.zmscore(POPULARITY_KEY, terms), name="suggest")
+        if replies is None:
+            return []
+        scored = ((term, score) for term, score in zip(terms, replies[0]) if score is not None)
+        return heapq.nsmallest(limit, scored, key=lambda r: (-r[1], r[0]))
+
+
+# Single instance used across the entire app
+suggest_index = SuggestIndex()
@@ -0,0 +1,218 @@
+"""
+Async Google Trends client (TRENDS_BACKEND=httpx).
+
+Makes the same calls as pytrends (explore for the widget tokens, then
+multiline, comparedgeo and relatedsearches) on one shared httpx client,
+so fetches need no worker thread, reuse pooled (HTTP/2 where available)
+connections, and parse the JSON straight into response models instead of
+building a DataFrame per widget.
+
+Responses fail the way pytrends' do (TooManyRequestsError for 429s,
+ResponseError otherwise), so retries, the circuit breaker and the error
+metrics treat both backends alike.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import httpx
+from pytrends.exceptions import ResponseError, TooManyRequestsError
+
+from app.core.config import settings
+from app.models.trends import InterestOverTimeData, RegionData, WordCloudItem
+
+logger = logging.getLogger(__name__)
+
+BASE_TRENDS_URL = "https://trends.google.com/trends"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"
+# Google sends JSON under any of these
+JSON_CONTENT_TYPES = ("application/json", "application/javascript", "text/javascript")
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def timeline_records(data: dict, keywords: list[str]) -> dict[str, list[InterestOverTimeData]]:
+    """multiline JSON -> one point per date for each keyword of the payload"""
+    records: dict[str, list[InterestOverTimeData]] = {kw: [] for kw in keywords}
+    for point in data["default"]["timelineData"]:
+        day = datetime.fromtimestamp(int(point["time"]), tz=timezone.utc).strftime("%Y-%m-%d")
+        for kw, value in zip(keywords, point["value"]):
+            records[kw].append(InterestOverTimeData.model_construct(date=day, value=int(value), keyword=kw))
+    return records
+
+
+def region_records(data: dict, keywords: list[str], limit: int = 20) -> dict[str, list[RegionData]]:
+    """comparedgeo JSON -> the top regions with interest for each keyword"""
+    # Alphabetical first, so equal values keep the order pytrends' frame has
+    rows = sorted(data["default"]["geoMapData"], key=lambda row: row["geoName"])
+    regions = {}
+    for i, kw in enumerate(keywords):
+        ranked = sorted(((row["geoName"], int(row["value"][i])) for row in rows), key=lambda r: -r[1])
+        regions[kw] = [RegionData.model_construct(region=name, value=value) for name, value in ranked if value > 0][:limit]
+    return regions
+
+
+def query_records(ranked: Optional[list[dict]], limit: int = 20, breakout_value: int = 100) -> list[WordCloudItem]:
+    """rankedKeyword list -> word cloud items ("Breakout" counts as breakout_value)"""
+    return [
+        WordCloudItem.model_construct(
+            text=str(q["query"]),
+            value=breakout_value if q["value"] == "Breakout" else int(q["value"])
+        )
+        for q in (ranked or [])[:limit]
+    ]
+
+
+def related_records(data: dict, limit: int = 20) -> tuple[list[WordCloudItem], list[WordCloudItem]]:
+    """relatedsearches JSON -> (top, rising) queries"""
+    ranked = data["default"].get("rankedList", [])
+    top = ranked[0].get("rankedKeyword") if len(ranked) > 0 else None
+    rising = ranked[1].get("rankedKeyword") if len(ranked) > 1 else None
+    return query_records(top, limit), query_records(rising, limit)
+
+
+class Widgets:
+    """Widget tokens from one explore call"""
+
+    def __init__(self, keywords: list[str], geo: str, widgets: list[dict]):
+        self.keywords = keywords
+        self.geo = geo
+        self.timeseries = next((w for w in widgets if w["id"] == "TIMESERIES"), None)
+        self.geo_map = next((w for w in widgets if w["id"] == "GEO_MAP"), None)
+        # Related queries come one widget per keyword
+        self.related = {}
+        for widget in widgets:
+            if "RELATED_QUERIES" in widget["id"]:
+                try:
+                    kw = widget["request"]["restriction"]["complexKeywordsRestriction"]["keyword"][0]["value"]
+                except (KeyError, IndexError):
+                    kw = ""
+                self.related[kw] = widget
+
+
+class AsyncTrendsClient:
+    """
+    Shared async client for Google Trends. Unlike a pytrends client it keeps
+    no per-fetch state (the widget tokens live on the fetch plan), so one
+    instance serves every concurrent fetch over its connection pool.
+    The NID cookie is fetched on first use, and dropped for a fresh one
+    after `max_rate_limits` consecutive 429s (what evicting a pytrends
+    client does for the other backend).
+    """
+
+    def __init__(
+        self,
+        hl: str = "en-US",
+        tz: int = 360,
+        timeout: float = 25.0,
+        max_connections: int = 4,
+        max_rate_limits: int = 3,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.hl = hl
+        self.tz = tz
+        self.max_rate_limits = max_rate_limits
+        self.http2 = settings.TRENDS_HTTP2 and transport is None and http2_available()
+        if settings.TRENDS_HTTP2 and transport is None and not self.http2:
+            logger.warning("HTTP/2 needs the h2 package, falling back to HTTP/1.1")
+        self._http = httpx.AsyncClient(
+            http2=self.http2,
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={"User-Agent": USER_AGENT, "accept-language": hl},
+            transport=transport
+        )
+        self._has_cookie = False
+        self._rate_limited = 0
+        self.requests = 0
+        self.cookie_resets = 0
+
+    @staticmethod
+    def _url(path: str) -> str:
+        return (settings.TRENDS_BASE_URL or BASE_TRENDS_URL).rstrip("/") + path
+
+    async def _fetch_cookie(self):
+        await self._http.get(self._url(f"/explore/?geo={self.hl[-2:]}"))
+        # Only the NID cookie matters; the client's jar sends it from now on
+        for name in [name for name in self._http.cookies.keys() if name != "NID"]:
+            self._http.cookies.delete(name)
+        self._has_cookie = True
+
+    async def _get_data(self, method: str, path: str, trim_chars: int, params: dict) -> Any:
+        """Send a request and parse the JSON behind Google's anti-XSSI prefix"""
+        if not self._has_cookie:
+            await self._fetch_cookie()
+        self.requests += 1
+        response = await self._http.request(method, self._url(path), params=params)
+        content_type = response.headers.get("Content-Type", "")
+        if response.status_code == 200 and any(t in content_type for t in JSON_CONTENT_TYPES):
+            self._rate_limited = 0
+            return json.loads(response.text[trim_chars:])
+        if response.status_code == 429:
+            self._rate_limited += 1
+            if self._rate_limited >= self.max_rate_limits:
+                logger.warning(f"Replacing Google Trends cookie after {self._rate_limited} rate-limited requests")
+                self._http.cookies.clear()
+                self._has_cookie = False
+                self._rate_limited = 0
+                self.cookie_resets += 1
+            raise TooManyRequestsError.from_response(response)
+        raise ResponseError.from_response(response)
+
+    async def explore(self, keywords: list[str], timeframe: str, geo: str) -> Widgets:
+        """Get the widget tokens for a payload of up to 5 keywords"""
+        req = {
+            "comparisonItem": [{"keyword": kw, "time": timeframe, "geo": geo} for kw in keywords],
+            "category": 0,
+            "property": ""
+        }
+        data = await self._get_data("POST", "/api/explore", 4, {"hl": self.hl, "tz": self.tz, "req": json.dumps(req)})
+        return Widgets(keywords, geo, data["widgets"])
+
+    def _widget_params(self, widget: dict) -> dict:
+        return {"req": json.dumps(widget["request"]), "token": widget["token"], "tz": self.tz}
+
+    async def interest_over_time(self, widgets: Widgets) -> dict[str, list[InterestOverTimeData]]:
+        data = await self._get_data("GET", "/api/widgetdata/multiline", 5, self._widget_params(widgets.timeseries))
+        return timeline_records(data, widgets.keywords)
+
+    async def interest_by_region(self, widgets: Widgets, resolution: str = "REGION", limit: int = 20) -> dict[str, list[RegionData]]:
+        widget = widgets.geo_map
+        request = dict(widget["request"], includeLowSearchVolumeGeos=False)
+        # Same resolution rules as pytrends
+        if not widgets.geo or (widgets.geo == "US" and resolution in ("DMA", "CITY", "REGION")):
+            request["resolution"] = resolution
+        data = await self._get_data("GET", "/api/widgetdata/comparedgeo", 5, self._widget_params(dict(widget, request=request)))
+        return region_records(data, widgets.keywords, limit)
+
+    async def related_queries(self, widgets: Widgets, limit: int = 20) -> dict[str, tuple[list[WordCloudItem], list[WordCloudItem]]]:
+        # One widget per keyword, fetched concurrently over the connection pool
+        # (still one upstream fetch for the rate limiter, like pytrends' loop)
+        replies = await asyncio.gather(*[
+            self._get_data("GET", "/api/widgetdata/relatedsearches", 5, self._widget_params(widget))
+            for widget in widgets.related.values()
+        ], return_exceptions=True)
+        # Every request has finished, so none is left running on a failure
+        failed = next((r for r in replies if isinstance(r, BaseException)), None)
+        if failed is not None:
+            raise failed
+        return {kw: related_records(data, limit) for kw, data in zip(widgets.related, replies)}
+
+    def stats(self) -> dict:
+        return {
+            "backend": "httpx",
+            "http2": self.http2,
+            "requests": self.requests,
+            "cookie_resets": self.cookie_resets
+        }
+
+    async def aclose(self):
+        await self._http.aclose()
@@ -1,19 +1,202 @@
+"""
+Google Trends data with caching.
+
+Only what the cache-hit path needs is imported here. The upstream stack
+(pytrends, pandas, httpx, the series store and analytics) is imported on
+the first fetch, so workers start, and serve hits, without it.
+"""
+import asyncio
 import logging
-from pytrends.request import TrendReq
+import sys
+import time
+from pytrends.exceptions import TooManyRequestsError
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable
 from app.models.trends import (
     InterestOverTimeData,
     RegionData,
     WordCloudItem,
-    TrendResponse
+    TrendRequest,
+    TrendResponse,
+    CompareResponse,
+    TrendAnalytics
+)
+from app.core import codec
+from app.core.cache import cache_service, CacheEntry
+from app.core.config import settings
+from app.core.exceptions import InvalidRequestError, UpstreamError, UpstreamFetchError
+from app.core.executor import upstream_executor
+from app.core.keys import (
+    RequestKey,
+    cache_key,
+    canonical_geo,
+    canonical_keyword,
+    canonical_timeframe,
+    compare_key,
+    key_stats,
+    request_key
+)
+from app.core.metrics import CONVERT_LATENCY, UPSTREAM_ERRORS, timed
+from app.core.resilience import CircuitBreaker, RateLimiter, backoff_delay
+from app.core.singleflight import SingleFlight
+from app.services.converters import (
+    interest_over_time_records,
+    region_records,
+    query_records
 )
-from app.core.cache import cache_service
+from app.services.fetch_plan import AsyncFetchPlan, FetchPlan, is_transient, retry_after
+from app.services.hot_keywords import hot_keywords
+from app.services.suggest import suggest_index
+
+if TYPE_CHECKING:
+    from app.services.client_pool import PooledTrendReq, TrendReqPool
+    from app.services.series_store import SeriesStore
+    from app.services.trends_client import AsyncTrendsClient
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class CachedBody:
+    """A serialized response and the seconds until its data goes stale (negative once it has)"""
+    body: bytes
+    fresh_for: float
+
+
+@dataclass
+class CachedFetch:
+    """
+    Everything needed to serve one cache key or (re)fill it from upstream.
+    dump produces the exact JSON body the API returns for this data, so a
+    cache hit can be sent to the client without being parsed.
+    """
+    cache_key: str
+    label: str
+    fetch: Callable[[], Awaitable[Any]]
+    dump: Callable[[Any], dict]
+    load: Callable[[dict], Any]
+
+
+@dataclass(frozen=True)
+class Widget:
+    """
+    One Google Trends widget, cached under its own key so every endpoint
+    shares it: a full trends fill writes all of them, and the narrow
+    endpoints read (or fetch) only their own. dump gives the widget's
+    fields of the response body, in TrendResponse order; load builds the
+    result back from them without validation, as the cache only holds what
+    dump wrote. afetch is fetch for the async client (TRENDS_BACKEND=httpx).
+    """
+    name: str
+    fetch: Callable[["TrendsService", str, FetchPlan], Any]
+    afetch: Callable[["TrendsService", str, AsyncFetchPlan], Awaitable[Any]]
+    dump: Callable[[Any], dict]
+    load: Callable[[dict], Any]
+
+
+WIDGETS = {
+    "iot": Widget(
+        "iot",
+        fetch=lambda service, keyword, plan: service._get_interest_over_time(keyword, plan.timeframe, plan.geo, plan=plan),
+        afetch=lambda service, keyword, plan: service._aget_interest_over_time(keyword, plan.timeframe, plan.geo, plan=plan),
+        dump=lambda result: {"interest_over_time": result},
+        load=lambda cached: [InterestOverTimeData.model_construct(**r) for r in cached["interest_over_time"]]
+    ),
+    "region": Widget(
+        "region",
+        fetch=lambda service, keyword, plan: service._get_interest_by_region(keyword, plan.timeframe, plan.geo, plan=plan),
+        afetch=lambda service, keyword, plan: service._aget_interest_by_region(keyword, plan.timeframe, plan.geo, plan=plan),
+        dump=lambda result: {"interest_by_region": result},
+        load=lambda cached: [RegionData.model_construct(**r) for r in cached["interest_by_region"]]
+    ),
+    "queries": Widget(
+        "queries",
+        fetch=lambda service, keyword, plan: service._get_related_queries(keyword, plan.timeframe, plan.geo, plan=plan),
+        afetch=lambda service, keyword, plan: service._aget_related_queries(keyword, plan.timeframe, plan.geo, plan=plan),
+        dump=lambda result: {"related_queries": result[0], "rising_queries": result[1]},
+        load=lambda cached: (
+            [WordCloudItem.model_construct(**q) for q in cached["related_queries"]],
+            [WordCloudItem.model_construct(**q) for q in cached["rising_queries"]]
+        )
+    ),
+}
+# Order widgets are fetched in from one payload. Interest over time goes
+# last: with the series store it may switch the client to a tail payload
+# (the async client fetches them concurrently; its tail has its own tokens)
+FETCH_ORDER = ("region", "queries", "iot")
+# Widgets behind each kind of request (hot keywords and ingestion use these kinds too)
+KIND_WIDGETS = {
+    "trends": ("iot", "region", "queries"),
+    "region": ("region",),
+    "iot": ("iot",),
+    # Analytics are recomputed whenever the series is
+    "analytics": ("iot",),
+}
+
+
+TRENDS_BACKENDS = ("pytrends", "httpx")
+
+
+def _series_store() -> "SeriesStore":
+    """The series store, imported on first use (it needs pandas)"""
+    from app.services import series_store
+    return series_store.series_store
+
+
 class TrendsService:
-    def __init__(self):
-        self.pytrends = TrendReq(
+    def __init__(self, async_client: "AsyncTrendsClient | None" = None):
+        if settings.TRENDS_BACKEND not in TRENDS_BACKENDS:
+            raise ValueError(f"Unknown TRENDS_BACKEND {settings.TRENDS_BACKEND!r}, expected one of {TRENDS_BACKENDS}")
+        # Upstream clients are created on first fetch (see clients / async_client)
+        self._clients: "TrendReqPool | None" = None
+        self._async_client = async_client
+        # Coalesces concurrent cache misses for the same key
+        self._singleflight = SingleFlight()
+        # Background refreshes in flight, by cache key
+        self._refreshing: dict[str, asyncio.Task] = {}
+        # Upstream protection: shared rate limit, fail fast while Google rejects us
+        self._limiter = RateLimiter("ratelimit:trends", settings.UPSTREAM_RATE, settings.UPSTREAM_BURST, cache=cache_service)
+        self._breaker = CircuitBreaker(
+            "Google Trends",
+            failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.BREAKER_RESET_TIMEOUT
+        )
+
+    @property
+    def clients(self) -> "TrendReqPool":
+        """
+        Pool of pytrends clients. TrendReq keeps payload tokens on the
+        instance, so each fetch leases a client of its own.
+        """
+        if self._clients is None:
+            from app.services.client_pool import TrendReqPool
+            self._clients = TrendReqPool(
+                factory=self._new_client,
+                size=settings.TRENDS_POOL_SIZE,
+                max_rate_limits=settings.TRENDS_CLIENT_MAX_429,
+                lease_timeout=settings.TRENDS_POOL_LEASE_TIMEOUT
+            )
+        return self._clients
+
+    @clients.setter
+    def clients(self, pool: "TrendReqPool"):
+        self._clients = pool
+
+    @property
+    def async_client(self) -> "AsyncTrendsClient | None":
+        """The shared async client with TRENDS_BACKEND=httpx (it keeps no per-fetch state), else None"""
+        if self._async_client is None and settings.TRENDS_BACKEND == "httpx":
+            self._async_client = self._new_async_client()
+        return self._async_client
+
+    def load_upstream(self):
+        """Import the upstream stack now rather than on the first fetch"""
+        from app.services import analytics, client_pool, series_store, trends_client  # noqa: F401
+
+    @staticmethod
+    def _new_client() -> "PooledTrendReq":
+        from app.services.client_pool import PooledTrendReq
+        return PooledTrendReq(
             hl='en-US',
             tz=360,
             timeout=(10, 25),
@@ -24,152 +207,826 @@ class TrendsService:
             }
         )
 
+    @staticmethod
+    def _new_async_client() -> "AsyncTrendsClient":
+        from app.services.trends_client import AsyncTrendsClient
+        return AsyncTrendsClient(
+            hl='en-US',
+            tz=360,
+            timeout=25.0,
+            max_connections=settings.TRENDS_POOL_SIZE,
+            max_rate_limits=settings.TRENDS_CLIENT_MAX_429
+        )
+
     def _build_cache_key(self, keyword: str, timeframe: str, geo: str) -> str:
-        """Build a unique cache key for this request"""
-        clean = keyword.lower().replace(' ', '_')
-        return f"trends:{clean}:{timeframe}:{geo}"
+        """Key a full trends fetch is locked and coalesced under (no entry is stored at it)"""
+        return cache_key("trends", keyword, timeframe, geo)
+
+    def _widget_key(self, widget: str, keyword: str, timeframe: str, geo: str) -> str:
+        """Build the cache key of one widget's entry"""
+        return cache_key(widget, keyword, timeframe, geo)
+
+    def _fetch_key(self, widgets: tuple[str, ...], keyword: str, timeframe: str, geo: str) -> str:
+        """Lock / single-flight key for fetching a set of widgets"""
+        if len(widgets) == len(WIDGETS):
+            return self._build_cache_key(keyword, timeframe, geo)
+        return cache_key("+".join(widgets), keyword, timeframe, geo)
+
+    def _build_compare_key(self, keywords: list[str], timeframe: str, geo: str) -> str:
+        """Build a cache key for a keyword set (order and spelling do not matter)"""
+        return compare_key(keywords, timeframe, geo)
+
+    def _request(self, kind: str, keyword: str, timeframe: str, geo: str) -> RequestKey:
+        """Validate and canonicalize a request, and count it for hot keyword warming"""
+        key = request_key(keyword, timeframe, geo)
+        hot_keywords.record(kind, key.keyword.replace("_", " "), key.timeframe, key.geo)
+        return key
+
+    def _new_plan(self, keyword: str, timeframe: str, geo: str, namespace: str = "trends") -> FetchPlan:
+        """Create a fetch plan that shares one payload across all widgets"""
+        return self._plan([keyword], timeframe, geo, namespace=namespace)
 
-    def _get_interest_over_time(self, keyword: str, timeframe: str, geo: str) -> list[InterestOverTimeData]:
+    def _plan(self, keywords: list[str], timeframe: str, geo: str, namespace: str) -> FetchPlan:
+        """Fetch plan for the configured backend"""
+        if self.async_client is not None:
+            return AsyncFetchPlan(self.async_client, keywords, timeframe, geo, namespace=namespace)
+        return FetchPlan(None, keywords, timeframe, geo, namespace=namespace)
+
+    def _get_interest_over_time(self, keyword: str, timeframe: str, geo: str, plan: FetchPlan) -> list[InterestOverTimeData]:
         """Fetch interest over time data from Google Trends"""
         try:
-            self.pytrends.build_payload(
-                [keyword],
-                timeframe=timeframe,
-                geo=geo
-            )
-            df = self.pytrends.interest_over_time()
-            if df.empty:
-                return []
-            result = []
-            for date, row in df.iterrows():
-                if keyword in row:
-                    date_str = str(date)[:10]  # gets YYYY-MM-DD from timestamp
-                    result.append(InterestOverTimeData(
-                        date=date_str,
-                        value=int(row[keyword]),
-                        keyword=keyword
-                    ))
-            return result
+            if _series_store().enabled and len(plan.keywords) == 1:
+                return self._get_stored_interest_over_time(keyword, timeframe, geo, plan)
+            df = plan.interest_over_time()
+            with plan.stage("convert"):
+                return interest_over_time_records(df, keyword)
         except Exception as e:
             logger.error(f"Error fetching interest over time: {e}")
+            plan.note_failure(e)
             return []
 
-    def _get_interest_by_region(self, keyword: str, timeframe: str, geo: str) -> list[RegionData]:
+    def _get_stored_interest_over_time(self, keyword: str, timeframe: str, geo: str, plan: FetchPlan) -> list[InterestOverTimeData]:
+        """
+        Interest over time backed by the series store: when stored history
+        covers the window, only the points since the last fetch (plus a small
+        overlap for rescaling) are requested and stitched on.
+        """
+        import pandas as pd
+        from app.services.series_store import infer_step, series_window, stitch, tail_start, window_records
+        series_store = _series_store()
+        window = series_window(timeframe)
+        if window is not None:
+            start, step = window
+            history = series_store.load(keyword, geo, step)
+            begin = tail_start(history, start, step)
+            if begin is not None:
+                today = pd.Timestamp.today()
+                df = plan.interest_over_time_tail(f"{begin:%Y-%m-%d} {today:%Y-%m-%d}")
+                with plan.stage("convert"):
+                    series = stitch(history, df[keyword].astype(float), step) if keyword in df.columns else None
+                    if series is not None:
+                        series_store.save(keyword, geo, step, series)
+                        return window_records(series, start, step, keyword)
+                logger.info(f"New points for {keyword} don't overlap stored history, fetching the full window")
+
+        df = plan.interest_over_time()
+        with plan.stage("convert"):
+            records = interest_over_time_records(df, keyword)
+            if window is not None and keyword in df.columns and infer_step(df.index) == window[1]:
+                series_store.save(keyword, geo, window[1], df[keyword].astype(float))
+        return records
+
+    def _get_interest_by_region(self, keyword: str, timeframe: str, geo: str, plan: FetchPlan) -> list[RegionData]:
         """Fetch interest by region data from Google Trends"""
         try:
-            self.pytrends.build_payload(
-                [keyword],
-                timeframe=timeframe,
-                geo=geo
-            )
-            df = self.pytrends.interest_by_region(resolution='REGION')
-            if df.empty:
-                return []
-            result = []
-            for region, row in df.iterrows():
-                if keyword in row and int(row[keyword]) > 0:
-                    result.append(RegionData(
-                        region=str(region),
-                        value=int(row[keyword])
-                    ))
-            result.sort(key=lambda x: x.value, reverse=True)
-            return result[:20]
+            df = plan.interest_by_region(resolution='REGION')
+            with plan.stage("convert"):
+                return region_records(df, keyword, limit=20)
         except Exception as e:
             logger.error(f"Error fetching interest by region: {e}")
+            plan.note_failure(e)
             return []
 
-    def _get_related_queries(self, keyword: str, timeframe: str, geo: str) -> tuple[list[WordCloudItem], list[WordCloudItem]]:
+    def _get_related_queries(self, keyword: str, timeframe: str, geo: str, plan: FetchPlan) -> tuple[list[WordCloudItem], list[WordCloudItem]]:
         """Fetch related and rising queries from Google Trends"""
         try:
-            self.pytrends.build_payload(
-                [keyword],
-                timeframe=timeframe,
-                geo=geo
-            )
-            related = self.pytrends.related_queries()
-            top_queries = []
-            rising_queries = []
-            if keyword in related:
-                # Top queries
-                top_df = related[keyword].get('top')
-                if top_df is not None and not top_df.empty:
-                    for _, row in top_df.head(20).iterrows():
-                        top_queries.append(WordCloudItem(
-                            text=str(row['query']),
-                            value=int(row['value'])
-                        ))
-                # Rising queries
-                rising_df = related[keyword].get('rising')
-                if rising_df is not None and not rising_df.empty:
-                    for _, row in rising_df.head(20).iterrows():
-                        val = row['value']
-                        if isinstance(val, str) and val == 'Breakout':
-                            val = 100
-                        rising_queries.append(WordCloudItem(
-                            text=str(row['query']),
-                            value=int(val)
-                        ))
-            return top_queries, rising_queries
+            related = plan.related_queries().get(keyword, {})
+            with plan.stage("convert"):
+                return (
+                    query_records(related.get('top'), limit=20),
+                    query_records(related.get('rising'), limit=20)
+                )
         except Exception as e:
             logger.error(f"Error fetching related queries: {e}")
+            plan.note_failure(e)
             return [], []
 
-    async def get_trends(self, keyword: str, timeframe: str = "today 12-m", geo: str = "US") -> TrendResponse:
-        """Main method — fetches all trend data with caching"""
-        cache_key = self._build_cache_key(keyword, timeframe, geo)
+    async def _aget_interest_over_time(self, keyword: str, timeframe: str, geo: str, plan: AsyncFetchPlan) -> list[InterestOverTimeData]:
+        """_get_interest_over_time for the async client"""
+        try:
+            if _series_store().enabled and len(plan.keywords) == 1:
+                return await self._aget_stored_interest_over_time(keyword, timeframe, geo, plan)
+            return (await plan.interest_over_time()).get(keyword, [])
+        except Exception as e:
+            logger.error(f"Error fetching interest over time: {e}")
+            plan.note_failure(e)
+            return []
 
-        # Check cache first
-        cached = await cache_service.get(cache_key)
-        if cached:
-            logger.info(f"Returning cached data for: {keyword}")
-            return TrendResponse(**cached)
+    async def _aget_stored_interest_over_time(self, keyword: str, timeframe: str, geo: str, plan: AsyncFetchPlan) -> list[InterestOverTimeData]:
+        """_get_stored_interest_over_time for the async client (SQLite calls run on a thread)"""
+        import pandas as pd
+        from app.services.series_store import (
+            infer_step,
+            records_series,
+            series_window,
+            stitch,
+            tail_start,
+            window_records
+        )
+        series_store = _series_store()
+        window = series_window(timeframe)
+        if window is not None:
+            start, step = window
+            history = await asyncio.to_thread(series_store.load, keyword, geo, step)
+            begin = tail_start(history, start, step)
+            if begin is not None:
+                today = pd.Timestamp.today()
+                tail = (await plan.interest_over_time_tail(f"{begin:%Y-%m-%d} {today:%Y-%m-%d}")).get(keyword)
+                with plan.stage("convert"):
+                    series = stitch(history, records_series(tail), step) if tail else None
+                if series is not None:
+                    await asyncio.to_thread(series_store.save, keyword, geo, step, series)
+                    with plan.stage("convert"):
+                        return window_records(series, start, step, keyword)
+                logger.info(f"New points for {keyword} don't overlap stored history, fetching the full window")
 
-        logger.info(f"Fetching fresh data for: {keyword}")
+        records = (await plan.interest_over_time()).get(keyword, [])
+        if window is not None and records:
+            series = records_series(records)
+            if infer_step(series.index) == window[1]:
+                await asyncio.to_thread(series_store.save, keyword, geo, window[1], series)
+        return records
 
-        # Fetch all data
-        interest_over_time = self._get_interest_over_time(keyword, timeframe, geo)
-        interest_by_region = self._get_interest_by_region(keyword, timeframe, geo)
-        related_queries, rising_queries = self._get_related_queries(keyword, timeframe, geo)
+    async def _aget_interest_by_region(self, keyword: str, timeframe: str, geo: str, plan: AsyncFetchPlan) -> list[RegionData]:
+        """_get_interest_by_region for the async client"""
+        try:
+            return (await plan.interest_by_region(resolution='REGION')).get(keyword, [])
+        except Exception as e:
+            logger.error(f"Error fetching interest by region: {e}")
+            plan.note_failure(e)
+            return []
 
-        response = TrendResponse(
-            keyword=keyword,
-            interest_over_time=interest_over_time,
-            interest_by_region=interest_by_region,
-            related_queries=related_queries,
-            rising_queries=rising_queries
+    async def _aget_related_queries(self, keyword: str, timeframe: str, geo: str, plan: AsyncFetchPlan) -> tuple[list[WordCloudItem], list[WordCloudItem]]:
+        """_get_related_queries for the async client"""
+        try:
+            return (await plan.related_queries()).get(keyword, ([], []))
+        except Exception as e:
+            logger.error(f"Error fetching related queries: {e}")
+            plan.note_failure(e)
+            return [], []
+
+    def _fetch_widgets(self, plan: FetchPlan, widgets: tuple[str, ...]) -> dict[str, Any]:
+        """Blocking fetch of some widgets from one payload — runs on the upstream executor"""
+        keyword = plan.keywords[0]
+        with self.clients.lease(plan):
+            results = {name: WIDGETS[name].fetch(self, keyword, plan) for name in widgets}
+        plan.log_timings()
+        return results
+
+    def _fetch_batch(self, plan: FetchPlan, related_for: list[str]) -> tuple[dict, dict]:
+        """
+        Blocking fetch of one batched payload (up to 5 keywords).
+        Returns interest over time per keyword on the payload's common scale,
+        plus related/rising queries for the keywords in related_for.
+        """
+        with self.clients.lease(plan):
+            interest_over_time = {
+                kw: self._get_interest_over_time(kw, plan.timeframe, plan.geo, plan=plan)
+                for kw in plan.keywords
+            }
+            related = {
+                kw: self._get_related_queries(kw, plan.timeframe, plan.geo, plan=plan)
+                for kw in related_for
+            }
+        plan.log_timings()
+        return interest_over_time, related
+
+    async def _afetch_widgets(self, plan: AsyncFetchPlan, widgets: tuple[str, ...]) -> dict[str, Any]:
+        """_fetch_widgets for the async client: the widgets are fetched concurrently"""
+        keyword = plan.keywords[0]
+        results = await asyncio.gather(*[WIDGETS[name].afetch(self, keyword, plan) for name in widgets])
+        plan.log_timings()
+        return dict(zip(widgets, results))
+
+    async def _afetch_batch(self, plan: AsyncFetchPlan, related_for: list[str]) -> tuple[dict, dict]:
+        """_fetch_batch for the async client"""
+        series, queries = await asyncio.gather(
+            asyncio.gather(*[self._aget_interest_over_time(kw, plan.timeframe, plan.geo, plan=plan) for kw in plan.keywords]),
+            asyncio.gather(*[self._aget_related_queries(kw, plan.timeframe, plan.geo, plan=plan) for kw in related_for])
         )
+        plan.log_timings()
+        return dict(zip(plan.keywords, series)), dict(zip(related_for, queries))
+
+    async def _call_upstream(self, worker: Callable, plan: FetchPlan, *args) -> Any:
+        """
+        Run a fetch worker under the rate limiter and circuit breaker
+        (blocking workers on the upstream threads, async ones on the loop).
+        Transient upstream failures are retried (only the failed widgets)
+        with jittered exponential backoff, as long as the retry budget allows.
+        Raises UpstreamFetchError, carrying the partial result if any widget
+        came back, when the fetch never completes.
+        Stage timings (all attempts) are reported to metrics at the end.
+        """
+        try:
+            return await self._call_with_retries(worker, plan, *args)
+        finally:
+            plan.observe()
 
-        # Store in cache
-        await cache_service.set(cache_key, response.model_dump(), ttl=3600)
+    async def _call_with_retries(self, worker: Callable, plan: FetchPlan, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.UPSTREAM_RETRY_BUDGET
+        attempt = 0
+        while True:
+            self._breaker.check()
+            try:
+                await self._limiter.acquire(max_wait=deadline - loop.time())
+                run = upstream_executor.run_async if asyncio.iscoroutinefunction(worker) else upstream_executor.run
+                result = await run(worker, plan, *args)
+            except BaseException:
+                self._breaker.release()
+                raise
 
+            failures = plan.failures
+            if not failures:
+                self._breaker.record_success()
+                return result
+            for failure in failures:
+                kind = "rate_limited" if isinstance(failure, TooManyRequestsError) else "error"
+                UPSTREAM_ERRORS.labels(plan.namespace, kind).inc()
+
+            error = failures[-1]
+            if not is_transient(error):
+                # The upstream answered, it just refused this request
+                self._breaker.release()
+                break
+            self._breaker.record_failure()
+            attempt += 1
+            delay = backoff_delay(
+                attempt - 1,
+                settings.UPSTREAM_RETRY_BASE_DELAY,
+                settings.UPSTREAM_RETRY_MAX_DELAY,
+                floor=retry_after(error)
+            )
+            if attempt >= settings.UPSTREAM_RETRY_ATTEMPTS or loop.time() + delay > deadline or not self._breaker.available:
+                break
+            logger.warning(f"Upstream fetch for {plan.keywords} failed ({error}), retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            plan.reset_failures()
+
+        raise UpstreamFetchError(
+            f"Google Trends request failed: {error}",
+            partial=result if plan.fetched else None
+        )
+
+    async def _cached_widgets(self, keywords: list[str], timeframe: str, geo: str, widgets: tuple[str, ...]) -> dict[str, dict[str, Any]]:
+        """Cached widget results for several keywords (L1, then one MGET), by keyword and widget"""
+        slots = [(kw, name) for kw in keywords for name in widgets]
+        entries = await self._lookup_many([self._widget_key(name, kw, timeframe, geo) for kw, name in slots])
+        cached = {kw: {} for kw in keywords}
+        for (kw, name), entry in zip(slots, entries):
+            if entry is not None:
+                cached[kw][name] = self._widget_model(name, entry)
+        return cached
+
+    async def _fetch_comparison(self, keywords: list[str], timeframe: str, geo: str) -> CompareResponse:
+        """
+        Build a comparison from one batched payload.
+        Region and query widgets already in the cache are reused; missing
+        regions are fetched concurrently with the batch.
+        """
+        cached = await self._cached_widgets(keywords, timeframe, geo, ("region", "queries"))
+        need_queries = [kw for kw in keywords if "queries" not in cached[kw]]
+        need_region = [kw for kw in keywords if "region" not in cached[kw]]
+        plan = self._plan(keywords, timeframe, geo, namespace="compare")
+        worker = self._afetch_batch if isinstance(plan, AsyncFetchPlan) else self._fetch_batch
+
+        async def region(kw: str) -> list[RegionData]:
+            # Not through get_region: a comparison isn't a region request to warm
+            entry = (await self._get_widgets(kw, timeframe, geo, ("region",)))["region"]
+            return self._widget_model("region", entry)
+
+        batch, regions = await asyncio.gather(
+            self._call_upstream(worker, plan, need_queries),
+            asyncio.gather(*[region(kw) for kw in need_region], return_exceptions=True),
+            return_exceptions=True
+        )
+        failed = next((r for r in [batch, *regions] if isinstance(r, BaseException)), None)
+        if failed is not None and not isinstance(failed, UpstreamError):
+            raise failed
+        if isinstance(batch, UpstreamFetchError) and batch.partial is not None:
+            batch = batch.partial
+        if isinstance(batch, BaseException):
+            raise batch
+        interest_over_time, related = batch
+        regions = {kw: [] if isinstance(r, BaseException) else r for kw, r in zip(need_region, regions)}
+        for kw in need_queries:
+            await self._index_queries(kw, related[kw])
+
+        comparisons = []
+        for kw in keywords:
+            top, rising = cached[kw].get("queries") or related[kw]
+            comparisons.append(TrendResponse(
+                keyword=kw,
+                interest_over_time=interest_over_time[kw],
+                interest_by_region=cached[kw]["region"] if "region" in cached[kw] else regions[kw],
+                related_queries=top,
+                rising_queries=rising
+            ))
+        response = CompareResponse(keywords=keywords, comparisons=comparisons)
+        if failed is not None:
+            raise UpstreamFetchError(f"Comparison is incomplete: {failed}", partial=response)
         return response
-    
-    async def get_region(self, keyword: str, timeframe: str = "today 12-m", geo: str = "US") -> list[RegionData]:
-        """Fetches only interest by region with its own cache key"""
-        cache_key = f"region:{keyword.lower().replace(' ', '_')}:{timeframe}:{geo}"
-
-        cached = await cache_service.get(cache_key)
-        if cached:
-            logger.info(f"Returning cached region data for: {keyword}")
-            return [RegionData(**r) for r in cached["data"]]
-
-        logger.info(f"Fetching fresh region data for: {keyword}")
-        result = self._get_interest_by_region(keyword, timeframe, geo)
-        await cache_service.set(cache_key, {"data": [r.model_dump() for r in result]}, ttl=3600)
-        return result
-    
-    async def get_interest_over_time(self, keyword: str, timeframe: str = "today 12-m", geo: str = "US") -> list[InterestOverTimeData]:
-        cache_key = f"iot:{keyword.lower().replace(' ', '_')}:{timeframe}:{geo}"
-
-        cached = await cache_service.get(cache_key)
-        if cached:
-            logger.info(f"Returning cached IOT data for: {keyword}")
-            return [InterestOverTimeData(**r) for r in cached["data"]]
-
-        logger.info(f"Fetching fresh IOT data for: {keyword}")
-        result = self._get_interest_over_time(keyword, timeframe, geo)
-        await cache_service.set(cache_key, {"data": [r.model_dump() for r in result]}, ttl=3600)
-        return result
+
+    def _compare_fetch(self, keywords: list[str], timeframe: str, geo: str) -> CachedFetch:
+        """Describe how to cache and fetch a keyword comparison"""
+        return CachedFetch(
+            cache_key=self._build_compare_key(keywords, timeframe, geo),
+            label=f"comparison for: {keywords}",
+            fetch=lambda: self._fetch_comparison(keywords, timeframe, geo),
+            dump=lambda result: result.model_dump(),
+            load=lambda c: CompareResponse(**c)
+        )
+
+    async def _fill(
+        self,
+        lock_key: str,
+        label: str,
+        fetch: Callable[[], Awaitable[Any]],
+        wait: Callable[[], Awaitable[Any]],
+        store: Callable[[Any, int, int], Awaitable[Any]],
+        background: bool = False
+    ) -> Any:
+        """
+        Fetch from upstream and write the result to the cache via store.
+        A short Redis lock makes other workers wait (with wait) for this
+        fetch's result; a background refresh that loses the lock just leaves
+        it to the winner and returns None.
+        An incomplete fetch is only cached for CACHE_FAILURE_TTL, and a
+        background refresh never replaces the (stale) entry with one.
+        """
+        token = await cache_service.acquire_lock(lock_key)
+        if token is None:
+            if background:
+                logger.info(f"Another worker is already refreshing {label}")
+                return None
+            # Another worker is already fetching — wait for its result
+            logger.info(f"Waiting for another worker to fetch {label}")
+            filled = await wait()
+            if filled:
+                return filled
+        try:
+            logger.info(f"{'Refreshing' if background else 'Fetching fresh'} {label}")
+            ttl, soft_ttl = settings.CACHE_HARD_TTL, settings.CACHE_SOFT_TTL
+            try:
+                result = await fetch()
+            except UpstreamFetchError as e:
+                if background or e.partial is None:
+                    raise
+                logger.warning(f"Serving incomplete {label}, cached for {settings.CACHE_FAILURE_TTL}s: {e}")
+                result = e.partial
+                ttl = soft_ttl = settings.CACHE_FAILURE_TTL
+            return await store(result, ttl, soft_ttl)
+        finally:
+            if token is not None:
+                await cache_service.release_lock(lock_key, token)
+
+    async def _fetch_and_store(self, spec: CachedFetch, background: bool = False) -> CacheEntry | None:
+        """Fetch spec from upstream and write it to its cache key (see _fill)"""
+        async def wait():
+            filled = await cache_service.wait_for(spec.cache_key)
+            if filled:
+                cache_service.local.set(spec.cache_key, filled)
+            return filled
+
+        async def store(result, ttl, soft_ttl):
+            entry = await cache_service.set(spec.cache_key, spec.dump(result), ttl=ttl, soft_ttl=soft_ttl)
+            entry.model = result
+            cache_service.local.set(spec.cache_key, entry)
+            return entry
+
+        return await self._fill(spec.cache_key, spec.label, spec.fetch, wait, store, background=background)
+
+    async def _fetch_widgets_and_store(
+        self,
+        keyword: str,
+        timeframe: str,
+        geo: str,
+        widgets: tuple[str, ...],
+        background: bool = False
+    ) -> dict[str, CacheEntry] | None:
+        """
+        Fetch some widgets of one keyword from a single payload and write
+        each to its own cache entry, in one pipelined round trip (see _fill).
+        """
+        keys = {name: self._widget_key(name, keyword, timeframe, geo) for name in widgets}
+        fetch_key = self._fetch_key(widgets, keyword, timeframe, geo)
+
+        async def fetch():
+            plan = self._new_plan(keyword, timeframe, geo, namespace=fetch_key.split(":", 1)[0])
+            worker = self._afetch_widgets if isinstance(plan, AsyncFetchPlan) else self._fetch_widgets
+            return await self._call_upstream(worker, plan, widgets)
+
+        async def wait():
+            filled = await asyncio.gather(*[cache_service.wait_for(key) for key in keys.values()])
+            if not all(filled):
+                return None
+            for key, entry in zip(keys.values(), filled):
+                cache_service.local.set(key, entry)
+            return dict(zip(widgets, filled))
+
+        async def store(results, ttl, soft_ttl):
+            values = {keys[name]: WIDGETS[name].dump(result) for name, result in results.items()}
+            if "iot" in results:
+                # Once per fetch of the series, rather than once per view
+                analytics_key = self._widget_key("analytics", keyword, timeframe, geo)
+                values[analytics_key] = self._analyze(results["iot"])
+            written = await cache_service.mset_with_ttl(values, ttl=ttl, soft_ttl=soft_ttl)
+            entries = {}
+            for name, result in results.items():
+                entry = written[keys[name]]
+                entry.model = result
+                cache_service.local.set(keys[name], entry)
+                entries[name] = entry
+            if "iot" in results:
+                cache_service.local.set(analytics_key, written[analytics_key])
+            if "queries" in results:
+                await self._index_queries(keyword, results["queries"])
+            return entries
+
+        label = f"{'+'.join(widgets)} data for: {keyword}"
+        return await self._fill(fetch_key, label, fetch, wait, store, background=background)
+
+    def _schedule_refresh(self, key: str, label: str, refresh: Callable[[], Awaitable[Any]]) -> bool:
+        """Run refresh in the background unless a fetch for key is already running"""
+        if key in self._refreshing or key in self._singleflight:
+            return False
+        if not self._breaker.available:
+            # Upstream is failing — keep serving the stale entry
+            return False
+        task = asyncio.create_task(self._singleflight.do(key, refresh))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda t: self._refresh_done(key, label, t))
+        return True
+
+    def _schedule_widget_refresh(self, keyword: str, timeframe: str, geo: str, widgets: tuple[str, ...]) -> bool:
+        """Refresh some widgets of one keyword in the background (one payload)"""
+        return self._schedule_refresh(
+            self._fetch_key(widgets, keyword, timeframe, geo),
+            f"{'+'.join(widgets)} data for: {keyword}",
+            lambda: self._fetch_widgets_and_store(keyword, timeframe, geo, widgets, background=True)
+        )
+
+    def _refresh_done(self, key: str, label: str, task: asyncio.Task):
+        self._refreshing.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background refresh failed for {label}: {task.exception()}")
+
+    def _load(self, spec: CachedFetch, entry: CacheEntry) -> Any:
+        """Build (once) the model object for a cache entry"""
+        if entry.model is None:
+            entry.model = spec.load(entry.value)
+        return entry.model
+
+    def _widget_model(self, name: str, entry: CacheEntry) -> Any:
+        """Build (once) the result object for a widget entry"""
+        if entry.model is None:
+            entry.model = WIDGETS[name].load(entry.value)
+        return entry.model
+
+    async def _lookup(self, key: str) -> CacheEntry | None:
+        """Check L1, then Redis (promoting Redis hits into L1)"""
+        entry = cache_service.local.get(key)
+        if entry is None:
+            entry = await cache_service.get_entry(key)
+            if entry is not None:
+                cache_service.local.set(key, entry)
+        return entry
+
+    async def _lookup_many(self, keys: list[str]) -> list[CacheEntry | None]:
+        """_lookup for several keys: L1 first, then one MGET for the rest"""
+        entries = [cache_service.local.get(key) for key in keys]
+        remaining = [i for i, entry in enumerate(entries) if entry is None]
+        fetched = await cache_service.mget_entries([keys[i] for i in remaining])
+        for i, entry in zip(remaining, fetched):
+            if entry is not None:
+                cache_service.local.set(keys[i], entry)
+                entries[i] = entry
+        return entries
+
+    async def _get_or_fetch(self, spec: CachedFetch) -> Any:
+        """
+        Serve spec from cache (L1, then Redis), otherwise fetch it once.
+        A stale entry is returned immediately while a refresh runs in the
+        background (or, while the upstream circuit is open, without one).
+        Concurrent misses in this process share one fetch
+        (single-flight).
+        """
+        entry = await self._lookup(spec.cache_key)
+        if entry:
+            def refresh():
+                return self._fetch_and_store(spec, background=True)
+
+            if entry.stale and self._schedule_refresh(spec.cache_key, spec.label, refresh):
+                logger.info(f"Serving stale {spec.label} while refreshing")
+            logger.info(f"Returning cached {spec.label}")
+        else:
+            entry = await self._singleflight.do(spec.cache_key, lambda: self._fetch_and_store(spec))
+            if entry is None:
+                # Joined a background refresh that deferred to another worker
+                entry = await self._fetch_and_store(spec)
+        return self._load(spec, entry)
+
+    def _widgets_for(self, kind: str) -> tuple[str, ...]:
+        if kind not in KIND_WIDGETS:
+            raise ValueError(f"Unknown trend data kind: {kind}")
+        return KIND_WIDGETS[kind]
+
+    async def _get_widgets(
+        self,
+        keyword: str,
+        timeframe: str,
+        geo: str,
+        widgets: tuple[str, ...],
+        entries: dict[str, CacheEntry | None] | None = None
+    ) -> dict[str, CacheEntry]:
+        """
+        Entries for some widgets of one keyword, from cache (L1, then one
+        MGET) or else fetched together from one payload. Only the missing
+        widgets are fetched, and a full fetch already in flight for the
+        keyword is joined instead. Stale entries are returned straight away
+        while a background refresh replaces them. `entries` holds lookups
+        the caller has already done.
+        """
+        request = request_key(keyword, timeframe, geo)
+        # Equivalent spellings fetch (and are coalesced) under their canonical form
+        timeframe, geo = request.timeframe, request.geo
+        if entries is None:
+            keys = [self._widget_key(name, keyword, timeframe, geo) for name in widgets]
+            entries = dict(zip(widgets, await self._lookup_many(keys)))
+        hit = None not in entries.values()
+        key_stats.record(request, hit)
+        if hit and request.changed:
+            logger.debug(f"Cache hit for {keyword!r} {timeframe!r} {geo!r} via its canonical key")
+
+        stale = tuple(name for name in FETCH_ORDER if entries.get(name) is not None and entries[name].stale)
+        if stale and self._schedule_widget_refresh(keyword, timeframe, geo, stale):
+            logger.info(f"Serving stale {'+'.join(stale)} data for {keyword} while refreshing")
+
+        missing = tuple(name for name in FETCH_ORDER if name in entries and entries[name] is None)
+        if missing:
+            key = self._fetch_key(missing, keyword, timeframe, geo)
+            full_key = self._build_cache_key(keyword, timeframe, geo)
+            if full_key in self._singleflight:
+                # A full fetch of this keyword is already running and covers these widgets
+                key = full_key
+            fetched = await self._singleflight.do(
+                key, lambda: self._fetch_widgets_and_store(keyword, timeframe, geo, missing)
+            )
+            if fetched is None:
+                # Joined a background refresh that deferred to another worker
+                fetched = await self._fetch_widgets_and_store(keyword, timeframe, geo, missing)
+            entries.update({name: fetched[name] for name in missing})
+        return entries
+
+    def _analyze(self, series: list[InterestOverTimeData]) -> dict:
+        """Analytics body for an interest-over-time series"""
+        from app.services.analytics import analyze
+        with timed(CONVERT_LATENCY, "analytics", stage="analytics"):
+            return analyze(series, settings.ANALYTICS_WINDOW, settings.ANALYTICS_BASELINE, settings.ANALYTICS_Z_THRESHOLD)
+
+    async def _store_analytics(self, key: str, iot: CacheEntry) -> CacheEntry:
+        """Compute and cache analytics from a cached series, expiring with it"""
+        ttl = max(int(min(iot.expires_at - time.time(), settings.CACHE_HARD_TTL)), 1)
+        soft_ttl = max(int(min(iot.fresh_for, ttl)), 1)
+        written = await cache_service.mset_with_ttl({key: self._analyze(self._widget_model("iot", iot))}, ttl=ttl, soft_ttl=soft_ttl)
+        cache_service.local.set(key, written[key])
+        return written[key]
+
+    async def _index_queries(self, keyword: str, queries: tuple[list[WordCloudItem], list[WordCloudItem]]):
+        """Add a fetch's related queries to the suggestion index (a failure only loses the suggestions)"""
+        try:
+            await suggest_index.add(keyword, *queries)
+        except Exception as e:
+            logger.error(f"Indexing suggestions for {keyword} failed: {e}")
+
+    def _keyword_body(self, keyword: str, body: bytes) -> bytes:
+        """Prefix a cached JSON object body with the requested keyword"""
+        return codec.dumps({"keyword": keyword})[:-1] + b"," + body[1:]
+
+    def _trends_body(self, keyword: str, entries: dict[str, CacheEntry]) -> bytes:
+        """Splice widget bodies into a full TrendResponse JSON body, without parsing them"""
+        parts = [codec.dumps({"keyword": keyword})[:-1]]
+        parts.extend(entries[name].body[1:-1] for name in KIND_WIDGETS["trends"])
+        return b",".join(parts) + b"}"
+
+    def _trends_model(self, keyword: str, entries: dict[str, CacheEntry]) -> TrendResponse:
+        top, rising = self._widget_model("queries", entries["queries"])
+        return TrendResponse(
+            keyword=keyword,
+            interest_over_time=self._widget_model("iot", entries["iot"]),
+            interest_by_region=self._widget_model("region", entries["region"]),
+            related_queries=top,
+            rising_queries=rising
+        )
+
+    def upstream_stats(self) -> dict:
+        """Client pool, circuit breaker and worker pool state for this worker"""
+        return {
+            "backend": "httpx" if self._async_client is not None else settings.TRENDS_BACKEND,
+            "clients": self._client_stats(),
+            "breaker": {"state": self._breaker.state, "failures": self._breaker.failures},
+            "pending_fetches": upstream_executor.pending
+        }
+
+    def _client_stats(self) -> dict:
+        """Upstream client state, without creating clients that no fetch has needed yet"""
+        if self._async_client is not None:
+            return self._async_client.stats()
+        if self._clients is not None:
+            return self._clients.stats()
+        # The pool's shape, as no client has been created yet
+        return {"size": settings.TRENDS_POOL_SIZE, "idle": 0, "created": 0, "evicted": 0}
+
+    async def aclose(self):
+        """Close the async client's connections and the series store, if fetches opened them"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+        # Checked rather than imported: a worker that never fetched has no store to close
+        store = sys.modules.get("app.services.series_store")
+        if store is not None:
+            store.series_store.close()
+
+    async def _due(self, kind: str, keyword: str, timeframe: str, geo: str, horizon: float) -> tuple[str, ...]:
+        """Widgets of kind that are missing or go stale within horizon seconds"""
+        widgets = self._widgets_for(kind)
+        entries = await self._lookup_many([self._widget_key(name, keyword, timeframe, geo) for name in widgets])
+        due = {name for name, entry in zip(widgets, entries) if entry is None or entry.fresh_for <= horizon}
+        return tuple(name for name in FETCH_ORDER if name in due)
+
+    async def refresh_if_needed(self, kind: str, keyword: str, timeframe: str, geo: str, horizon: float = 0) -> bool:
+        """
+        Schedule a background refresh when the entry is missing or goes stale
+        within horizon seconds. Returns True if a refresh was scheduled.
+        """
+        due = await self._due(kind, keyword, timeframe, geo, horizon)
+        return bool(due) and self._schedule_widget_refresh(keyword, timeframe, geo, due)
+
+    async def warm(self, kind: str, keyword: str, timeframe: str, geo: str, horizon: float = 0) -> bool:
+        """
+        Fetch and cache an entry now unless it stays fresh for horizon
+        seconds. Returns True if it was fetched. Unlike a request, failures
+        raise and incomplete results are not cached at all.
+        """
+        due = await self._due(kind, keyword, timeframe, geo, horizon)
+        if not due:
+            return False
+        await self._singleflight.do(
+            self._fetch_key(due, keyword, timeframe, geo),
+            lambda: self._fetch_widgets_and_store(keyword, timeframe, geo, due, background=True)
+        )
+        return True
+
+    async def get_trends(self, keyword: str, timeframe: str = "today 12-m", geo: str = "US", raw: bool = False) -> TrendResponse | bytes:
+        """
+        Main method — fetches all trend data with caching.
+        The response is assembled from the three widget entries, fetching
+        only the ones that are missing.
+        raw=True returns the serialized response body instead of the model.
+        """
+        self._request("trends", keyword, timeframe, geo)
+        entries = await self._get_widgets(keyword, timeframe, geo, KIND_WIDGETS["trends"])
+        return self._trends_body(keyword, entries) if raw else self._trends_model(keyword, entries)
+
+    async def get_region(self, keyword: str, timeframe: str = "today 12-m", geo: str = "US", raw: bool = False) -> list[RegionData] | bytes:
+        """
+        Fetches only interest by region (shares its cache entry with get_trends).
+        raw=True returns the serialized {"interest_by_region": [...]} body.
+        """
+        self._request("region", keyword, timeframe, geo)
+        entry = (await self._get_widgets(keyword, timeframe, geo, ("region",)))["region"]
+        return entry.body if raw else self._widget_model("region", entry)
+
+    async def get_interest_over_time(self, keyword: str, timeframe: str = "today 12-m", geo: str = "US", raw: bool = False) -> list[InterestOverTimeData] | bytes:
+        """
+        Fetches only interest over time (shares its cache entry with get_trends).
+        raw=True returns the serialized {"interest_over_time": [...]} body.
+        """
+        self._request("iot", keyword, timeframe, geo)
+        entry = (await self._get_widgets(keyword, timeframe, geo, ("iot",)))["iot"]
+        return entry.body if raw else self._widget_model("iot", entry)
+
+    async def _analytics_entry(self, keyword: str, timeframe: str, geo: str) -> CacheEntry:
+        """The cached analytics entry, computing it from the series if it is missing"""
+        self._request("analytics", keyword, timeframe, geo)
+        key = self._widget_key("analytics", keyword, timeframe, geo)
+        entry = await self._lookup(key)
+        if entry is None or entry.stale:
+            # Fetching the series, or refreshing it in the background, recomputes the analytics
+            iot = (await self._get_widgets(keyword, timeframe, geo, ("iot",)))["iot"]
+            if entry is None:
+                entry = await self._lookup(key) or await self._store_analytics(key, iot)
+        return entry
+
+    async def get_analytics(self, keyword: str, timeframe: str = "today 12-m", geo: str = "US", raw: bool = False) -> TrendAnalytics | bytes:
+        """
+        Rolling means, period-over-period changes and anomaly flags for
+        the interest-over-time series. They are computed when the series is
+        fetched and cached beside it, so a view only reads them.
+        raw=True returns the serialized response body.
+        """
+        entry = await self._analytics_entry(keyword, timeframe, geo)
+        body = self._keyword_body(keyword, entry.body)
+        return body if raw else TrendAnalytics.model_validate_json(body)
+
+    async def get_body(self, kind: str, keyword: str, timeframe: str = "today 12-m", geo: str = "US") -> CachedBody:
+        """
+        Serialized response for a kind of request (trends, region, iot or
+        analytics — the bodies the POST routes send), with how long it
+        stays fresh: the least fresh of the entries it is built from.
+        """
+        if kind == "analytics":
+            entry = await self._analytics_entry(keyword, timeframe, geo)
+            return CachedBody(self._keyword_body(keyword, entry.body), entry.fresh_for)
+        self._request(kind, keyword, timeframe, geo)
+        entries = await self._get_widgets(keyword, timeframe, geo, self._widgets_for(kind))
+        fresh_for = min(entry.fresh_for for entry in entries.values())
+        if kind == "trends":
+            return CachedBody(self._trends_body(keyword, entries), fresh_for)
+        return CachedBody(entries[KIND_WIDGETS[kind][0]].body, fresh_for)
+
+    async def stream_trends(self, requests: list[TrendRequest]) -> AsyncIterator[tuple[int, bytes | None, Exception | None]]:
+        """
+        Resolve many (keyword, timeframe, geo) requests, yielding
+        (index, body, error) as each one is ready: every cache hit first
+        (one MGET for all their widgets), then misses as their concurrent
+        fetches finish. Fetches stay under the usual upstream limits, and
+        identical requests share one fetch.
+        """
+        widgets = KIND_WIDGETS["trends"]
+        valid = []
+        for index, r in enumerate(requests):
+            try:
+                self._request("trends", r.keyword, r.timeframe, r.geo)
+            except InvalidRequestError as e:
+                yield index, None, e
+                continue
+            valid.append(index)
+        keys = [self._widget_key(name, requests[i].keyword, requests[i].timeframe, requests[i].geo) for i in valid for name in widgets]
+        found = await self._lookup_many(keys)
+        lookups = {i: dict(zip(widgets, found[n:n + len(widgets)])) for i, n in zip(valid, range(0, len(found), len(widgets)))}
+
+        misses = []
+        for index, entries in lookups.items():
+            r = requests[index]
+            if None in entries.values():
+                misses.append(index)
+                continue
+            # Nothing to fetch, so this only schedules refreshes of stale widgets
+            entries = await self._get_widgets(r.keyword, r.timeframe, r.geo, widgets, entries=entries)
+            yield index, self._trends_body(r.keyword, entries), None
+
+        async def fetch(index: int):
+            r = requests[index]
+            try:
+                entries = await self._get_widgets(r.keyword, r.timeframe, r.geo, widgets, entries=lookups[index])
+                return index, self._trends_body(r.keyword, entries), None
+            except Exception as e:
+                return index, None, e
+
+        tasks = [asyncio.ensure_future(fetch(i)) for i in misses]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield await done
+        finally:
+            # Client went away: shared fetches carry on and still fill the cache
+            for task in tasks:
+                task.cancel()
+
+    async def compare_trends(self, keywords: list[str], timeframe: str = "today 12-m", geo: str = "US") -> CompareResponse:
+        """
+        Compares up to 5 keywords on one common 0–100 scale.
+        On a miss all keywords go into a single batched payload, and the
+        keywords' cached trends are reused via one MGET.
+        """
+        timeframe, geo = canonical_timeframe(timeframe), canonical_geo(geo)
+        response = await self._get_or_fetch(self._compare_fetch(keywords, timeframe, geo))
+
+        # The same set may have been cached (or coalesced) in another order or spelling
+        by_keyword = {canonical_keyword(c.keyword): c for c in response.comparisons}
+        return CompareResponse(
+            keywords=keywords,
+            comparisons=[by_keyword[canonical_keyword(kw)].model_copy(update={"keyword": kw}) for kw in keywords]
+        )
 
 
 # Single instance
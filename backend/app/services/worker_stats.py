@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+
+from app.core.config import settings
+from app.core.cache import cache_service
+from app.core.keys import key_stats
+
+logger = logging.getLogger(__name__)
+
+WORKERS_KEY = "workers:stats"
+
+
+def _ratio(part: float, whole: float) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
+
+def merge(snapshots: list[dict]) -> dict:
+    """
+    Sum the numeric fields of several snapshots, nested dicts included.
+    Strings and flags are left out, and hit ratios are recomputed from the
+    summed counts rather than added up.
+    """
+    total: dict = {}
+    for snapshot in snapshots:
+        for name, value in snapshot.items():
+            if isinstance(value, dict):
+                total[name] = merge([total.get(name, {}), value])
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                total[name] = total.get(name, 0) + value
+    if "hit_ratio" in total:
+        lookups = total.get("lookups", total.get("hits", 0) + total.get("misses", 0))
+        total["hit_ratio"] = _ratio(total.get("hits", 0), lookups)
+        if "hit_ratio_without_normalization" in total:
+            total["hit_ratio_without_normalization"] = _ratio(total["hits"] - total.get("recovered_hits", 0), lookups)
+    return total
+
+
+class WorkerStats:
+    """
+    Makes per-worker counters visible from any worker.
+
+    Cache, key and upstream stats live in each process, so with several
+    workers /health/cache only describes whichever one answered. Every
+    worker writes a snapshot of its stats to one Redis hash each
+    WORKER_STATS_INTERVAL, and collect() reads them all back with their
+    totals. Workers that stop reporting drop out after three intervals.
+    """
+
+    def __init__(self):
+        self.host = socket.gethostname()
+        self.started_at = time.time()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def worker_id(self) -> str:
+        # Read per call: a forked worker has a new pid
+        return f"{self.host}:{os.getpid()}"
+
+    def snapshot(self, service) -> dict:
+        """This worker's current stats"""
+        return {
+            "worker": self.worker_id,
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "reported_at": time.time(),
+            "cache": cache_service.cache_stats(),
+            "keys": key_stats.as_dict(),
+            "upstream": service.upstream_stats()
+        }
+
+    async def report(self, service):
+        """Write this worker's snapshot to Redis"""
+        snapshot = json.dumps(self.snapshot(service))
+
+        def queue(pipe):
+            pipe.hset(WORKERS_KEY, self.worker_id, snapshot)
+            pipe.expire(WORKERS_KEY, settings.WORKER_STATS_INTERVAL * 3)
+
+        await cache_service.pipeline(queue, name="worker_stats")
+
+    async def collect(self, service) -> dict:
+        """Every live worker's latest snapshot plus their totals (only this worker's without Redis)"""
+        replies = await cache_service.pipeline(lambda pipe: pipe.hgetall(WORKERS_KEY), name="worker_stats")
+        if replies is None:
+            workers = [self.snapshot(service)]
+        else:
+            cutoff = time.time() - settings.WORKER_STATS_INTERVAL * 3
+            snapshots = [json.loads(value) for value in replies[0].values()]
+            workers = sorted((s for s in snapshots if s["reported_at"] >= cutoff), key=lambda s: s["worker"])
+            gone = [s["worker"] for s in snapshots if s["reported_at"] < cutoff]
+            if gone:
+                await cache_service.pipeline(lambda pipe: pipe.hdel(WORKERS_KEY, *gone), name="worker_stats")
+        totals = merge([{k: s[k] for k in ("cache", "keys", "upstream")} for s in workers])
+        return {"workers": len(workers), "totals": totals, "per_worker": workers}
+
+    async def _run(self, service):
+        while True:
+            try:
+                await self.report(service)
+            except Exception as e:
+                logger.error(f"Reporting worker stats failed: {e}")
+            await asyncio.sleep(settings.WORKER_STATS_INTERVAL)
+
+    def start(self, service):
+        """Start reporting in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(service))
+
+    async def stop(self):
+        """Stop reporting and remove this worker's snapshot"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await cache_service.pipeline(lambda pipe: pipe.hdel(WORKERS_KEY, self.worker_id), name="worker_stats")
+
+
+# Single instance used across the entire app
+worker_stats = WorkerStats()
@@ -0,0 +1,115 @@
+"""
+Upstream fetch cost per backend: pytrends (pooled clients on worker
+threads, DataFrame conversion) vs httpx (native async client, JSON parsed
+straight into models).
+
+Each fetch is what a cold /api/trends costs upstream: explore plus the
+multiline, comparedgeo and relatedsearches widgets for one keyword,
+converted to response models, through TrendsService's usual retry and
+worker limits. Runs against benchmarks.fake_trends, so the latencies are
+the fake's delay plus the client's own overhead.
+
+Reported per backend: p50/p95 latency per fetch and fetches per second
+with --concurrency fetches in flight, peak Python allocations during one
+fetch (tracemalloc), and how much the peak RSS grew over the run.
+
+Run from backend/:
+    python -m benchmarks.bench_backends --fetches 200 --concurrency 20 --latency 0.05
+"""
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import time
+import tracemalloc
+
+from benchmarks.fake_trends import FakeTrendsConfig, FakeTrendsServer
+from benchmarks.load_test import percentile
+
+BACKENDS = ("pytrends", "httpx")
+
+
+def rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def bench(backend: str, args) -> dict:
+    from app.core.config import settings
+    from app.services.trends_service import KIND_WIDGETS, TrendsService
+
+    settings.TRENDS_BACKEND = backend
+    service = TrendsService()
+    widgets = KIND_WIDGETS["trends"]
+
+    async def fetch(keyword: str) -> float:
+        plan = service._new_plan(keyword, "today 12-m", "US")
+        worker = service._afetch_widgets if service.async_client else service._fetch_widgets
+        start = time.perf_counter()
+        await service._call_upstream(worker, plan, widgets)
+        return time.perf_counter() - start
+
+    # Warm up connections and cookies outside the measurement
+    await fetch(f"{backend} warmup")
+
+    tracemalloc.start()
+    await fetch(f"{backend} traced")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rss_before = rss_mb()
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def limited(i: int) -> float:
+        async with limit:
+            return await fetch(f"{backend} keyword {i}")
+
+    start = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*[limited(i) for i in range(args.fetches)]))
+    duration = time.perf_counter() - start
+    await service.aclose()
+
+    return {
+        "fetches_per_s": round(args.fetches / duration, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "rss_growth_mb": round(rss_mb() - rss_before, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--fetches", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=FakeTrendsConfig.latency, help="fake upstream seconds per call")
+    parser.add_argument("--points", type=int, default=FakeTrendsConfig.points)
+    parser.add_argument("--regions", type=int, default=FakeTrendsConfig.regions)
+    parser.add_argument("--queries", type=int, default=FakeTrendsConfig.queries)
+    args = parser.parse_args()
+
+    fake = FakeTrendsServer(FakeTrendsConfig(args.latency, 0.0, args.points, args.regions, args.queries))
+    fake.start()
+    os.environ["TRENDS_BASE_URL"] = fake.url
+    os.environ["UPSTREAM_RATE"] = "0"
+    os.environ["UPSTREAM_MAX_WORKERS"] = str(args.concurrency)
+    os.environ["TRENDS_POOL_SIZE"] = str(args.concurrency)
+    os.environ["SERIES_STORE_PATH"] = ""
+    logging.disable(logging.ERROR)
+
+    print(f"{args.fetches} fetches, {args.concurrency} in flight, fake latency {args.latency}s")
+    try:
+        for backend in args.backends:
+            r = asyncio.run(bench(backend, args))
+            print(
+                f"  {backend:9} {r['fetches_per_s']:>8} fetches/s  p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  "
+                f"peak alloc {r['peak_alloc_kb']:>8} KB/fetch  peak RSS +{r['rss_growth_mb']} MB"
+            )
+    finally:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Serialization cost of one /api/trends cache hit.
+
+Compares the old hit path (json.loads -> TrendResponse(**cached) ->
+FastAPI response_model validation + re-serialization) against serving the
+pre-serialized body stored by CacheService.
+
+Run from backend/:
+    python -m benchmarks.bench_cache_hit --points 260 --iterations 2000
+"""
+import argparse
+import json
+import time
+from datetime import date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core import codec
+from app.models.trends import TrendResponse
+
+
+def make_payload(points: int) -> dict:
+    """A TrendResponse-shaped dict with a weekly series of the given length"""
+    start = date(2020, 1, 5)
+    return {
+        "keyword": "Spectrum Internet",
+        "interest_over_time": [
+            {"date": (start + timedelta(weeks=i)).isoformat(), "value": (i * 7) % 101, "keyword": "Spectrum Internet"}
+            for i in range(points)
+        ],
+        "interest_by_region": [{"region": f"Region {i}", "value": 100 - i} for i in range(20)],
+        "related_queries": [{"text": f"spectrum query {i}", "value": 100 - i} for i in range(20)],
+        "rising_queries": [{"text": f"spectrum rising {i}", "value": 5000 - i * 100} for i in range(20)],
+    }
+
+
+def old_hit(stored: str) -> bytes:
+    cached = json.loads(stored)
+    response = TrendResponse(**cached)
+    # What FastAPI does with a model returned from a response_model route
+    validated = TrendResponse.model_validate(response.model_dump())
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def new_hit(stored: bytes) -> bytes:
+    body, _, _ = codec.unpack(stored)
+    return body
+
+
+def bench(fn, arg, iterations: int) -> float:
+    """Mean microseconds per call"""
+    fn(arg)  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=260, help="series length (260 = 5 years weekly)")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    payload = make_payload(args.points)
+    old_stored = json.dumps(payload)
+    new_stored = codec.pack(codec.dumps(payload), fresh_until=0, expires_at=0)
+
+    old_us = bench(old_hit, old_stored, args.iterations)
+    new_us = bench(new_hit, new_stored, args.iterations)
+
+    print(f"series points:         {args.points}")
+    print(f"stored bytes (old):    {len(old_stored)}")
+    print(f"stored bytes (new):    {len(new_stored)}")
+    print(f"old hit path:          {old_us:9.1f} us/hit")
+    print(f"pre-serialized path:   {new_us:9.1f} us/hit")
+    print(f"CPU saved per hit:     {old_us - new_us:9.1f} us ({old_us / max(new_us, 1e-9):.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
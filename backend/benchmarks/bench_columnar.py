@@ -0,0 +1,107 @@
+"""
+Cache footprint and decode cost of the widget entries behind one
+/api/trends response: JSON bodies vs the columnar format
+(app.core.columnar, CACHE_COLUMNAR).
+
+Per keyword (its iot, region and queries entries), reported for both:
+- Redis bytes: the stored payloads, as codec.pack writes them (zlib above
+  CACHE_COMPRESS_MIN_BYTES, so the JSON row is already compressed)
+- L1 heap: Python memory held by --keywords entries read back from Redis
+  (tracemalloc), before and after their models are built
+- body: microseconds to turn a Redis payload into the response body
+- models: microseconds to build the widget results from a payload
+
+Run from backend/:
+    python -m benchmarks.bench_columnar --points 260 --keywords 500
+"""
+import argparse
+import time
+import tracemalloc
+
+from app.core import codec, columnar
+from app.core.cache import _decode
+from app.services.trends_service import WIDGETS
+from benchmarks.bench_cache_hit import make_payload
+
+FIELDS = {
+    "iot": ("interest_over_time",),
+    "region": ("interest_by_region",),
+    "queries": ("related_queries", "rising_queries"),
+}
+
+
+def payloads(points: int, encode: bool) -> dict[str, bytes]:
+    """The stored payload of each widget entry for one keyword"""
+    response = make_payload(points)
+    stored = {}
+    for name, fields in FIELDS.items():
+        value = {field: response[field] for field in fields}
+        body = columnar.encode(value) if encode else codec.dumps(value)
+        stored[name] = codec.pack(body, fresh_until=0, expires_at=0)
+    return stored
+
+
+def per_call(fn, iterations: int) -> float:
+    """Mean microseconds per call"""
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def held_kb(stored: dict[str, bytes], keywords: int, models: bool) -> float:
+    """Python memory held per keyword by its entries as read from Redis"""
+    tracemalloc.start()
+    entries = []
+    for _ in range(keywords):
+        # A copy per keyword, as each one is its own Redis reply
+        read = {name: _decode(bytes(payload)) for name, payload in stored.items()}
+        if models:
+            for name, entry in read.items():
+                entry.model = WIDGETS[name].load(entry.value)
+        entries.append(read)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / keywords / 1024
+
+
+def measure(points: int, keywords: int, iterations: int, encode: bool) -> dict:
+    stored = payloads(points, encode)
+
+    def body():
+        for payload in stored.values():
+            _decode(payload).body
+
+    def models():
+        for name, payload in stored.items():
+            WIDGETS[name].load(_decode(payload).value)
+
+    return {
+        "redis_bytes": sum(map(len, stored.values())),
+        "l1_kb": held_kb(stored, keywords, models=False),
+        "l1_models_kb": held_kb(stored, keywords, models=True),
+        "body_us": per_call(body, iterations),
+        "models_us": per_call(models, iterations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=260, help="series length (260 = 5 years weekly)")
+    parser.add_argument("--keywords", type=int, default=500, help="keywords held for the heap measurement")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{args.points} points per series, per keyword (iot + region + queries entries):")
+    print(f"  {'':9} {'Redis bytes':>12} {'L1 heap KB':>11} {'+ models KB':>12} {'body us':>9} {'models us':>10}")
+    for label, encode in (("JSON", False), ("columnar", True)):
+        r = measure(args.points, args.keywords, args.iterations, encode)
+        print(
+            f"  {label:9} {r['redis_bytes']:>12} {r['l1_kb']:>11.1f} {r['l1_models_kb']:>12.1f} "
+            f"{r['body_us']:>9.1f} {r['models_us']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+DataFrame -> model conversion: iterrows loops vs the vectorized converters.
+
+The legacy functions below are the loops trends_service used before
+app/services/converters.py. Frames are synthetic, shaped like pytrends
+output.
+
+Run from backend/:
+    python -m benchmarks.bench_converters --rows 10000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.models.trends import InterestOverTimeData, RegionData, WordCloudItem
+from app.services.converters import interest_over_time_records, region_records, query_records
+
+KEYWORD = "Spectrum Internet"
+
+
+def legacy_interest_over_time(df, keyword):
+    result = []
+    for date, row in df.iterrows():
+        if keyword in row:
+            result.append(InterestOverTimeData(date=str(date)[:10], value=int(row[keyword]), keyword=keyword))
+    return result
+
+
+def legacy_region(df, keyword):
+    result = []
+    for region, row in df.iterrows():
+        if keyword in row and int(row[keyword]) > 0:
+            result.append(RegionData(region=str(region), value=int(row[keyword])))
+    result.sort(key=lambda x: x.value, reverse=True)
+    return result[:20]
+
+
+def legacy_queries(df):
+    result = []
+    for _, row in df.head(20).iterrows():
+        val = row['value']
+        if isinstance(val, str) and val == 'Breakout':
+            val = 100
+        result.append(WordCloudItem(text=str(row['query']), value=int(val)))
+    return result
+
+
+def make_frames(rows: int):
+    rng = np.random.default_rng(0)
+    series = pd.DataFrame(
+        {KEYWORD: rng.integers(0, 101, rows), "isPartial": False},
+        index=pd.date_range("2004-01-01", periods=rows, freq="h")
+    )
+    regions = pd.DataFrame(
+        {KEYWORD: rng.integers(0, 101, rows)},
+        index=pd.Index([f"Region {i:05d}" for i in range(rows)], name="geoName")
+    )
+    queries = pd.DataFrame({
+        "query": [f"spectrum query {i}" for i in range(rows)],
+        "value": ["Breakout" if i % 7 == 0 else int(v) for i, v in enumerate(rng.integers(0, 5000, rows))]
+    })
+    return series, regions, queries
+
+
+def timed(fn, *args, repeat: int = 3) -> tuple[float, object]:
+    """Best-of-N milliseconds and the last result"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    series, regions, queries = make_frames(args.rows)
+    cases = [
+        ("interest_over_time", legacy_interest_over_time, (series, KEYWORD), interest_over_time_records, (series, KEYWORD)),
+        ("interest_by_region", legacy_region, (regions, KEYWORD), region_records, (regions, KEYWORD)),
+        ("related_queries", legacy_queries, (queries,), query_records, (queries,)),
+    ]
+
+    print(f"rows: {args.rows}")
+    print(f"{'stage':<20} {'iterrows':>12} {'vectorized':>12} {'speedup':>9}")
+    for name, legacy, legacy_args, fast, fast_args in cases:
+        legacy_ms, expected = timed(legacy, *legacy_args)
+        fast_ms, actual = timed(fast, *fast_args)
+        assert [m.model_dump() for m in expected] == [m.model_dump() for m in actual], name
+        print(f"{name:<20} {legacy_ms:>10.1f}ms {fast_ms:>10.1f}ms {legacy_ms / max(fast_ms, 1e-9):>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Cold start of an API worker: time to import app.main, RSS afterwards,
+and which heavy modules the import (and a cache hit) pulls in.
+
+Each run is a fresh interpreter, so nothing is already imported. After
+the import it serves GET /health and a cache hit from L1 in-process (no
+Redis needed) and reports RSS again, since neither should load the
+upstream stack.
+
+Run from backend/:
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY = ("pandas", "numpy", "lxml", "pytrends.request", "requests", "httpx")
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+loaded = [m for m in HEAVY if m in sys.modules]
+
+import asyncio
+from app.core.cache import CacheEntry, cache_service
+from app.core.keys import cache_key
+from app.main import app
+from app.services.trends_service import trends_service
+
+async def serve():
+    for name, value in (
+        ("iot", {"interest_over_time": []}),
+        ("region", {"interest_by_region": []}),
+        ("queries", {"related_queries": [], "rising_queries": []}),
+    ):
+        cache_service.local.set(cache_key(name, "startup", "today 12-m", "US"), CacheEntry(value, float("inf")))
+    await trends_service.get_trends("startup", raw=True)
+    messages = []
+    async def receive():
+        return {"type": "http.request"}
+    async def send(message):
+        messages.append(message)
+    scope = {"type": "http", "method": "GET", "path": "/health", "query_string": b"", "headers": [], "app": app}
+    await app(scope, receive, send)
+    assert messages[0]["status"] == 200, messages
+
+asyncio.run(serve())
+print(json.dumps({
+    "import_s": seconds,
+    "rss_mb": rss,
+    "loaded": loaded,
+    "rss_after_hit_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded_after_hit": [m for m in HEAVY if m in sys.modules],
+}))
+"""
+
+
+def probe() -> dict:
+    code = f"HEAVY = {HEAVY!r}\n" + PROBE
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [probe() for _ in range(args.runs)]
+    last = results[-1]
+    print(f"import app.main   median {statistics.median(r['import_s'] for r in results) * 1000:.0f} ms over {args.runs} runs")
+    print(f"RSS after import  {statistics.median(r['rss_mb'] for r in results):.1f} MB, loaded: {', '.join(last['loaded']) or 'none'}")
+    print(f"RSS after a hit   {statistics.median(r['rss_after_hit_mb'] for r in results):.1f} MB, loaded: {', '.join(last['loaded_after_hit']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
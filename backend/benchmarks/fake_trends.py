@@ -0,0 +1,219 @@
+"""
+Local stand-in for the Google Trends endpoints pytrends calls.
+
+Serves /explore/ (NID cookie), /api/explore (widget tokens) and the
+multiline, comparedgeo and relatedsearches widget endpoints with
+deterministic data, after a configurable delay. A share of data requests
+can be answered with 429, and the series/region/query lengths are
+configurable to vary payload sizes. Calls are counted per endpoint and
+served at GET /_stats (POST /_reset clears them).
+
+Point the app at it with TRENDS_BASE_URL=http://127.0.0.1:<port>.
+benchmarks.load_test starts one itself; to run it standalone, from backend/:
+    python -m benchmarks.fake_trends --port 8765 --latency 0.2 --rate-429 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+import uvicorn
+from fastapi import FastAPI, Response
+
+# pytrends trims these off before parsing (4 chars for explore, 5 for widgets)
+EXPLORE_PREFIX = ")]}'"
+WIDGET_PREFIX = ")]}',"
+WEEK = 7 * 86400
+SERIES_START = 1262476800  # 2010-01-03, a Sunday
+
+
+@dataclass
+class FakeTrendsConfig:
+    latency: float = 0.05  # mean seconds per call (jittered +-50%)
+    rate_429: float = 0.0  # share of widget calls answered with 429
+    points: int = 52  # interest-over-time points per keyword
+    regions: int = 50  # regions per keyword
+    queries: int = 25  # top and rising queries per keyword
+
+
+def _seed(*parts: str) -> int:
+    return zlib.crc32("|".join(parts).encode())
+
+
+def _keywords(req: str) -> list[str]:
+    """Keywords of a widget request, in comparison order"""
+    return json.loads(req)["keywords"]
+
+
+def timeline(keywords: list[str], points: int) -> dict:
+    rngs = [random.Random(_seed(kw)) for kw in keywords]
+    return {"default": {"timelineData": [
+        {
+            "time": str(SERIES_START + i * WEEK),
+            "value": [rng.randint(0, 100) for rng in rngs],
+            "isPartial": i == points - 1
+        }
+        for i in range(points)
+    ]}}
+
+
+def geo_map(keywords: list[str], regions: int) -> dict:
+    rngs = [random.Random(_seed(kw, "geo")) for kw in keywords]
+    return {"default": {"geoMapData": [
+        {
+            "geoName": f"Region {i:03d}",
+            "geoCode": f"US-{i:03d}",
+            "value": [rng.randint(0, 100) for rng in rngs]
+        }
+        for i in range(regions)
+    ]}}
+
+
+def related(keyword: str, queries: int) -> dict:
+    rng = random.Random(_seed(keyword, "related"))
+    return {"default": {"rankedList": [
+        {"rankedKeyword": [{"query": f"{keyword} top {i}", "value": 100 - i} for i in range(queries)]},
+        {"rankedKeyword": [{"query": f"{keyword} rising {i}", "value": rng.randint(50, 5000)} for i in range(queries)]}
+    ]}}
+
+
+def create_app(config: FakeTrendsConfig) -> FastAPI:
+    app = FastAPI()
+    calls: Counter = Counter()
+
+    async def delay():
+        if config.latency > 0:
+            await asyncio.sleep(config.latency * random.uniform(0.5, 1.5))
+
+    def rate_limited(name: str) -> bool:
+        if random.random() < config.rate_429:
+            calls[f"{name}_429"] += 1
+            return True
+        return False
+
+    def body(prefix: str, data: dict) -> Response:
+        return Response(prefix + json.dumps(data), media_type="application/json")
+
+    @app.get("/explore/")
+    async def cookie():
+        calls["cookie"] += 1
+        response = Response("")
+        response.set_cookie("NID", "fake")
+        return response
+
+    @app.post("/api/explore")
+    async def explore(req: str):
+        calls["explore"] += 1
+        await delay()
+        if rate_limited("explore"):
+            return Response(status_code=429)
+        keywords = [item["keyword"] for item in json.loads(req)["comparisonItem"]]
+        widgets = [
+            {"id": "TIMESERIES", "token": "t", "request": {"keywords": keywords}},
+            {"id": "GEO_MAP", "token": "t", "request": {"keywords": keywords}},
+            *[
+                {
+                    "id": f"RELATED_QUERIES_{i}",
+                    "token": "t",
+                    "request": {
+                        "keywords": [kw],
+                        "restriction": {"complexKeywordsRestriction": {"keyword": [{"value": kw}]}}
+                    }
+                }
+                for i, kw in enumerate(keywords)
+            ]
+        ]
+        return body(EXPLORE_PREFIX, {"widgets": widgets})
+
+    @app.get("/api/widgetdata/multiline")
+    async def multiline(req: str):
+        calls["multiline"] += 1
+        await delay()
+        if rate_limited("multiline"):
+            return Response(status_code=429)
+        return body(WIDGET_PREFIX, timeline(_keywords(req), config.points))
+
+    @app.get("/api/widgetdata/comparedgeo")
+    async def comparedgeo(req: str):
+        calls["comparedgeo"] += 1
+        await delay()
+        if rate_limited("comparedgeo"):
+            return Response(status_code=429)
+        return body(WIDGET_PREFIX, geo_map(_keywords(req), config.regions))
+
+    @app.get("/api/widgetdata/relatedsearches")
+    async def relatedsearches(req: str):
+        calls["relatedsearches"] += 1
+        await delay()
+        if rate_limited("relatedsearches"):
+            return Response(status_code=429)
+        return body(WIDGET_PREFIX, related(_keywords(req)[0], config.queries))
+
+    @app.get("/_stats")
+    async def stats():
+        return {"calls": dict(calls), "config": asdict(config)}
+
+    @app.post("/_reset")
+    async def reset():
+        calls.clear()
+        return {}
+
+    app.state.calls = calls
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeTrendsServer:
+    """The fake server running on a background thread, for in-process harnesses"""
+
+    def __init__(self, config: FakeTrendsConfig, port: int = 0):
+        self.port = port or free_port()
+        self.app = create_app(config)
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def calls(self) -> Counter:
+        return self.app.state.calls
+
+    def start(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=FakeTrendsConfig.latency)
+    parser.add_argument("--rate-429", type=float, default=FakeTrendsConfig.rate_429)
+    parser.add_argument("--points", type=int, default=FakeTrendsConfig.points)
+    parser.add_argument("--regions", type=int, default=FakeTrendsConfig.regions)
+    parser.add_argument("--queries", type=int, default=FakeTrendsConfig.queries)
+    args = parser.parse_args()
+
+    config = FakeTrendsConfig(args.latency, args.rate_429, args.points, args.regions, args.queries)
+    uvicorn.run(create_app(config), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Concurrent load test of app.main:app against a fake Google Trends server.
+
+Starts benchmarks.fake_trends on a local port, points the app at it
+(TRENDS_BASE_URL) and at fakeredis (or a real Redis with --redis-url), then
+drives the app in-process through its full lifespan with these workloads:
+
+    hit      /api/trends, /api/trends/region, /api/trends/overtime and
+             /api/trends/analytics on keywords warmed beforehand — no
+             upstream calls expected
+    miss     /api/trends on a new keyword every request
+    compare  /api/trends/compare on random sets of 2-3 keywords
+
+For each workload it reports RPS, p50/p95/p99 latency and status codes per
+route, and the upstream calls the fake server received by endpoint. The
+results are written to JSON; pass an earlier file as --baseline to print
+the change per route.
+
+With --workers N the app is served instead by gunicorn (gunicorn.conf.py)
+with N worker processes on a local port and driven over HTTP. The workers
+share a fakeredis TCP server (or --redis-url). Compare it with a
+--workers 1 run on the same machine to measure the multi-process profile.
+
+Run from backend/:
+    python -m benchmarks.load_test --requests 500 --concurrency 50 --latency 0.2
+    python -m benchmarks.load_test --workloads miss --rate-429 0.1 --baseline load_results.json
+    python -m benchmarks.load_test --workers 1 --output single.json
+    python -m benchmarks.load_test --workers 4 --baseline single.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator, Optional
+
+import httpx
+
+from benchmarks.fake_trends import FakeTrendsConfig, FakeTrendsServer, free_port
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+WORKLOADS = ("hit", "miss", "compare")
+
+
+@dataclass
+class Call:
+    method: str
+    route: str
+    url: str
+    json: Optional[dict] = None
+    params: Optional[dict] = None
+
+
+@dataclass
+class Sample:
+    route: str
+    status: int
+    seconds: float
+
+
+@dataclass
+class WorkloadResult:
+    samples: list[Sample] = field(default_factory=list)
+    duration: float = 0.0
+    upstream: dict[str, int] = field(default_factory=dict)
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(result: WorkloadResult) -> dict:
+    by_route: dict[str, list[Sample]] = defaultdict(list)
+    for sample in result.samples:
+        by_route[sample.route].append(sample)
+
+    routes = {}
+    for route, samples in sorted(by_route.items()):
+        latencies = sorted(s.seconds for s in samples)
+        statuses: dict[str, int] = defaultdict(int)
+        for s in samples:
+            statuses[str(s.status)] += 1
+        routes[route] = {
+            "requests": len(samples),
+            "rps": round(len(samples) / result.duration, 1) if result.duration else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "statuses": dict(statuses)
+        }
+    return {
+        "requests": len(result.samples),
+        "duration_s": round(result.duration, 3),
+        "rps": round(len(result.samples) / result.duration, 1) if result.duration else 0.0,
+        "routes": routes,
+        "upstream_calls": result.upstream
+    }
+
+
+def hit_calls(keywords: list[str], n: int, rng: random.Random) -> list[Call]:
+    routes = [
+        ("POST /api/trends", "/api/trends"),
+        ("POST /api/trends/region", "/api/trends/region"),
+        ("POST /api/trends/overtime", "/api/trends/overtime"),
+        ("POST /api/trends/analytics", "/api/trends/analytics"),
+    ]
+    calls = []
+    for _ in range(n):
+        route, url = rng.choice(routes)
+        calls.append(Call("POST", route, url, json={"keyword": rng.choice(keywords), "timeframe": "today 12-m", "geo": "US"}))
+    return calls
+
+
+def miss_calls(tag: str, n: int) -> list[Call]:
+    return [
+        Call("POST", "POST /api/trends", "/api/trends", json={"keyword": f"{tag} miss {i}", "timeframe": "today 12-m", "geo": "US"})
+        for i in range(n)
+    ]
+
+
+def compare_calls(keywords: list[str], n: int, rng: random.Random) -> list[Call]:
+    return [
+        Call("GET", "GET /api/trends/compare", "/api/trends/compare", params={"keywords": ",".join(rng.sample(keywords, rng.choice((2, 3))))})
+        for _ in range(n)
+    ]
+
+
+async def drive(client: httpx.AsyncClient, calls: list[Call], concurrency: int) -> WorkloadResult:
+    """Send calls with at most `concurrency` in flight"""
+    result = WorkloadResult()
+    queue: asyncio.Queue[Call] = asyncio.Queue()
+    for call in calls:
+        queue.put_nowait(call)
+
+    async def worker():
+        while not queue.empty():
+            call = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await client.request(call.method, call.url, json=call.json, params=call.params)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            result.samples.append(Sample(call.route, status, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    result.duration = time.perf_counter() - start
+    return result
+
+
+@contextmanager
+def fake_redis() -> Iterator[None]:
+    """Give CacheService connections to one in-process fakeredis server instead of REDIS_URL"""
+    import fakeredis
+    import redis.asyncio as aioredis
+
+    server = fakeredis.FakeServer()
+    original = aioredis.ConnectionPool.from_url
+    aioredis.ConnectionPool.from_url = classmethod(lambda cls, url, **kwargs: fakeredis.aioredis.FakeRedis(server=server).connection_pool)
+    try:
+        yield
+    finally:
+        aioredis.ConnectionPool.from_url = original
+
+
+@contextmanager
+def fake_redis_server() -> Iterator[str]:
+    """A fakeredis server on a local TCP port, for app processes to share"""
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(("127.0.0.1", free_port()), server_type="redis")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"redis://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def served(workers: int) -> Iterator[str]:
+    """Run the app under gunicorn with this many workers; yields its URL once it is up"""
+    url = f"http://127.0.0.1:{free_port()}"
+    # The app logs every request; keep it out of the report unless startup fails
+    log = tempfile.TemporaryFile(mode="w+")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app",
+         "--workers", str(workers), "--bind", url.removeprefix("http://")],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "HOT_WARM_ON_START": "false"},
+        stdout=log,
+        stderr=subprocess.STDOUT
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                log.seek(0)
+                raise RuntimeError(f"gunicorn did not start:\n{log.read()[-2000:]}")
+            time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+        log.close()
+
+
+@asynccontextmanager
+async def app_client(args) -> AsyncIterator[httpx.AsyncClient]:
+    """Client for the app: in-process through its lifespan, or over HTTP to gunicorn with --workers"""
+    if args.workers:
+        with served(args.workers) as url:
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+                yield client
+        return
+
+    # Settings are read at import, so the app is imported once the environment is set
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            yield client
+
+
+async def run(args, fake: FakeTrendsServer) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    # Fresh keywords per run, so a shared Redis never serves a previous run's entries
+    tag = uuid.uuid4().hex[:8]
+    keywords = [f"{tag} keyword {i}" for i in range(args.keywords)]
+    results = {}
+
+    async with app_client(args) as client:
+        for name in args.workloads:
+            if name == "hit":
+                # Warm every keyword first; only the measured pass counts
+                await drive(client, [Call("POST", "", "/api/trends", json={"keyword": kw, "timeframe": "today 12-m", "geo": "US"}) for kw in keywords], args.concurrency)
+                calls = hit_calls(keywords, args.requests, rng)
+            elif name == "miss":
+                calls = miss_calls(tag, args.requests)
+            else:
+                calls = compare_calls(keywords, args.requests, rng)
+
+            fake.calls.clear()
+            result = await drive(client, calls, args.concurrency)
+            result.upstream = dict(fake.calls)
+            results[name] = summarize(result)
+            print_workload(name, results[name])
+    return results
+
+
+def print_workload(name: str, summary: dict):
+    print(f"\n{name}: {summary['requests']} requests in {summary['duration_s']}s ({summary['rps']} rps)")
+    for route, r in summary["routes"].items():
+        print(f"  {route:28} {r['rps']:>8} rps  p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms  {r['statuses']}")
+    print(f"  upstream calls: {summary['upstream_calls'] or 'none'}")
+
+
+def print_comparison(baseline: dict, current: dict):
+    def workers(report: dict):
+        return report.get("config", {}).get("workers") or "in-process"
+
+    print(f"\nChange vs {baseline.get('commit') or 'baseline'} (workers: {workers(baseline)} -> {workers(current)}):")
+    for name, summary in current["workloads"].items():
+        before = baseline.get("workloads", {}).get(name)
+        if not before:
+            continue
+        for route, r in summary["routes"].items():
+            old = before["routes"].get(route)
+            if not old:
+                continue
+            rps = (r["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+            print(f"  {name:8} {route:28} rps {rps:+6.1f}%  p95 {old['p95_ms']} -> {r['p95_ms']} ms  p99 {old['p99_ms']} -> {r['p99_ms']} ms")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per workload")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--keywords", type=int, default=20, help="keywords the hit and compare workloads draw from")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=FakeTrendsConfig.latency, help="fake upstream seconds per call")
+    parser.add_argument("--rate-429", type=float, default=FakeTrendsConfig.rate_429, help="share of fake upstream calls answered with 429")
+    parser.add_argument("--points", type=int, default=FakeTrendsConfig.points, help="interest-over-time points per keyword")
+    parser.add_argument("--regions", type=int, default=FakeTrendsConfig.regions)
+    parser.add_argument("--queries", type=int, default=FakeTrendsConfig.queries)
+    parser.add_argument("--upstream-rate", type=float, default=0, help="UPSTREAM_RATE for the app (0 = unlimited)")
+    parser.add_argument("--redis-url", help="use this Redis instead of fakeredis")
+    parser.add_argument("--workers", type=int, default=0, help="serve with gunicorn and this many workers (0 = in-process)")
+    parser.add_argument("--output", default="load_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    fake = FakeTrendsServer(FakeTrendsConfig(args.latency, args.rate_429, args.points, args.regions, args.queries))
+    fake.start()
+    os.environ["TRENDS_BASE_URL"] = fake.url
+    os.environ["UPSTREAM_RATE"] = str(args.upstream_rate)
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+    logging.disable(logging.ERROR)
+
+    try:
+        if args.redis_url:
+            workloads = asyncio.run(run(args, fake))
+        elif args.workers:
+            with fake_redis_server() as url:
+                os.environ["REDIS_URL"] = url
+                workloads = asyncio.run(run(args, fake))
+        else:
+            with fake_redis():
+                workloads = asyncio.run(run(args, fake))
+    finally:
+        fake.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "workloads": workloads
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Production serving profile: gunicorn preforking uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+- WEB_CONCURRENCY worker processes (default one per CPU), so JSON
+  serialization and validation use every core.
+- The app is imported once in the master and the workers are forked from
+  it, sharing the read-only state built at import (schema version, routes,
+  models) copy-on-write. With UPSTREAM_PRELOAD the upstream stack
+  (pytrends, pandas) is imported there too, before the fork.
+- Redis connections, threads and clients are still created per worker,
+  in the app's lifespan hook, after the fork.
+- Startup warming is coordinated through a Redis lock (one worker runs
+  it). Each worker reports its stats to Redis, and /health/workers adds
+  them up.
+- Prometheus samples are aggregated through PROMETHEUS_MULTIPROC_DIR (a
+  temporary directory unless one is set).
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Must be set before prometheus_client is imported (by the preloaded app)
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+    _own_metrics_dir = True
+else:
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+    _own_metrics_dir = False
+
+from app.core.config import settings  # noqa: E402
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = settings.WEB_CONCURRENCY or multiprocessing.cpu_count()
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+# Long upstream fetches are bounded by the app's own timeouts
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    """Runs in the master once the app is loaded, before any worker is forked"""
+    if settings.UPSTREAM_PRELOAD:
+        from app.services.trends_service import trends_service
+        trends_service.load_upstream()
+        server.log.info("Upstream stack preloaded for the workers")
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if _own_metrics_dir:
+        shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
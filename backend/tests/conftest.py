@@ -1,10 +1,18 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from app.core.cache import cache_service
+from app.core.cache import cache_service, CacheEntry
 from app.services.trends_service import trends_service
 
 
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    """Keep the in-process L1 cache from leaking between tests."""
+    cache_service.local.clear()
+    yield
+    cache_service.local.clear()
+
+
 @pytest.fixture
 def client():
     """Test client for API route testing."""
@@ -17,11 +25,33 @@ def mock_cache_service(monkeypatch):
     async def mock_get(*args, **kwargs):
         return None
     
-    async def mock_set(*args, **kwargs):
-        return True
+    async def mock_mget(keys):
+        return [None] * len(keys)
+
+    async def mock_set(key, value, ttl=None, soft_ttl=None):
+        return CacheEntry(value, float("inf"))
+
+    async def mock_mset_with_ttl(values, ttl=None, soft_ttl=None):
+        return {key: CacheEntry(value, float("inf")) for key, value in values.items()}
     
     monkeypatch.setattr(cache_service, "get", mock_get)
+    monkeypatch.setattr(cache_service, "get_entry", mock_get)
+    monkeypatch.setattr(cache_service, "mget", mock_mget)
+    monkeypatch.setattr(cache_service, "mget_entries", mock_mget)
     monkeypatch.setattr(cache_service, "set", mock_set)
+    monkeypatch.setattr(cache_service, "mset_with_ttl", mock_mset_with_ttl)
+
+
+def widget_entries(data: dict, fresh_until: float = float("inf")) -> dict:
+    """Cache entries for each widget of a TrendResponse-shaped dict, by key prefix."""
+    return {
+        "iot": CacheEntry({"interest_over_time": data["interest_over_time"]}, fresh_until),
+        "region": CacheEntry({"interest_by_region": data["interest_by_region"]}, fresh_until),
+        "queries": CacheEntry(
+            {"related_queries": data["related_queries"], "rising_queries": data["rising_queries"]},
+            fresh_until
+        ),
+    }
 
 
 @pytest.fixture
@@ -47,4 +77,69 @@ def mock_trends_data():
             {"text": "spectrum mobile", "value": 1250},
             {"text": "spectrum down", "value": 500}
         ]
-    }
\ No newline at end of file
+    }
+
+
+class FakeTrendReq:
+    """Stand-in for pytrends.TrendReq that counts upstream calls."""
+
+    def __init__(self):
+        self.calls = {"build_payload": 0, "interest_over_time": 0, "interest_by_region": 0, "related_queries": 0}
+        self.kw_list = []
+        # Exceptions to raise on the next calls, by method name
+        self.errors: dict[str, list[Exception]] = {}
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.errors.get(name):
+            raise self.errors[name].pop(0)
+
+    def build_payload(self, kw_list, cat=0, timeframe='today 5-y', geo='', gprop=''):
+        self._call("build_payload")
+        self.kw_list = kw_list
+        self.timeframe = timeframe
+
+    def interest_over_time(self):
+        import pandas as pd
+        self._call("interest_over_time")
+        index = pd.to_datetime(["2024-02-04", "2024-02-11", "2024-02-18"])
+        data = {kw: [40 + i, 60 + i, 100 - i] for i, kw in enumerate(self.kw_list)}
+        data["isPartial"] = [False, False, True]
+        return pd.DataFrame(data, index=index)
+
+    def interest_by_region(self, resolution='COUNTRY', inc_low_vol=False, inc_geo_code=False):
+        import pandas as pd
+        self._call("interest_by_region")
+        index = pd.Index(["California", "Texas", "Wyoming"], name="geoName")
+        return pd.DataFrame({kw: [100, 80, 0] for kw in self.kw_list}, index=index)
+
+    def related_queries(self):
+        import pandas as pd
+        self._call("related_queries")
+        return {
+            kw: {
+                "top": pd.DataFrame({"query": [f"{kw} login", f"{kw} outage"], "value": [100, 60]}),
+                "rising": pd.DataFrame({"query": [f"{kw} deals"], "value": ["Breakout"]}),
+            }
+            for kw in self.kw_list
+        }
+
+
+def too_many_requests():
+    """The error pytrends raises for a Google 429."""
+    from unittest.mock import Mock
+    from pytrends.exceptions import TooManyRequestsError
+    return TooManyRequestsError.from_response(Mock(status_code=429, headers={}))
+
+
+@pytest.fixture
+def fake_trendreq():
+    """Counting fake pytrends client."""
+    return FakeTrendReq()
+
+
+@pytest.fixture
+def fake_pool(fake_trendreq):
+    """Client pool that leases the fake client (one fetch at a time, like a real client)."""
+    from app.services.client_pool import TrendReqPool
+    return TrendReqPool(lambda: fake_trendreq, size=1, max_rate_limits=3, lease_timeout=5)
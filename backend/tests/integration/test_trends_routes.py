@@ -67,4 +67,174 @@ def test_trends_endpoint_validates_request_body(client):
     """Test POST /api/trends validates request body."""
     response = client.post("/api/trends", json={})
     
-    assert response.status_code == 422  # Validation error
\ No newline at end of file
+    assert response.status_code == 422  # Validation error
+
+
+def test_cache_stats_endpoint_reports_both_tiers(client):
+    """Test cache stats endpoint."""
+    response = client.get("/health/cache")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "hit_ratio" in data["l1"]
+    assert "hit_ratio" in data["l2"]
+
+
+def test_trends_cache_hit_returns_stored_body(client, mock_cache_service, mock_trends_data):
+    """Test that a cache hit is assembled from the stored widget bodies without rebuilding models."""
+    from app.core.cache import cache_service, CacheEntry
+    from app.services.trends_service import trends_service
+    from tests.conftest import widget_entries
+    body = CacheEntry({"keyword": "Spectrum Internet", **mock_trends_data}).body
+    for widget, entry in widget_entries(mock_trends_data).items():
+        cache_key = trends_service._widget_key(widget, "Spectrum Internet", "today 12-m", "US")
+        cache_service.local.set(cache_key, CacheEntry(body=entry.body))
+
+    response = client.post(
+        "/api/trends",
+        json={"keyword": "Spectrum Internet", "timeframe": "today 12-m", "geo": "US"}
+    )
+
+    assert response.status_code == 200
+    assert response.content == body
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_upstream_stats_endpoint_reports_pool_and_breaker(client):
+    """Test that /health/upstream exposes client pool and breaker state."""
+    response = client.get("/health/upstream")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["breaker"]["state"] == "closed"
+    assert data["clients"]["size"] >= 1
+
+
+def test_admin_routes_require_token(client, monkeypatch):
+    """Test that admin routes are refused without the configured admin token."""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+
+    response = client.post("/api/admin/ingest", json={"keywords": ["Spectrum"]}, headers={"X-Admin-Token": "wrong"})
+
+    assert response.status_code == 403
+
+
+def test_trends_batch_streams_ndjson(client, mock_cache_service, mock_trends_data):
+    """Test POST /api/trends/batch streams one JSON line per item."""
+    import json
+    from app.api.dependencies import get_trends_service
+    from app.core import codec
+    from app.main import app
+
+    class BatchService:
+        async def stream_trends(self, requests):
+            for index in reversed(range(len(requests))):
+                body = codec.dumps({"keyword": requests[index].keyword, **mock_trends_data})
+                yield index, body, None
+
+    app.dependency_overrides[get_trends_service] = lambda: BatchService()
+    try:
+        response = client.post("/api/trends/batch", json={"items": [
+            {"keyword": "Spectrum", "geo": "US"},
+            {"keyword": "Spectrum", "geo": "CA"},
+        ]})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [(line["index"], line["geo"], line["status"]) for line in lines] == [(1, "CA", 200), (0, "US", 200)]
+        assert len(lines[0]["data"]["interest_by_region"]) == 3
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_metrics_endpoint_and_server_timing_header(client):
+    """Test that /metrics exposes Prometheus text and responses carry Server-Timing."""
+    client.get("/health")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert "cache_lookups_total" in response.text
+    assert "total;dur=" in response.headers["server-timing"]
+
+
+def test_invalid_geo_or_timeframe_returns_400(client):
+    """Test that requests which can't be canonicalized are rejected before any fetch."""
+    response = client.post("/api/trends", json={"keyword": "Spectrum", "timeframe": "today 12-m", "geo": "USA"})
+    assert response.status_code == 400
+
+    response = client.get("/api/trends/compare", params={"keywords": "a,b", "timeframe": "last year"})
+    assert response.status_code == 400
+
+
+def test_get_trends_sends_etag_and_honours_if_none_match(client, mock_cache_service, mock_trends_data):
+    """Test that the GET variant is cacheable and answers a matching If-None-Match with 304."""
+    import time
+    from app.core.cache import cache_service
+    from app.services.trends_service import trends_service
+    from tests.conftest import widget_entries
+    for widget, entry in widget_entries(mock_trends_data, fresh_until=time.time() + 120).items():
+        cache_service.local.set(trends_service._widget_key(widget, "Spectrum Internet", "today 12-m", "US"), entry)
+    params = {"keyword": "Spectrum Internet", "timeframe": "today 12-m", "geo": "US"}
+
+    response = client.get("/api/trends", params=params)
+
+    assert response.status_code == 200
+    assert response.json()["keyword"] == "Spectrum Internet"
+    etag = response.headers["etag"]
+    max_age = int(response.headers["cache-control"].split("max-age=")[1].split(",")[0])
+    assert 100 < max_age <= 120
+
+    revalidated = client.get("/api/trends", params=params, headers={"If-None-Match": f'W/"other", {etag}'})
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+
+def test_cold_start_and_cache_hits_skip_the_upstream_stack():
+    """Test that importing the app, /health and a cache hit never import pandas or pytrends."""
+    from benchmarks.bench_startup import probe
+
+    result = probe()
+
+    assert result["loaded"] == []
+    assert result["loaded_after_hit"] == []
+
+
+def test_workers_endpoint_reports_this_worker_without_redis(client, monkeypatch):
+    """Test that /health/workers falls back to this worker's own stats when Redis is down."""
+    from app.core.cache import cache_service
+
+    async def no_redis(queue_fn, name=None):
+        return None
+    monkeypatch.setattr(cache_service, "pipeline", no_redis)
+
+    response = client.get("/health/workers")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["workers"] == 1
+    assert set(data["totals"]) == {"cache", "keys", "upstream"}
+
+
+def test_suggest_endpoint_serves_indexed_terms(client, monkeypatch):
+    """Test that /api/suggest answers from the index, with caching headers, and rejects a blank query."""
+    fakeredis = pytest.importorskip("fakeredis")
+    import asyncio
+    from app.core.cache import cache_service
+    from app.services.suggest import suggest_index
+    monkeypatch.setattr(cache_service, "redis", fakeredis.aioredis.FakeRedis())
+    asyncio.run(suggest_index.add("Spectrum Internet", [WordCloudItem(text="spectrum tv", value=80)], []))
+
+    response = client.get("/api/suggest", params={"q": "spec", "limit": 1})
+
+    assert response.status_code == 200
+    assert response.json() == {"query": "spec", "suggestions": [{"text": "Spectrum Internet", "score": 100.0}]}
+    assert "max-age" in response.headers["cache-control"]
+    assert client.get("/api/suggest", params={"q": "  "}).status_code == 400
+    assert client.get("/api/suggest", params={"q": "spec", "limit": 500}).status_code == 400
@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from app.models.trends import InterestOverTimeData
+from app.services.analytics import analyze
+
+
+def weekly(values):
+    start = date(2023, 1, 1)
+    return [
+        InterestOverTimeData(date=(start + timedelta(weeks=i)).isoformat(), value=v, keyword="Spectrum")
+        for i, v in enumerate(values)
+    ]
+
+
+def test_rolling_mean_and_changes():
+    """Test rolling means and point-over-point changes."""
+    result = analyze(weekly([10, 20, 30, 40]), window=2, baseline=3, threshold=3.0)
+
+    series = result["series"]
+    assert [p["rolling_mean"] for p in series] == [10.0, 15.0, 25.0, 35.0]
+    assert [p["change"] for p in series] == [None, 10, 10, 10]
+    # Less than a year of weekly points: no year-over-year change
+    assert all(p["yoy_change"] is None for p in series)
+    assert result["summary"]["latest"] == 40
+
+
+def test_year_over_year_change_on_weekly_series():
+    """Test that weekly series are compared with the point 52 weeks earlier."""
+    result = analyze(weekly([50] * 52 + [65]), window=4, baseline=12, threshold=3.0)
+
+    assert result["series"][-1]["yoy_change"] == 15
+    assert result["summary"]["yoy_change"] == 15
+
+
+def test_spike_is_flagged_as_anomaly():
+    """Test that a spike far outside its baseline is flagged, and the baseline itself is not."""
+    values = [50, 52, 48, 51, 49, 50, 52, 48, 51, 49, 50, 52, 100]
+    result = analyze(weekly(values), window=4, baseline=12, threshold=3.0)
+
+    anomalies = [p["date"] for p in result["series"] if p["anomaly"]]
+    assert anomalies == [result["series"][-1]["date"]]
+    assert result["series"][0]["zscore"] is None  # not enough history yet
+    assert result["summary"]["anomalies"] == 1
+    assert result["summary"]["last_anomaly"] == result["series"][-1]["date"]
+
+
+def test_empty_series():
+    """Test that an empty series gives an empty result."""
+    assert analyze([], window=4, baseline=12, threshold=3.0)["series"] == []
@@ -0,0 +1,177 @@
+import asyncio
+import time
+import pytest
+from app.core.cache import CacheEntry, CacheService, LocalCache
+from app.core.config import settings
+
+
+def _entry(value, size=10, ttl=60):
+    now = time.time()
+    return CacheEntry(value, now + ttl, expires_at=now + ttl, size=size)
+
+
+def test_local_cache_evicts_least_recently_used():
+    """Test that the L1 cache evicts by entry count in LRU order."""
+    cache = LocalCache(max_entries=2, max_bytes=1000, ttl=60)
+    cache.set("a", _entry(1))
+    cache.set("b", _entry(2))
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", _entry(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a").value == 1
+    assert cache.stats.evictions == 1
+
+
+def test_local_cache_is_memory_bounded():
+    """Test that the L1 cache evicts once the byte budget is exceeded."""
+    cache = LocalCache(max_entries=100, max_bytes=25, ttl=60)
+    cache.set("a", _entry(1, size=10))
+    cache.set("b", _entry(2, size=10))
+    cache.set("c", _entry(3, size=10))
+
+    assert len(cache) == 2
+    assert cache.bytes == 20
+    assert cache.get("a") is None
+
+
+def test_local_cache_never_outlives_redis_expiry():
+    """Test that L1 entries expire with their Redis TTL."""
+    cache = LocalCache(max_entries=10, max_bytes=1000, ttl=60)
+    cache.set("a", _entry(1, ttl=-1))
+
+    assert cache.get("a") is None
+    assert cache.stats.misses == 1
+
+
+def test_codec_round_trips_compressed_bodies(monkeypatch):
+    """Test that large bodies are compressed and unpack to the same bytes."""
+    from app.core import codec
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "CACHE_COMPRESS_MIN_BYTES", 64)
+    body = codec.dumps({"interest_over_time": [{"date": "2024-02-04", "value": 75}] * 50})
+
+    payload = codec.pack(body, fresh_until=10.0, expires_at=20.0)
+
+    assert len(payload) < len(body)
+    assert codec.unpack(payload) == (body, 10.0, 20.0)
+    # Values in any older format are treated as misses
+    assert codec.unpack(b'{"value": 1}') is None
+
+
+@pytest.fixture
+def redis_cache(monkeypatch):
+    """A fresh CacheService on fakeredis."""
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = CacheService()
+    monkeypatch.setattr(cache, "redis", fakeredis.aioredis.FakeRedis())
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_mset_with_ttl_writes_every_key_in_one_round_trip(redis_cache):
+    """Test that pipelined writes can be read back with one MGET, TTLs applied."""
+    await redis_cache.mset_with_ttl({"trends:a": {"v": 1}, "trends:b": {"v": 2}}, ttl=60, soft_ttl=30)
+
+    entries = await redis_cache.mget_entries(["trends:a", "trends:b", "trends:c"])
+
+    assert [e.value if e else None for e in entries] == [{"v": 1}, {"v": 2}, None]
+    assert 0 < await redis_cache.redis.ttl("trends:a") <= 60
+    assert not entries[0].stale
+
+
+@pytest.mark.asyncio
+async def test_slow_redis_trips_breaker_and_is_bypassed(redis_cache, monkeypatch):
+    """Test that slow commands short-circuit Redis until a trial command succeeds."""
+    await redis_cache.set("trends:a", {"v": 1})
+    monkeypatch.setattr(settings, "REDIS_SLOW_COMMAND", -1)  # every command counts as slow
+    for _ in range(redis_cache.breaker.failure_threshold):
+        await redis_cache.get_entry("trends:a")
+
+    assert redis_cache.status == "degraded"
+    assert await redis_cache.get_entry("trends:a") is None  # bypassed, not a Redis miss
+    assert await redis_cache.acquire_lock("trends:a") is not None
+
+    monkeypatch.setattr(settings, "REDIS_SLOW_COMMAND", 0.1)
+    redis_cache.breaker.opened_at -= redis_cache.breaker.reset_timeout
+    assert (await redis_cache.get_entry("trends:a")).value == {"v": 1}
+    assert redis_cache.status == "connected"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_command_frees_the_half_open_slot(redis_cache, monkeypatch):
+    """Test that a trial command cancelled mid-flight lets the next command try again."""
+    await redis_cache.set("trends:a", {"v": 1})
+    for _ in range(redis_cache.breaker.failure_threshold):
+        redis_cache.breaker.record_failure()
+    redis_cache.breaker.opened_at -= redis_cache.breaker.reset_timeout
+    started = asyncio.Event()
+    real_get = redis_cache.redis.get
+
+    async def hang(key):
+        started.set()
+        await asyncio.Event().wait()
+    monkeypatch.setattr(redis_cache.redis, "get", hang)
+
+    trial = asyncio.create_task(redis_cache.get_entry("trends:a"))
+    await started.wait()
+    assert not redis_cache.breaker.available  # the trial slot is taken
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    monkeypatch.setattr(redis_cache.redis, "get", real_get)
+    assert redis_cache.breaker.available
+    assert (await redis_cache.get_entry("trends:a")).value == {"v": 1}
+    assert redis_cache.status == "connected"
+
+
+@pytest.mark.asyncio
+async def test_wait_for_cancelled_between_polls_keeps_no_trial_slot(redis_cache, monkeypatch):
+    """Test that a fill wait cancelled while sleeping doesn't hold the breaker half-open."""
+    monkeypatch.setattr(settings, "FETCH_LOCK_POLL", 60)
+    for _ in range(redis_cache.breaker.failure_threshold):
+        redis_cache.breaker.record_failure()
+    redis_cache.breaker.opened_at -= redis_cache.breaker.reset_timeout
+
+    waiting = asyncio.create_task(redis_cache.wait_for("trends:a", timeout=120))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    assert redis_cache.breaker.available
+    assert await redis_cache.get_entry("trends:a") is None
+    assert redis_cache.status == "connected"
+
+
+@pytest.mark.asyncio
+async def test_forked_workers_see_each_others_invalidations(monkeypatch):
+    """Test that instances sharing an id (forked from one preloaded app) get their own on connect."""
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1")
+    writer, reader = CacheService(), CacheService()
+    reader.instance_id = writer.instance_id
+
+    await writer.connect()
+    await reader.connect()
+    reader.local.set("trends:a", _entry({"v": 1}))
+    reader._invalidated(f"{writer.instance_id}:trends:a".encode())
+
+    assert writer.instance_id != reader.instance_id
+    assert reader.local.get("trends:a") is None
+    await writer.disconnect()
+    await reader.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_connect_retries_in_background_when_redis_is_down(monkeypatch):
+    """Test that an unreachable Redis leaves caching off and schedules a reconnect."""
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1")
+    cache = CacheService()
+
+    await cache.connect()
+
+    assert cache.status == "disconnected"
+    assert cache._reconnector is not None and not cache._reconnector.done()
+    await cache.disconnect()
+    assert cache._reconnector is None
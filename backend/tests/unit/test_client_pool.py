@@ -0,0 +1,69 @@
+from unittest.mock import Mock
+from app.services.client_pool import PooledTrendReq, TrendReqPool
+from app.services.fetch_plan import FetchPlan
+from tests.conftest import too_many_requests
+
+
+def make_pool(size=2, max_rate_limits=2):
+    return TrendReqPool(lambda: Mock(spec=["build_payload"]), size=size, max_rate_limits=max_rate_limits, lease_timeout=1)
+
+
+def plan():
+    return FetchPlan(None, ["Spectrum"], "today 12-m", "US")
+
+
+def test_leases_are_exclusive_and_clients_reused():
+    """Test that concurrent leases get different clients and returned clients are reused."""
+    pool = make_pool()
+
+    with pool.lease(plan()) as first, pool.lease(plan()) as second:
+        assert first is not second
+    with pool.lease(plan()) as third:
+        assert third in (first, second)
+
+    assert pool.stats()["created"] == 2
+
+
+def test_client_evicted_after_repeated_rate_limits():
+    """Test that a client that keeps getting 429s is replaced by a fresh one."""
+    pool = make_pool(size=1)
+
+    for _ in range(2):
+        failed = plan()
+        with pool.lease(failed) as client:
+            failed._results["interest_over_time"] = (None, too_many_requests())
+
+    with pool.lease(plan()) as replacement:
+        assert replacement is not client
+    assert pool.stats()["evicted"] == 1
+
+
+def test_pooled_client_reuses_session_and_cookie():
+    """Test that one session and one cookie fetch serve every request of a client."""
+    client = PooledTrendReq(hl="en-US", tz=360)
+    cookie_response = Mock(cookies={"NID": "abc", "other": "x"})
+    data_response = Mock(status_code=200, headers={"Content-Type": "application/json"}, text=")]}'\n{\"widgets\": []}")
+    client.session.get = Mock(side_effect=[cookie_response, data_response, data_response])
+    client.session.post = Mock(return_value=data_response)
+
+    client.build_payload(["Spectrum"], timeframe="today 12-m", geo="US")
+    client.build_payload(["Verizon"], timeframe="today 12-m", geo="US")
+
+    assert client.session.get.call_count == 1  # the cookie, once
+    assert client.session.post.call_count == 2
+    assert client.session.post.call_args.kwargs["cookies"] == {"NID": "abc"}
+
+
+def test_pooled_client_uses_configured_base_url(monkeypatch):
+    """Test that TRENDS_BASE_URL redirects every request, cookie included."""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "TRENDS_BASE_URL", "http://127.0.0.1:8765/")
+    client = PooledTrendReq(hl="en-US", tz=360)
+    data_response = Mock(status_code=200, headers={"Content-Type": "application/json"}, text=")]}'\n{\"widgets\": []}")
+    client.session.get = Mock(return_value=Mock(cookies={}))
+    client.session.post = Mock(return_value=data_response)
+
+    client.build_payload(["Spectrum"], timeframe="today 12-m", geo="US")
+
+    assert client.session.get.call_args.args[0] == "http://127.0.0.1:8765/explore/?geo=US"
+    assert client.session.post.call_args.args[0] == "http://127.0.0.1:8765/api/explore"
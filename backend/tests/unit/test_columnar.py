@@ -0,0 +1,70 @@
+import pytest
+from datetime import date, timedelta
+from app.core import codec, columnar
+from app.core.cache import CacheService
+from app.models.trends import InterestOverTimeData
+
+
+def _series(days: list[date], keyword: str = "Spectrum Internet") -> dict:
+    return {"interest_over_time": [
+        {"date": d.isoformat(), "value": i % 101, "keyword": keyword} for i, d in enumerate(days)
+    ]}
+
+
+WEEKLY = [date(2020, 1, 5) + timedelta(weeks=i) for i in range(260)]
+MONTHLY = [date(2004 + i // 12, i % 12 + 1, 1) for i in range(240)]
+HOURLY = [date(2024, 2, 4)] * 20 + [date(2024, 2, 5)] * 4
+
+
+@pytest.mark.parametrize("value", [
+    _series(WEEKLY),
+    _series(MONTHLY),
+    _series(HOURLY),
+    {"interest_over_time": []},
+    {"interest_by_region": [{"region": "Néw York", "value": 100}, {"region": "Ohio", "value": 3}]},
+    {"related_queries": [{"text": "spectrum \"tv\"", "value": 100}], "rising_queries": [{"text": "wifi", "value": 4950}]},
+])
+def test_columnar_round_trips_to_the_same_json(value):
+    """Test that an encoded widget value expands to exactly the JSON it would have been stored as."""
+    encoded = columnar.encode(value)
+
+    assert columnar.is_columnar(encoded)
+    assert columnar.decode(encoded) == value
+    assert columnar.to_json(encoded) == codec.dumps(value)
+
+
+def test_columnar_series_is_a_fraction_of_its_json():
+    """Test that a 5-year weekly series stores the keyword once and a byte per point."""
+    value = _series(WEEKLY)
+
+    assert len(columnar.encode(value)) < 300 < len(codec.dumps(value)) // 50
+
+
+@pytest.mark.parametrize("value", [
+    {"interest_over_time": [{"date": "2024-02-04", "value": 300, "keyword": "a"}]},
+    {"interest_over_time": [{"date": "2024-02-04T10", "value": 1, "keyword": "a"}]},
+    {"interest_over_time": [{"date": "2024-02-04", "value": 1, "keyword": "a"}, {"date": "2024-02-11", "value": 1, "keyword": "b"}]},
+    {"interest_by_region": [{"region": "Ohio", "value": -1}]},
+    {"keyword": "spectrum", "window": 4, "series": []},
+])
+def test_values_that_do_not_fit_stay_json(value):
+    """Test that anything outside the columnar layouts is left to JSON."""
+    assert columnar.encode(value) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_stores_widgets_compact_and_serves_json(monkeypatch):
+    """Test that Redis and L1 hold the columnar form while body and value keep their JSON shape."""
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = CacheService()
+    monkeypatch.setattr(cache, "redis", fakeredis.aioredis.FakeRedis())
+    points = [InterestOverTimeData.model_construct(date=d.isoformat(), value=50, keyword="isp") for d in WEEKLY]
+    value = {"interest_over_time": points}
+
+    written = (await cache.mset_with_ttl({"iot:k": value}))["iot:k"]
+    read = await cache.get_entry("iot:k")
+
+    assert columnar.is_columnar(written.stored) and columnar.is_columnar(read.stored)
+    assert read.size < 300
+    assert read.body == written.body == codec.dumps(value)
+    assert read.value["interest_over_time"][0] == {"date": "2020-01-05", "value": 50, "keyword": "isp"}
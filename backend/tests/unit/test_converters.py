@@ -0,0 +1,44 @@
+import pandas as pd
+from app.services.converters import (
+    interest_over_time_records,
+    region_records,
+    query_records
+)
+
+
+def test_interest_over_time_formats_dates_and_values():
+    """Test that series rows become YYYY-MM-DD points for the keyword."""
+    df = pd.DataFrame(
+        {"Spectrum": [40, 60], "isPartial": [False, True]},
+        index=pd.to_datetime(["2024-02-04 00:00:00", "2024-02-11 00:00:00"])
+    )
+
+    points = interest_over_time_records(df, "Spectrum")
+
+    assert [(p.date, p.value, p.keyword) for p in points] == [
+        ("2024-02-04", 40, "Spectrum"),
+        ("2024-02-11", 60, "Spectrum"),
+    ]
+    assert interest_over_time_records(df, "Verizon") == []
+
+
+def test_region_records_keep_top_non_zero_regions_in_order():
+    """Test that regions are sorted by value, ties keep alphabetical order, zeros dropped."""
+    df = pd.DataFrame(
+        {"Spectrum": [50, 0, 100, 50, 10]},
+        index=pd.Index(["Alabama", "Alaska", "Maine", "Ohio", "Utah"], name="geoName")
+    )
+
+    regions = region_records(df, "Spectrum", limit=3)
+
+    assert [(r.region, r.value) for r in regions] == [("Maine", 100), ("Alabama", 50), ("Ohio", 50)]
+
+
+def test_query_records_map_breakout_to_100():
+    """Test that rising 'Breakout' values become 100."""
+    df = pd.DataFrame({"query": ["spectrum deals", "spectrum mobile"], "value": ["Breakout", 450]})
+
+    items = query_records(df, limit=20)
+
+    assert [(i.text, i.value) for i in items] == [("spectrum deals", 100), ("spectrum mobile", 450)]
+    assert query_records(None) == []
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import pytest
+from app.core.executor import UpstreamExecutor
+from app.core.exceptions import UpstreamBusyError
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_free_during_blocking_fetch():
+    """Test that a blocking fetch does not stall other coroutines."""
+    executor = UpstreamExecutor(max_workers=1, max_queue=0, queue_timeout=5)
+    release = threading.Event()
+
+    fetch = asyncio.create_task(executor.run(release.wait, 5))
+    await asyncio.sleep(0.01)
+
+    # Loop is still serving other work while the fetch blocks its thread
+    assert not fetch.done()
+    release.set()
+    assert await fetch is True
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_fetch_when_queue_is_full():
+    """Test that fetches beyond workers + queue depth are rejected."""
+    executor = UpstreamExecutor(max_workers=1, max_queue=1, queue_timeout=5)
+    release = threading.Event()
+
+    running = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(UpstreamBusyError):
+        await executor.run(release.wait, 5)
+
+    release.set()
+    await asyncio.gather(*running)
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_async_fetches_share_the_worker_limit():
+    """Test that async fetches wait for a slot and time out in the queue."""
+    executor = UpstreamExecutor(max_workers=1, max_queue=1, queue_timeout=0.05)
+    release = asyncio.Event()
+
+    running = asyncio.create_task(executor.run_async(release.wait))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(UpstreamBusyError):
+        await executor.run_async(release.wait)
+
+    release.set()
+    assert await running is True
+    assert executor.pending == 0
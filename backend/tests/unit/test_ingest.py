@@ -0,0 +1,76 @@
+import pytest
+from app.core.cache import cache_service
+from app.core.config import settings
+from app.services.ingest import IngestQueue, QUEUE_KEY
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class WarmingService:
+    """Records warm() calls; keywords in `broken` fail."""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.warmed = []
+
+    async def warm(self, kind, keyword, timeframe, geo, horizon=0):
+        if keyword in self.broken:
+            raise ValueError(f"bad keyword {keyword}")
+        self.warmed.append(keyword)
+        return True
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(cache_service, "redis", client)
+    monkeypatch.setattr(settings, "UPSTREAM_RATE", 0)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_batches_and_resumes_failures(redis):
+    """Test that a job is processed in 5-keyword batches and resume retries only what failed."""
+    queue = IngestQueue()
+    keywords = [f"isp {i}" for i in range(7)]
+    job_id = await queue.submit(keywords, "today 12-m", "US")
+
+    await queue.work(WarmingService(broken={"isp 6"}), once=True)
+
+    status = await queue.status(job_id)
+    assert (status.batches, status.batches_done, status.status) == (2, 2, "done")
+    assert status.fetched == 6
+    assert list(status.failed) == ["isp 6"]
+
+    # Only the batch holding the failed keyword goes back on the queue
+    assert await queue.resume(job_id) == 1
+    service = WarmingService()
+    await queue.work(service, once=True)
+
+    assert service.warmed == ["isp 5", "isp 6"]
+    status = await queue.status(job_id)
+    assert status.failed == {}
+    assert status.status == "done"
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_bad_timeframe_or_geo_before_queueing(redis):
+    """Test that a job is only queued with a usable, canonical timeframe and geo."""
+    queue = IngestQueue()
+    for timeframe, geo in (("yesterday", "US"), ("today 12-m", "USA!")):
+        with pytest.raises(ValueError):
+            await queue.submit(["isp"], timeframe, geo)
+    assert await redis.llen(QUEUE_KEY) == 0
+
+    job_id = await queue.submit(["isp"], " TODAY 12-M ", "us")
+
+    assert (await queue.status(job_id)).timeframe == "today 12-m"
+
+
+@pytest.mark.asyncio
+async def test_batches_of_stopped_workers_are_requeued(redis):
+    """Test that a batch held by a worker without a heartbeat is recovered."""
+    await redis.lpush("ingest:processing:deadworker", '{"job": "j", "batch": 0}')
+
+    assert await IngestQueue().recover() == 1
+    assert await redis.llen(QUEUE_KEY) == 1
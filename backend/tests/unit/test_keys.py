@@ -0,0 +1,84 @@
+import pytest
+from datetime import date
+
+from app.core.exceptions import InvalidRequestError
+from app.core.keys import (
+    KEY_VERSION,
+    KeyStats,
+    cache_key,
+    canonical_geo,
+    canonical_keyword,
+    canonical_timeframe,
+    compare_key,
+    request_key
+)
+
+TODAY = date(2025, 3, 15)
+
+
+def test_keyword_variants_share_one_key():
+    """Test that case, whitespace, hyphens and full-width forms collapse to one key."""
+    variants = ["Spectrum Internet", "  spectrum   internet ", "SPECTRUM-internet", "spectrum_internet", "Ｓｐｅｃｔｒｕｍ Internet"]
+
+    assert {canonical_keyword(v) for v in variants} == {"spectrum_internet"}
+    with pytest.raises(InvalidRequestError):
+        canonical_keyword(" - ")
+
+
+def test_excluded_terms_keep_their_own_key():
+    """Test that a leading "-" (Google's exclusion operator) is not treated as a separator."""
+    assert canonical_keyword("tv -cable") == "tv_-cable"
+    assert canonical_keyword("-Cable  TV") == "-cable_tv"
+    assert cache_key("iot", "tv -cable", "today 12-m", "US") != cache_key("iot", "tv cable", "today 12-m", "US")
+
+
+def test_geo_codes_are_normalized_and_validated():
+    """Test that geo codes are upper-cased and anything else is rejected."""
+    assert canonical_geo(" us ") == "US"
+    assert canonical_geo("us-ny") == "US-NY"
+    assert canonical_geo("") == ""
+    for bad in ("USA", "U", "US NY", "us;drop"):
+        with pytest.raises(InvalidRequestError):
+            canonical_geo(bad)
+
+
+def test_equivalent_timeframes_resolve_to_one_window():
+    """Test that relative and explicit spellings of the same window share a timeframe."""
+    assert canonical_timeframe("today 1-y", TODAY) == "today 12-m"
+    assert canonical_timeframe("TODAY  12-M", TODAY) == "today 12-m"
+    assert canonical_timeframe("2024-03-15 2025-03-15", TODAY) == "today 12-m"
+    assert canonical_timeframe("2024-12-14 2025-03-14", TODAY) == "today 3-m"
+    assert canonical_timeframe("today 60-m", TODAY) == "today 5-y"
+    assert canonical_timeframe("2004-01-01 2025-03-15", TODAY) == "all"
+    assert canonical_timeframe("now 7-D", TODAY) == "now 7-d"
+    assert canonical_timeframe("now 4-h", TODAY) == "now 4-H"
+    # Ranges that don't end now are kept as dates
+    assert canonical_timeframe("2023-01-01 2023-12-31", TODAY) == "2023-01-01 2023-12-31"
+    # Only windows Google offers: a 6-month range is fetched as the range it is
+    assert canonical_timeframe("2024-09-15 2025-03-15", TODAY) == "2024-09-15 2025-03-15"
+
+
+def test_invalid_timeframes_are_rejected():
+    """Test that unknown or inverted timeframes raise."""
+    for bad in ("last year", "2025-02-30 2025-03-01", "2025-03-01 2025-01-01", "today 0-m"):
+        with pytest.raises(InvalidRequestError):
+            canonical_timeframe(bad, TODAY)
+
+
+def test_keys_are_versioned_and_compare_keys_ignore_order():
+    """Test the key layout and that keyword sets match in any order and spelling."""
+    assert cache_key("iot", "Spectrum", "today 12-m", "us") == f"iot:{KEY_VERSION}:spectrum:today 12-m:US"
+    assert compare_key(["B", "a"], "today 12-m", "US") == compare_key(["A ", "b"], "today 1-y", "us")
+
+
+def test_key_stats_count_recovered_hits():
+    """Test that hits on requests whose raw key differed count as recovered."""
+    stats = KeyStats()
+    stats.record(request_key("spectrum", "today 12-m", "US"), hit=False)
+    stats.record(request_key("Spectrum ", "today 1-y", "us"), hit=True)
+
+    data = stats.as_dict()
+    assert data["hits"] == 1
+    assert data["recovered_hits"] == 1
+    assert data["hit_ratio"] == 0.5
+    assert data["hit_ratio_without_normalization"] == 0.0
@@ -0,0 +1,49 @@
+import pytest
+from prometheus_client import REGISTRY
+from app.core.cache import LocalCache, CacheEntry
+from app.core.metrics import (
+    UPSTREAM_LATENCY,
+    add_timing,
+    namespace,
+    server_timing,
+    start_request_timings,
+    timed
+)
+from app.services.fetch_plan import FetchPlan
+
+
+def lookups(ns: str, tier: str, result: str) -> float:
+    return REGISTRY.get_sample_value("cache_lookups_total", {"namespace": ns, "tier": tier, "result": result}) or 0.0
+
+
+def test_local_cache_counts_lookups_per_namespace():
+    """Test that L1 hits and misses are counted under the key's namespace."""
+    cache = LocalCache(max_entries=10, max_bytes=10_000, ttl=60)
+    hits, misses = lookups("region", "l1", "hit"), lookups("region", "l1", "miss")
+
+    cache.get("region:spectrum:today 12-m:US")
+    cache.set("region:spectrum:today 12-m:US", CacheEntry({"interest_by_region": []}))
+    cache.get("region:spectrum:today 12-m:US")
+
+    assert lookups("region", "l1", "miss") == misses + 1
+    assert lookups("region", "l1", "hit") == hits + 1
+    assert namespace("iot:spectrum:today 12-m:US") == "iot"
+
+
+@pytest.mark.asyncio
+async def test_stage_timings_are_collected_for_the_current_request():
+    """Test that timed blocks and plan stages add up into the Server-Timing header."""
+    timings = start_request_timings()
+    with timed(UPSTREAM_LATENCY, "test", stage="redis"):
+        pass
+    add_timing("redis", 0.002)
+    plan = FetchPlan(None, ["Spectrum"], "today 12-m", "US")
+    plan.timings = {"interest_by_region": 0.5, "convert": 0.01}
+    plan.observe()
+
+    assert timings["redis"] >= 0.002
+    assert timings["upstream"] == pytest.approx(0.5)
+    assert timings["convert"] == pytest.approx(0.01)
+    header = server_timing(timings, 0.6)
+    assert "upstream;dur=500.0" in header
+    assert header.endswith("total;dur=600.0")
@@ -0,0 +1,42 @@
+import pytest
+from app.core.resilience import CircuitBreaker, RateLimiter, backoff_delay
+from app.core.exceptions import UpstreamBusyError, UpstreamUnavailableError
+
+
+def test_breaker_opens_after_threshold_and_recovers_through_trial():
+    """Test that the breaker fails fast when open and a good trial call closes it."""
+    breaker = CircuitBreaker("upstream", failure_threshold=2, reset_timeout=60)
+
+    breaker.check()
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    with pytest.raises(UpstreamUnavailableError) as exc:
+        breaker.check()
+    assert exc.value.retry_after > 0
+
+    breaker.opened_at -= 60
+    breaker.check()  # the single trial call
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.check()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_rejects_when_slot_is_beyond_max_wait():
+    """Test that the local bucket allows a burst, then rejects without waiting."""
+    limiter = RateLimiter("ratelimit:test", rate=0.1, burst=2)
+
+    await limiter.acquire(max_wait=0)
+    await limiter.acquire(max_wait=0)
+    with pytest.raises(UpstreamBusyError):
+        await limiter.acquire(max_wait=1)
+
+
+def test_backoff_is_capped_and_honours_retry_after():
+    """Test that jittered backoff stays under the cap but never below Retry-After."""
+    assert all(0 <= backoff_delay(10, base=1, cap=5) <= 5 for _ in range(50))
+    assert backoff_delay(0, base=1, cap=5, floor=30) == 30
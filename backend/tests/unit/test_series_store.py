@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+from app.core.config import settings
+from app.services.series_store import STEP_OFFSETS, SeriesStore, series_window, stitch, tail_start
+from tests.conftest import FakeTrendReq
+
+TODAY = pd.Timestamp.today().normalize()
+
+
+def popularity(dates: pd.DatetimeIndex) -> pd.Series:
+    """The 'true' search interest the fake Google samples from."""
+    return pd.Series(10 + (dates.dayofyear % 60), index=dates, dtype=float)
+
+
+class TimelineTrendReq(FakeTrendReq):
+    """Fake that answers each timeframe like Google: its own step, scaled to 0-100."""
+
+    def interest_over_time(self):
+        self._call("interest_over_time")
+        if self.timeframe.startswith("today"):
+            start, _ = series_window(self.timeframe, TODAY)
+            days = popularity(pd.date_range(start, TODAY))
+            # Weekly buckets starting on Sunday, as Google returns them
+            values = days.resample("W-SAT", label="left", closed="left").mean()
+            values.index = values.index + pd.Timedelta(days=1)
+            values = values[values.index <= TODAY]
+        else:
+            start, end = self.timeframe.split()
+            values = popularity(pd.date_range(start, end))
+        scaled = (values / values.max() * 100).round().astype(int)
+        return pd.DataFrame({kw: scaled for kw in self.kw_list})
+
+
+def test_series_store_round_trip(tmp_path):
+    """Test that saved history loads back per keyword, geo and step."""
+    store = SeriesStore(str(tmp_path / "series.db"))
+    series = pd.Series([1.5, 2.0], index=pd.to_datetime(["2024-01-07", "2024-01-14"]))
+
+    store.save("Spectrum", "US", "W", series)
+
+    assert store.load("spectrum", "US", "W").tolist() == [1.5, 2.0]
+    assert store.load("spectrum", "US", "D") is None
+    store.close()
+
+
+def test_stitch_rescales_tail_onto_history():
+    """Test that a tail on another scale (and step) is rescaled over the overlap."""
+    history = pd.Series([10.0, 20.0, 30.0], index=pd.to_datetime(["2024-01-07", "2024-01-14", "2024-01-21"]))
+    # Daily tail at half the stored scale, covering the last two weeks and a new one
+    tail = pd.Series([10.0] * 7 + [15.0] * 7 + [20.0] * 7, index=pd.date_range("2024-01-14", periods=21))
+
+    stitched = stitch(history, tail, "W")
+
+    assert stitched.index.strftime("%Y-%m-%d").tolist() == ["2024-01-07", "2024-01-14", "2024-01-21", "2024-01-28"]
+    assert stitched.tolist() == [10.0, 20.0, 30.0, 40.0]
+
+
+@pytest.mark.parametrize("timeframe", ["today 3-m", "today 12-m", "today 5-y", "all"])
+def test_up_to_date_history_only_needs_a_tail(timeframe):
+    """Test that every stored window refreshes incrementally once its history is current."""
+    start, step = series_window(timeframe, TODAY)
+    index = pd.date_range(start, TODAY, freq=STEP_OFFSETS[step])
+    history = pd.Series(50.0, index=index)
+
+    begin = tail_start(history, start, step, today=TODAY)
+
+    assert begin == index[-1] - STEP_OFFSETS[step] * settings.SERIES_OVERLAP_STEPS
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("timeframe", ["today 12-m", "today 5-y"])
+async def test_refresh_fetches_only_new_tail(monkeypatch, tmp_path, mock_cache_service, timeframe):
+    """Test that a second fetch of a weekly window requests only the tail and matches a full fetch."""
+    from app.services import trends_service as module
+    from app.services.client_pool import TrendReqPool
+    fake = TimelineTrendReq()
+    monkeypatch.setattr("app.services.series_store.series_store", SeriesStore(str(tmp_path / "series.db")))
+    service = module.TrendsService()
+    service.clients = TrendReqPool(lambda: fake, size=1, max_rate_limits=3, lease_timeout=5)
+
+    full = await service.get_interest_over_time("Spectrum", timeframe, "US")
+    module.cache_service.local.clear()
+    refreshed = await service.get_interest_over_time("Spectrum", timeframe, "US")
+
+    start, step = series_window(timeframe)
+    assert step == "W"
+    # The refresh asked for a short date range, not the whole window
+    tail_from, tail_to = fake.timeframe.split()
+    assert (pd.Timestamp(tail_to) - pd.Timestamp(tail_from)).days < 60
+    assert fake.calls["build_payload"] == 2
+    # ...and the stitched series agrees with the full fetch
+    assert [p.date for p in refreshed] == [p.date for p in full]
+    assert max(abs(a.value - b.value) for a, b in zip(refreshed, full)) <= 2
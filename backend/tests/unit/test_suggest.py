@@ -0,0 +1,62 @@
+import pytest
+from app.core.cache import cache_service
+from app.core.config import settings
+from app.models.trends import WordCloudItem
+from app.services.suggest import POPULARITY_KEY, SuggestIndex
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _queries(*pairs):
+    return [WordCloudItem(text=text, value=value) for text, value in pairs]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(cache_service, "redis", client)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_suggest_matches_word_starts_and_ranks_by_popularity(redis):
+    """Test that terms are found from any word, across keywords, most popular first."""
+    index = SuggestIndex()
+    await index.add("Spectrum Internet", _queries(("spectrum internet price", 90), ("internet speed test", 40)), _queries(("Internet outage", 5000)))
+    await index.add("Xfinity", _queries(("xfinity internet", 60)), [])
+
+    suggestions = await index.suggest("INTER", limit=10)
+
+    # Equal scores are ordered by term
+    assert [s.text for s in suggestions] == [
+        "Internet outage", "Spectrum Internet", "spectrum internet price", "xfinity internet", "internet speed test"
+    ]
+    assert suggestions[0].score == 100  # rising growth counts at most as much as the keyword
+    assert [s.text for s in await index.suggest("xfin", limit=1)] == ["Xfinity"]
+    assert await index.suggest("cable", limit=10) == []
+
+
+@pytest.mark.asyncio
+async def test_index_drops_least_popular_terms_past_its_limit(redis, monkeypatch):
+    """Test that the index stays bounded and dropped terms stop matching."""
+    monkeypatch.setattr(settings, "SUGGEST_MAX_TERMS", 2)
+    index = SuggestIndex()
+
+    await index.add("spectrum", _queries(("spectrum tv", 90), ("spectrum login", 10)), [])
+
+    assert await redis.zcard(POPULARITY_KEY) == 2
+    assert [s.text for s in await index.suggest("spectrum", limit=10)] == ["spectrum", "spectrum tv"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("prefix", ["sp", "spectrum"])
+async def test_suggest_ranks_every_match_not_just_the_first_scanned(redis, monkeypatch, prefix):
+    """Test that a popular term sorting after SUGGEST_SCAN other matches still comes first."""
+    monkeypatch.setattr(settings, "SUGGEST_SCAN", 3)
+    index = SuggestIndex()
+    await index.add("spectrum", _queries(*[(f"spectrum a{i}", 1) for i in range(10)]), [])
+    await index.add("spectrum zz", _queries(("spectrum zzz", 90)), [])
+
+    suggestions = await index.suggest(prefix, limit=3)
+
+    assert [s.text for s in suggestions] == ["spectrum", "spectrum zz", "spectrum zzz"]
@@ -0,0 +1,150 @@
+import httpx
+import pytest
+from pytrends.exceptions import TooManyRequestsError
+
+from app.services.fetch_plan import AsyncFetchPlan
+from app.services.trends_client import AsyncTrendsClient, region_records, related_records, timeline_records
+from app.services.trends_service import TrendsService
+from benchmarks.fake_trends import FakeTrendsConfig, create_app
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    """The benchmark fake Google Trends app, served to the client in-process."""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "TRENDS_BASE_URL", "http://trends.test")
+    return create_app(FakeTrendsConfig(latency=0, points=10, regions=30, queries=25))
+
+
+def test_timeline_records_parse_multiline_json():
+    """Test that multiline JSON becomes one UTC-dated point per keyword."""
+    data = {"default": {"timelineData": [
+        {"time": "1707004800", "value": [40, 7]},
+        {"time": "1707609600", "value": [100, 0], "isPartial": True},
+    ]}}
+
+    records = timeline_records(data, ["a", "b"])
+
+    assert [(p.date, p.value) for p in records["a"]] == [("2024-02-04", 40), ("2024-02-11", 100)]
+    assert [p.value for p in records["b"]] == [7, 0]
+    assert records["b"][0].keyword == "b"
+
+
+def test_region_records_rank_like_the_dataframe_path():
+    """Test that regions are ranked by value, ties alphabetically, without zeros."""
+    data = {"default": {"geoMapData": [
+        {"geoName": "Texas", "value": [80]},
+        {"geoName": "Wyoming", "value": [0]},
+        {"geoName": "Ohio", "value": [100]},
+        {"geoName": "Alaska", "value": [80]},
+    ]}}
+
+    regions = region_records(data, ["a"], limit=2)["a"]
+
+    assert [(r.region, r.value) for r in regions] == [("Ohio", 100), ("Alaska", 80)]
+
+
+def test_related_records_count_breakouts():
+    """Test that rising "Breakout" queries get the breakout value."""
+    data = {"default": {"rankedList": [
+        {"rankedKeyword": [{"query": "a login", "value": 100}]},
+        {"rankedKeyword": [{"query": "a deals", "value": "Breakout"}, {"query": "a down", "value": 250}]},
+    ]}}
+
+    top, rising = related_records(data)
+
+    assert [(q.text, q.value) for q in top] == [("a login", 100)]
+    assert [(q.text, q.value) for q in rising] == [("a deals", 100), ("a down", 250)]
+
+
+@pytest.mark.asyncio
+async def test_async_plan_explores_once_for_concurrent_widgets(fake_upstream):
+    """Test that widgets fetched concurrently share one explore call."""
+    import asyncio
+    client = AsyncTrendsClient(transport=httpx.ASGITransport(app=fake_upstream))
+    plan = AsyncFetchPlan(client, ["spectrum"], "today 12-m", "US")
+
+    series, regions, related = await asyncio.gather(
+        plan.interest_over_time(), plan.interest_by_region(), plan.related_queries()
+    )
+
+    assert fake_upstream.state.calls["explore"] == 1
+    assert fake_upstream.state.calls["cookie"] == 1
+    assert len(series["spectrum"]) == 10
+    assert len(regions["spectrum"]) <= 20
+    assert len(related["spectrum"][0]) == 20
+    assert set(plan.timings) == {"build_payload", "interest_over_time", "interest_by_region", "related_queries"}
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_related_queries_of_a_batch_are_fetched_concurrently(monkeypatch):
+    """Test that each keyword's related queries widget is requested without waiting for the others."""
+    import asyncio
+    from app.services.trends_client import Widgets
+    client = AsyncTrendsClient()
+    in_flight, most = 0, 0
+
+    async def get_data(method, path, trim_chars, params):
+        nonlocal in_flight, most
+        in_flight += 1
+        most = max(most, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return {"default": {"rankedList": [{"rankedKeyword": [{"query": params["token"], "value": 100}]}]}}
+
+    monkeypatch.setattr(client, "_get_data", get_data)
+    keywords = ["spectrum", "xfinity", "verizon"]
+    widgets = Widgets(keywords, "US", [
+        {"id": f"RELATED_QUERIES_{i}", "token": kw, "request": {"restriction": {"complexKeywordsRestriction": {"keyword": [{"value": kw}]}}}}
+        for i, kw in enumerate(keywords)
+    ])
+
+    related = await client.related_queries(widgets)
+
+    assert most == 3
+    assert {kw: top[0].text for kw, (top, _) in related.items()} == {kw: kw for kw in keywords}
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_raise_and_replace_the_cookie(monkeypatch):
+    """Test that 429s raise pytrends' error and renew the cookie after too many."""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "TRENDS_BASE_URL", "http://trends.test")
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        if request.url.path == "/explore/":
+            return httpx.Response(200, headers={"Set-Cookie": "NID=fake"})
+        return httpx.Response(429, headers={"Retry-After": "2"})
+
+    client = AsyncTrendsClient(max_rate_limits=2, transport=httpx.MockTransport(handler))
+    for _ in range(3):
+        with pytest.raises(TooManyRequestsError) as error:
+            await client.explore(["spectrum"], "today 12-m", "US")
+
+    assert error.value.response.headers["Retry-After"] == "2"
+    assert client.cookie_resets == 1
+    assert seen.count("/explore/") == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_httpx_backend_serves_trends_and_comparisons(mock_cache_service, fake_upstream):
+    """Test that the service fetches through the async client, off the worker threads."""
+    client = AsyncTrendsClient(transport=httpx.ASGITransport(app=fake_upstream))
+    service = TrendsService(async_client=client)
+
+    trends = await service.get_trends("Spectrum Internet", "today 12-m", "US")
+    comparison = await service.compare_trends(["Spectrum", "Xfinity"], "today 12-m", "US")
+
+    assert len(trends.interest_over_time) == 10
+    assert trends.interest_by_region and trends.related_queries and trends.rising_queries
+    assert [c.keyword for c in comparison.comparisons] == ["Spectrum", "Xfinity"]
+    assert all(len(c.interest_over_time) == 10 for c in comparison.comparisons)
+    # One explore for the keyword, one for the batch; regions of the compared keywords come one each
+    assert fake_upstream.state.calls["explore"] == 4
+    assert service.upstream_stats()["backend"] == "httpx"
+    await service.aclose()
@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from app.services.trends_service import TrendsService
-from app.models.trends import TrendResponse
+from app.models.trends import InterestOverTimeData, TrendResponse
 
 
 @pytest.mark.asyncio
@@ -10,7 +10,8 @@ async def test_get_trends_returns_valid_response(mock_cache_service, mock_trends
     service = TrendsService()
     
     # Mock pytrends methods
-    with patch.object(service, '_get_interest_over_time', return_value=mock_trends_data['interest_over_time']), \
+    series = [InterestOverTimeData(**p) for p in mock_trends_data['interest_over_time']]
+    with patch.object(service, '_get_interest_over_time', return_value=series), \
          patch.object(service, '_get_interest_by_region', return_value=mock_trends_data['interest_by_region']), \
          patch.object(service, '_get_related_queries', return_value=(mock_trends_data['related_queries'], mock_trends_data['rising_queries'])):
         
@@ -41,4 +42,379 @@ async def test_get_trends_handles_empty_data(mock_cache_service):
         assert len(response.interest_over_time) == 0
         assert len(response.interest_by_region) == 0
         assert len(response.related_queries) == 0
-        assert len(response.rising_queries) == 0
\ No newline at end of file
+        assert len(response.rising_queries) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_trends_builds_payload_once(mock_cache_service, fake_trendreq, fake_pool):
+    """Test that a cold fetch shares one payload across all three widgets."""
+    service = TrendsService()
+    service.clients = fake_pool
+
+    response = await service.get_trends("Spectrum Internet", "today 12-m", "US")
+
+    assert fake_trendreq.calls["build_payload"] == 1
+    assert fake_trendreq.calls["interest_over_time"] == 1
+    assert fake_trendreq.calls["interest_by_region"] == 1
+    assert fake_trendreq.calls["related_queries"] == 1
+    assert len(response.interest_over_time) == 3
+    assert [r.region for r in response.interest_by_region] == ["California", "Texas"]
+    assert response.rising_queries[0].value == 100
+
+
+def test_fetch_plan_records_stage_timings(fake_trendreq):
+    """Test that the fetch plan times every stage it runs."""
+    from app.services.fetch_plan import FetchPlan
+
+    plan = FetchPlan(fake_trendreq, ["Spectrum"], "today 12-m", "US")
+    plan.interest_over_time()
+    plan.related_queries()
+
+    assert set(plan.timings) == {"build_payload", "interest_over_time", "related_queries"}
+    assert fake_trendreq.calls["build_payload"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch(mock_cache_service, fake_trendreq, fake_pool):
+    """Test that N concurrent identical requests cause exactly one upstream fetch."""
+    import asyncio
+    service = TrendsService()
+    service.clients = fake_pool
+
+    responses = await asyncio.gather(*[
+        service.get_trends("Spectrum Internet", "today 12-m", "US")
+        for _ in range(20)
+    ])
+
+    assert fake_trendreq.calls["build_payload"] == 1
+    assert fake_trendreq.calls["interest_over_time"] == 1
+    assert all(r == responses[0] for r in responses)
+
+
+@pytest.mark.asyncio
+async def test_waits_for_other_worker_holding_fetch_lock(monkeypatch, fake_trendreq, mock_trends_data, fake_pool):
+    """Test that a miss waits for another worker's result instead of refetching."""
+    from app.core.cache import cache_service
+    from tests.conftest import widget_entries
+    service = TrendsService()
+    service.clients = fake_pool
+    filled = widget_entries(mock_trends_data)
+
+    async def mock_get(*args, **kwargs):
+        return None
+
+    async def lock_held(*args, **kwargs):
+        return None
+
+    async def mock_wait_for(key, *args, **kwargs):
+        return filled[key.split(":")[0]]
+
+    monkeypatch.setattr(cache_service, "get", mock_get)
+    monkeypatch.setattr(cache_service, "acquire_lock", lock_held)
+    monkeypatch.setattr(cache_service, "wait_for", mock_wait_for)
+
+    response = await service.get_trends("Spectrum Internet", "today 12-m", "US")
+
+    assert fake_trendreq.calls["build_payload"] == 0
+    assert len(response.interest_by_region) == 3
+
+
+@pytest.mark.asyncio
+async def test_compare_trends_uses_one_batched_payload(monkeypatch, mock_cache_service, fake_trendreq, mock_trends_data, fake_pool):
+    """Test that compare fetches missing keywords in one payload and reuses cached ones."""
+    from app.core.cache import cache_service
+    from app.services.hot_keywords import hot_keywords
+    from tests.conftest import widget_entries
+    service = TrendsService()
+    service.clients = fake_pool
+    cached = widget_entries(mock_trends_data)
+
+    async def mock_mget_entries(keys):
+        # Comparison missing, "Spectrum" widgets already cached on their own
+        return [cached[key.split(":")[0]] if ":spectrum:" in key else None for key in keys]
+
+    monkeypatch.setattr(cache_service, "mget_entries", mock_mget_entries)
+    recorded = []
+    monkeypatch.setattr(hot_keywords, "record", lambda kind, *args: recorded.append(kind))
+
+    response = await service.compare_trends(["Spectrum", "Verizon", "AT&T"], "today 12-m", "US")
+
+    # One batched payload + one region payload per cache-missing keyword
+    assert fake_trendreq.calls["build_payload"] == 3
+    assert fake_trendreq.calls["interest_over_time"] == 1
+    assert fake_trendreq.calls["related_queries"] == 1
+    assert [c.keyword for c in response.comparisons] == ["Spectrum", "Verizon", "AT&T"]
+    # Cached keyword keeps its region data, but its series comes from the shared scale
+    spectrum = response.comparisons[0]
+    assert spectrum.interest_by_region[0].region == "California"
+    assert len(spectrum.interest_by_region) == 3
+    assert [p.value for p in spectrum.interest_over_time] == [40, 60, 100]
+    assert [p.value for p in response.comparisons[1].interest_over_time] == [41, 61, 99]
+    # Regions fetched for the comparison aren't counted as region requests
+    assert "region" not in recorded
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_refreshing_once(monkeypatch, fake_trendreq, mock_trends_data, fake_pool):
+    """Test that stale hits return immediately and share one background refresh."""
+    import asyncio
+    from app.core.cache import cache_service, CacheEntry
+    from tests.conftest import widget_entries
+    service = TrendsService()
+    service.clients = fake_pool
+    stale = widget_entries(mock_trends_data, fresh_until=0)
+    writes = []
+
+    async def mock_mget_entries(keys):
+        return [stale[key.split(":")[0]] for key in keys]
+
+    async def mock_mset_with_ttl(values, ttl=None, soft_ttl=None):
+        writes.append((sorted(values), ttl, soft_ttl))
+        return {key: CacheEntry(value, float("inf")) for key, value in values.items()}
+
+    monkeypatch.setattr(cache_service, "mget_entries", mock_mget_entries)
+    monkeypatch.setattr(cache_service, "mset_with_ttl", mock_mset_with_ttl)
+
+    responses = await asyncio.gather(*[
+        service.get_trends("Spectrum Internet", "today 12-m", "US") for _ in range(5)
+    ])
+
+    # Stale data comes back straight away
+    assert all(len(r.interest_by_region) == 3 for r in responses)
+    await asyncio.gather(*service._refreshing.values())
+
+    assert fake_trendreq.calls["build_payload"] == 1
+    assert len(writes) == 1
+    # Analytics are recomputed from the new series and written with it
+    assert [key.split(":")[0] for key in writes[0][0]] == ["analytics", "iot", "queries", "region"]
+    assert writes[0][1] > writes[0][2]  # hard TTL outlives the soft TTL
+
+
+@pytest.mark.asyncio
+async def test_hot_keywords_warm_top_entries(mock_cache_service):
+    """Test that a warming pass refreshes the most requested entries."""
+    from app.services.hot_keywords import HotKeywordTracker
+
+    class RecordingService:
+        def __init__(self):
+            self.refreshed = []
+
+        async def refresh_if_needed(self, kind, keyword, timeframe, geo, horizon=0):
+            self.refreshed.append((kind, keyword))
+            return True
+
+    tracker = HotKeywordTracker()
+    for _ in range(3):
+        tracker.record("trends", "Spectrum", "today 12-m", "US")
+    tracker.record("iot", "Verizon", "today 12-m", "US")
+
+    service = RecordingService()
+    assert await tracker.warm_once(service) == 2
+    assert service.refreshed[0] == ("trends", "Spectrum")
+
+
+@pytest.mark.asyncio
+async def test_hot_keyword_counts_stay_bounded_without_redis(monkeypatch):
+    """Test that counts kept locally while Redis is down are capped to the most requested."""
+    from app.services import hot_keywords
+    monkeypatch.setattr(hot_keywords, "HOT_SET_LIMIT", 2)
+    tracker = hot_keywords.HotKeywordTracker()
+    for _ in range(3):
+        tracker.record("trends", "Spectrum", "today 12-m", "US")
+    for pass_ in range(3):
+        tracker.record("trends", "Verizon", "today 12-m", "US")
+        tracker.record("trends", f"rare {pass_}", "today 12-m", "US")
+        await tracker.flush()
+
+    assert [keyword for _, keyword, _, _ in await tracker.top(10)] == ["Spectrum", "Verizon"]
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_retries_only_failed_widget(monkeypatch, mock_cache_service, fake_trendreq, fake_pool):
+    """Test that a 429 is retried with backoff and the complete result is cached normally."""
+    from app.core.cache import cache_service, CacheEntry
+    from app.core.config import settings
+    from tests.conftest import too_many_requests
+    monkeypatch.setattr(settings, "UPSTREAM_RETRY_BASE_DELAY", 0)
+    service = TrendsService()
+    service.clients = fake_pool
+    fake_trendreq.errors["interest_by_region"] = [too_many_requests()]
+    writes = []
+
+    async def mock_mset_with_ttl(values, ttl=None, soft_ttl=None):
+        writes.append(ttl)
+        return {key: CacheEntry(value, float("inf")) for key, value in values.items()}
+
+    monkeypatch.setattr(cache_service, "mset_with_ttl", mock_mset_with_ttl)
+
+    response = await service.get_trends("Spectrum Internet", "today 12-m", "US")
+
+    assert [r.region for r in response.interest_by_region] == ["California", "Texas"]
+    assert fake_trendreq.calls["build_payload"] == 2
+    assert fake_trendreq.calls["interest_over_time"] == 1
+    assert fake_trendreq.calls["interest_by_region"] == 2
+    assert writes == [settings.CACHE_HARD_TTL]
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_not_cached_at_full_ttl(monkeypatch, mock_cache_service, fake_trendreq, fake_pool):
+    """Test that an incomplete fetch is served but cached only briefly, and a dead upstream opens the breaker."""
+    from app.core.cache import cache_service, CacheEntry
+    from app.core.config import settings
+    from app.core.exceptions import UpstreamFetchError, UpstreamUnavailableError
+    from tests.conftest import too_many_requests
+    monkeypatch.setattr(settings, "UPSTREAM_RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(settings, "BREAKER_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "UPSTREAM_RATE", 0)
+    service = TrendsService()
+    service.clients = fake_pool
+    fake_trendreq.errors["interest_by_region"] = [too_many_requests() for _ in range(3)]
+    writes = []
+
+    async def mock_mset_with_ttl(values, ttl=None, soft_ttl=None):
+        writes.append(ttl)
+        return {key: CacheEntry(value, float("inf")) for key, value in values.items()}
+
+    monkeypatch.setattr(cache_service, "mset_with_ttl", mock_mset_with_ttl)
+
+    response = await service.get_trends("Spectrum Internet", "today 12-m", "US")
+
+    # Partial data is returned, but not cached for the usual hour
+    assert len(response.interest_over_time) == 3
+    assert response.interest_by_region == []
+    assert writes == [settings.CACHE_FAILURE_TTL]
+
+    # Three 429s in a row opened the breaker: nothing to serve, fail fast
+    cache_service.local.clear()
+    with pytest.raises(UpstreamUnavailableError):
+        await service.get_region("Verizon", "today 12-m", "US")
+    assert fake_trendreq.calls["interest_by_region"] == 3
+
+    # A region-only fetch that fails has nothing worth caching
+    service._breaker.record_success()
+    fake_trendreq.errors["build_payload"] = [too_many_requests() for _ in range(3)]
+    with pytest.raises(UpstreamFetchError):
+        await service.get_region("AT&T", "today 12-m", "US")
+    assert len(writes) == 1
+
+
+@pytest.mark.asyncio
+async def test_unparseable_response_is_not_cached_at_full_ttl(monkeypatch, mock_cache_service, fake_trendreq, fake_pool):
+    """Test that a response pytrends can't parse counts as a failure, not as no data."""
+    from app.core.cache import cache_service, CacheEntry
+    from app.core.config import settings
+    service = TrendsService()
+    service.clients = fake_pool
+    fake_trendreq.errors["related_queries"] = [KeyError("rankedList")]
+    writes = []
+
+    async def mock_mset_with_ttl(values, ttl=None, soft_ttl=None):
+        writes.append(ttl)
+        return {key: CacheEntry(value, float("inf")) for key, value in values.items()}
+
+    monkeypatch.setattr(cache_service, "mset_with_ttl", mock_mset_with_ttl)
+
+    response = await service.get_trends("Spectrum Internet", "today 12-m", "US")
+
+    assert response.related_queries == []
+    assert len(response.interest_over_time) == 3
+    # Not transient: served once, then refetched soon
+    assert fake_trendreq.calls["related_queries"] == 1
+    assert writes == [settings.CACHE_FAILURE_TTL]
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_serves_stale_without_refreshing(monkeypatch, fake_trendreq, mock_trends_data, fake_pool):
+    """Test that stale entries keep being served, with no refresh, while the breaker is open."""
+    from app.core.cache import cache_service
+    from tests.conftest import widget_entries
+    service = TrendsService()
+    service.clients = fake_pool
+    stale = widget_entries(mock_trends_data, fresh_until=0)
+
+    async def mock_mget_entries(keys):
+        return [stale[key.split(":")[0]] for key in keys]
+
+    monkeypatch.setattr(cache_service, "mget_entries", mock_mget_entries)
+    for _ in range(service._breaker.failure_threshold):
+        service._breaker.record_failure()
+
+    response = await service.get_trends("Spectrum Internet", "today 12-m", "US")
+
+    assert len(response.interest_by_region) == 3
+    assert service._refreshing == {}
+    assert fake_trendreq.calls["build_payload"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_trends_yields_hits_first_and_shares_fetches(monkeypatch, mock_cache_service, fake_trendreq, fake_pool, mock_trends_data):
+    """Test that a batch resolves hits with one MGET, then fetches each distinct miss once."""
+    import json
+    from app.core.cache import cache_service
+    from app.models.trends import TrendRequest
+    from tests.conftest import widget_entries
+    service = TrendsService()
+    service.clients = fake_pool
+    hit = widget_entries(mock_trends_data)
+    mget_calls = []
+
+    async def mock_mget_entries(keys):
+        mget_calls.append(keys)
+        return [hit[key.split(":")[0]] if ":spectrum:" in key else None for key in keys]
+
+    monkeypatch.setattr(cache_service, "mget_entries", mock_mget_entries)
+    requests = [
+        TrendRequest(keyword="Verizon", geo="US"),
+        TrendRequest(keyword="Spectrum", geo="US"),
+        TrendRequest(keyword="Verizon", geo="US"),
+    ]
+
+    results = [item async for item in service.stream_trends(requests)]
+
+    assert len(mget_calls) == 1
+    assert results[0][0] == 1  # the cache hit comes back first
+    assert json.loads(results[0][1]) == {"keyword": "Spectrum", **mock_trends_data}
+    assert sorted(index for index, _, _ in results) == [0, 1, 2]
+    assert all(error is None for _, _, error in results)
+    assert fake_trendreq.calls["build_payload"] == 1
+
+
+@pytest.mark.asyncio
+async def test_widget_entries_are_shared_across_endpoints(mock_cache_service, fake_trendreq, fake_pool):
+    """Test that narrow endpoints fetch only their widget and reuse what get_trends stored (and vice versa)."""
+    service = TrendsService()
+    service.clients = fake_pool
+
+    series = await service.get_interest_over_time("Spectrum", "today 12-m", "US")
+    assert fake_trendreq.calls == {"build_payload": 1, "interest_over_time": 1, "interest_by_region": 0, "related_queries": 0}
+
+    # The dashboard only needs the two widgets that aren't cached yet
+    response = await service.get_trends("Spectrum", "today 12-m", "US")
+    assert fake_trendreq.calls == {"build_payload": 2, "interest_over_time": 1, "interest_by_region": 1, "related_queries": 1}
+    assert response.interest_over_time == series
+
+    # ...and after it, every narrow endpoint is a cache hit
+    regions = await service.get_region("Spectrum", "today 12-m", "US")
+    body = await service.get_interest_over_time("Spectrum", "today 12-m", "US", raw=True)
+    assert fake_trendreq.calls["build_payload"] == 2
+    assert regions == response.interest_by_region
+    assert body.startswith(b'{"interest_over_time":[')
+
+
+@pytest.mark.asyncio
+async def test_analytics_computed_from_cached_series_once(mock_cache_service, mock_trends_data):
+    """Test that analytics missing beside a cached series are computed once, then read from cache."""
+    from app.core.cache import cache_service, CacheEntry
+    from app.models.trends import TrendAnalytics
+    service = TrendsService()
+    iot = CacheEntry({"interest_over_time": mock_trends_data["interest_over_time"]}, float("inf"))
+    cache_service.local.set(service._widget_key("iot", "Spectrum Internet", "today 12-m", "US"), iot)
+
+    with patch.object(service, "_analyze", wraps=service._analyze) as analyze:
+        first = await service.get_analytics("Spectrum Internet", "today 12-m", "US")
+        second = await service.get_analytics("spectrum internet", "today 12-m", "US", raw=True)
+
+    assert analyze.call_count == 1
+    assert isinstance(first, TrendAnalytics)
+    assert [p.change for p in first.series] == [None, 5, 5]
+    assert TrendAnalytics.model_validate_json(second).keyword == "spectrum internet"
@@ -0,0 +1,49 @@
+import json
+import time
+import pytest
+from app.core.cache import cache_service
+from app.core.config import settings
+from app.services.worker_stats import WORKERS_KEY, WorkerStats, merge
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class StubService:
+    def upstream_stats(self):
+        return {"calls": 3, "breaker": {"state": "closed", "failures": 1}}
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(cache_service, "redis", client)
+    return client
+
+
+def test_merge_sums_counts_and_recomputes_hit_ratio():
+    """Test that numeric leaves are summed, strings dropped and ratios recomputed."""
+    totals = merge([
+        {"cache": {"hits": 9, "misses": 1, "hit_ratio": 0.9}, "breaker": {"state": "open", "failures": 2}},
+        {"cache": {"hits": 0, "misses": 10, "hit_ratio": 0.0}, "breaker": {"state": "closed", "failures": 1}},
+    ])
+
+    assert totals["cache"] == {"hits": 9, "misses": 11, "hit_ratio": 0.45}
+    assert totals["breaker"] == {"failures": 3}
+
+
+@pytest.mark.asyncio
+async def test_collect_adds_up_live_workers_and_drops_stale_ones(redis):
+    """Test that every reported worker is listed and totalled, and silent ones expire."""
+    stats = WorkerStats()
+    service = StubService()
+    await stats.report(service)
+    other = {**stats.snapshot(service), "worker": "other:1"}
+    stale = {**other, "worker": "gone:2", "reported_at": time.time() - settings.WORKER_STATS_INTERVAL * 4}
+    await redis.hset(WORKERS_KEY, mapping={"other:1": json.dumps(other), "gone:2": json.dumps(stale)})
+
+    collected = await stats.collect(service)
+
+    assert collected["workers"] == 2
+    assert [w["worker"] for w in collected["per_worker"]] == sorted([stats.worker_id, "other:1"])
+    assert collected["totals"]["upstream"] == {"calls": 6, "breaker": {"failures": 2}}
+    assert await redis.hexists(WORKERS_KEY, "gone:2") == 0
@@ -5,6 +5,7 @@ import Sidebar from './components/common/Sidebar';
 import Dashboard from './components/dashboard/Dashboard';
 import NetworkBackground from './components/common/NetworkBackground';
 import { NAV_TOPICS } from './data/topics';
+import { getTrendsData } from './api/trendsApi';
 import gsap from "gsap";
 import { TextPlugin } from "gsap/TextPlugin";
 gsap.registerPlugin(TextPlugin);
@@ -103,12 +104,7 @@ function App() {
     const fetchTrends = async () => {
       setLoading(true);
       try {
-        const response = await fetch('https://djso3858997b1.cloudfront.net/api/trends', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ keyword: selectedKeyword, timeframe: 'today 12-m', geo: 'US' })
-        });
-        const data = await response.json();
+        const data = await getTrendsData(selectedKeyword, 'today 12-m', 'US');
         setTrendData(data);
       } catch (err) {
         console.error('Failed to fetch trends:', err);
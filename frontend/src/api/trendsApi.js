@@ -1,4 +1,6 @@
-const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+// Same origin by default, so requests go through nginx's /api/ cache
+// (and the Vite dev server's proxy). Set VITE_API_URL to call a backend directly.
+const API_BASE_URL = import.meta.env.VITE_API_URL || '';
 
 // GET /health
 export const healthCheck = async () => {
@@ -18,15 +20,10 @@ export const getTopics = async () => {
   return await response.json();
 };
 
-// POST /api/trends
+// GET /api/trends (cacheable: the browser revalidates with If-None-Match)
 export const getTrendsData = async (keyword, timeframe = 'today 12-m', geo = 'US') => {
-  const response = await fetch(`${API_BASE_URL}/api/trends`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify({ keyword, timeframe, geo })
-  });
+  const params = new URLSearchParams({ keyword, timeframe, geo });
+  const response = await fetch(`${API_BASE_URL}/api/trends?${params}`);
   
   if (!response.ok) {
     throw new Error(`Failed to fetch trends: ${response.status}`);
@@ -3,6 +3,7 @@ import { Area, AreaChart, BarChart, Bar, CartesianGrid, XAxis, YAxis } from 'rec
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { ChartContainer, ChartTooltip, ChartTooltipContent } from '@/components/ui/chart';
 import WordCloud from './WordCloud';
+import { getTrendsData } from '@/api/trendsApi';
 import gsap from 'gsap';
 
 const TIMEFRAMES = [
@@ -47,12 +48,7 @@ export default function Dashboard({ keyword }) {
     const fetchAll = async () => {
       setAllLoading(true);
       try {
-        const res = await fetch('https://djso3858997b1.cloudfront.net/api/trends', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ keyword, timeframe: activeTimeframe, geo: 'US' })
-        });
-        const data = await res.json();
+        const data = await getTrendsData(keyword, activeTimeframe, 'US');
         cache.current[cacheKey] = data;
         setAllData(data);
       } catch (err) {
@@ -16,5 +16,12 @@ export default defineConfig({
   },
   optimizeDeps: {
   include: ['d3-cloud']
-  }
+  },
+  // Same-origin API calls, as behind nginx in production
+  server: {
+    proxy: {
+      '/api': 'http://localhost:8000',
+      '/health': 'http://localhost:8000',
+    },
+  },
 })
\ No newline at end of file